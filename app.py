@@ -1,43 +1,425 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, make_response, g
+from flask.json.provider import DefaultJSONProvider
+from functools import wraps
 import os
-from PIL import Image
-import pandas as pd
+import hmac
+import re
+import threading
+import time
 import numpy as np
+from PIL import UnidentifiedImageError
+from PIL.Image import DecompressionBombError
 from utils.data_loader import DataLoader
 from utils.location_matcher import LocationMatcher
-from models.crop_predictor import CropPredictor
+from models.artifact_store import ARTIFACT_DIR
+from models.crop_predictor import ARTIFACT_NAME as CROP_MODEL_ARTIFACT, CropPredictor, RANKINGS
+from models.recommendation_table import RecommendationTable, TABLE_DIR
 from models.yield_predictor import YieldPredictor
+from models.disease_detector import DiseaseDetector, PLACEHOLDER_RESULT
+from utils.data_cache import dataset_version
+from utils.gazetteer import GAZETTEER_DIR
+from utils.response_cache import ResponseCache, MemoryBackend, SQLiteBackend
+from utils.image_pipeline import UploadStore, content_key, load_cropped_image
+from utils.advanced_weather import AdvancedWeatherAnalysis
+from utils.price_store import PRICE_DIR, PRICE_SOURCE, PriceStore, parse_date
+from utils.static_payloads import PayloadCache
+from utils.feature_store import FeatureStore, current_season
+from utils.weather_integration import WeatherIntegration
+from utils.report_engine import ReportEngine
+from utils.metrics import metrics, timer
+from utils.profiler import SamplingProfiler
+from utils.snapshot import Snapshot, SnapshotManager, file_stamps, snapshot_version
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """JSON provider that records jsonify() time as the json_serialize stage"""
+    
+    def response(self, *args, **kwargs):
+        with timer('json_serialize'):
+            return super().response(*args, **kwargs)
+
 
 app = Flask(__name__)
+app.json_provider_class = TimedJSONProvider
+app.json = TimedJSONProvider(app)
 
 # Configuration
 UPLOAD_FOLDER = 'static/uploads'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+app.config['UPLOAD_STORE_MAX_BYTES'] = int(os.environ.get('UPLOAD_STORE_MAX_BYTES', 256 * 1024 * 1024))
+app.config['UPLOAD_STORE_MAX_AGE'] = int(os.environ.get('UPLOAD_STORE_MAX_AGE', 7 * 24 * 3600))
 app.config['MAX_CONTENT_LENGTH'] = 4 * 1024 * 1024  # 4MB max
+app.config['MAX_BATCH_ITEMS'] = 10000
+
+# Response cache: 'memory' (per process) or 'sqlite' (shared by workers)
+app.config['RESPONSE_CACHE_BACKEND'] = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory')
+app.config['RESPONSE_CACHE_PATH'] = os.environ.get('RESPONSE_CACHE_PATH', os.path.join(ARTIFACT_DIR, 'response_cache.sqlite'))
+app.config['RESPONSE_CACHE_TTL'] = int(os.environ.get('RESPONSE_CACHE_TTL', 3600))
+app.config['RESPONSE_CACHE_SIZE'] = int(os.environ.get('RESPONSE_CACHE_SIZE', 4096))
+
+# Browser caching of the static-like /api/locations and /api/crops payloads
+app.config['STATIC_PAYLOAD_MAX_AGE'] = int(os.environ.get('STATIC_PAYLOAD_MAX_AGE', 300))
+
+# Serve a pruned crop forest of this many trees (0: the full forest).
+# See benchmarks/crop_inference.py for the accuracy and latency trade-off.
+app.config['CROP_MODEL_TREES'] = int(os.environ.get('CROP_MODEL_TREES', 0)) or None
+
+# Live weather (feature refresh, farm report section) needs an API key
+app.config['WEATHER_API_ENABLED'] = bool(os.environ.get('WEATHER_API_KEY'))
+
+# Deadline for each /farm-report section; slower sections are left out
+app.config['REPORT_SECTION_TIMEOUT'] = float(os.environ.get('REPORT_SECTION_TIMEOUT', 2.0))
+
+# Replace estimated temperature/humidity in the crop features with current
+# readings from the weather API at startup (one call per 0.1 degree cell)
+app.config['WEATHER_FEATURES'] = os.environ.get('WEATHER_FEATURES', '').lower() in ('1', 'true', 'yes')
+
+# Precomputed crop probabilities (python build_artifacts.py recommendations);
+# districts missing from the table, or changed since, use live inference
+app.config['RECOMMENDATION_TABLE_DIR'] = os.environ.get('RECOMMENDATION_TABLE_DIR', TABLE_DIR)
+
+# Per-request sampling profiler, triggered by an "X-Profile: 1" header.
+# Off unless PROFILE_REQUESTS is set, since it is not meant for public use.
+app.config['PROFILING_ENABLED'] = os.environ.get('PROFILE_REQUESTS', '').lower() in ('1', 'true', 'yes')
+app.config['PROFILE_DIR'] = os.environ.get('PROFILE_DIR', os.path.join(ARTIFACT_DIR, 'profiles'))
+app.config['PROFILE_INTERVAL'] = float(os.environ.get('PROFILE_INTERVAL', 0.001))
+
+# Hot reload: each worker checks data/ and the artifacts for changes every
+# SNAPSHOT_WATCH_INTERVAL seconds (0: never) and swaps in a rebuilt
+# snapshot. POST /api/admin/reload forces one; it is disabled unless
+# ADMIN_TOKEN is set, and touches SNAPSHOT_RELOAD_FILE so that the other
+# workers' watchers follow.
+app.config['SNAPSHOT_WATCH_INTERVAL'] = float(os.environ.get('SNAPSHOT_WATCH_INTERVAL', 30))
+app.config['SNAPSHOT_RELOAD_FILE'] = os.environ.get('SNAPSHOT_RELOAD_FILE', os.path.join(ARTIFACT_DIR, 'reload'))
+app.config['ADMIN_TOKEN'] = os.environ.get('ADMIN_TOKEN')
+
+# Components that do not depend on the datasets live for the whole process
+weather_client = WeatherIntegration()
+disease_detector = DiseaseDetector.from_artifacts()
+
+
+def build_snapshot():
+    """Load every dataset and model into a new serving snapshot"""
+    data_loader = DataLoader().pin()
+    location_matcher = LocationMatcher(data_loader)
+    yield_predictor = YieldPredictor(data_loader)
+    price_store = PriceStore.open()
+    feature_store = FeatureStore(location_matcher.records, location_matcher.coordinates)
+    if app.config['WEATHER_FEATURES']:
+        feature_store.refresh_weather(weather_client, current_season(time.localtime().tm_mon))
+    crop_predictor = CropPredictor(
+        data_loader,
+        yield_predictor=yield_predictor,
+        price_store=price_store,
+        max_trees=app.config['CROP_MODEL_TREES'],
+        feature_store=feature_store,
+        gazetteer=location_matcher.gazetteer
+    )
+    crop_predictor.use_table(RecommendationTable.open(
+        feature_store,
+        crop_predictor.model_version,
+        crop_predictor.model.classes_,
+        directory=app.config['RECOMMENDATION_TABLE_DIR']
+    ))
+    weather_analysis = AdvancedWeatherAnalysis(
+        os.path.join(data_loader.data_dir, 'rainfall in india 1901-2015.csv')
+    )
+    
+    data_version = data_loader.data_version()
+    return Snapshot(
+        snapshot_version([
+            data_version, location_matcher.gazetteer.version, crop_predictor.model_version,
+            feature_store.version, price_store.version
+        ]),
+        data_version=data_version,
+        data_loader=data_loader,
+        location_matcher=location_matcher,
+        yield_predictor=yield_predictor,
+        price_store=price_store,
+        feature_store=feature_store,
+        crop_predictor=crop_predictor,
+        weather_analysis=weather_analysis,
+        yield_grid=yield_predictor.build_grid(location_matcher.records, location_matcher.coordinates),
+        static_payloads=PayloadCache(
+            {
+                'locations': data_loader.get_location_hierarchy,
+                'crops': lambda: {'crops': data_loader.get_available_crops()},
+            },
+            version_fn=lambda: data_version
+        )
+    )
+
+
+def snapshot_sources():
+    """Fingerprint of everything build_snapshot() reads, polled by the watcher"""
+    artifacts = [
+        os.path.join(ARTIFACT_DIR, f'{CROP_MODEL_ARTIFACT}.json'),
+        os.path.join(GAZETTEER_DIR, 'gazetteer.json'),
+        os.path.join(PRICE_DIR, 'manifest.json'),
+        os.path.join(app.config['RECOMMENDATION_TABLE_DIR'], 'manifest.json'),
+        PRICE_SOURCE,
+        app.config['SNAPSHOT_RELOAD_FILE'],
+    ]
+    return f"{dataset_version()}-{file_stamps(artifacts)}"
+
+
+def warm_snapshot(snapshot):
+    """Run the snapshot's request paths once, so lazy initialization happens before it serves"""
+    district_data = snapshot.location_matcher.get_district_data('Pune')
+    if district_data:
+        snapshot.crop_predictor.recommend_crops(district_data)
+        if snapshot.crop_predictor.profit_ranking_available:
+            snapshot.crop_predictor.recommend_crops(district_data, rank_by='profit')
+        snapshot.yield_predictor.predict_yield('rice', district_data, 'loamy')
+    
+    snapshot.location_matcher.search('Pune')
+    snapshot.location_matcher.get_nearest_districts(18.52, 73.86)
+    snapshot.weather_analysis.analyze_all_trends()
+    for name in snapshot.static_payloads.builders:
+        snapshot.static_payloads.get(name)
+
+
+snapshots = SnapshotManager(
+    build_snapshot,
+    snapshot_sources,
+    warm=warm_snapshot,
+    interval=app.config['SNAPSHOT_WATCH_INTERVAL']
+)
+
+
+def _create_response_cache():
+    """Build the response cache for the configured backend"""
+    if app.config['RESPONSE_CACHE_BACKEND'] == 'sqlite':
+        backend = SQLiteBackend(app.config['RESPONSE_CACHE_PATH'], app.config['RESPONSE_CACHE_SIZE'])
+    else:
+        backend = MemoryBackend(app.config['RESPONSE_CACHE_SIZE'])
+    
+    # Entries are keyed by the version of the snapshot that computed them
+    return ResponseCache(backend, version=snapshots.current.version, ttl=app.config['RESPONSE_CACHE_TTL'])
+
+
+response_cache = _create_response_cache()
+upload_store = UploadStore(
+    app.config['UPLOAD_FOLDER'],
+    max_bytes=app.config['UPLOAD_STORE_MAX_BYTES'],
+    max_age=app.config['UPLOAD_STORE_MAX_AGE']
+)
+
+
+# /farm-report sections, run concurrently; each gets {'district_data': ..., 'snapshot': ...}.
+# Section threads have no request context, so they read the snapshot the
+# request started with from the context rather than from g.
+report_engine = ReportEngine(timeout=app.config['REPORT_SECTION_TIMEOUT'])
+report_engine.register('recommended_crops', lambda c: c['snapshot'].crop_predictor.recommend_crops(c['district_data']))
+report_engine.register('seasonal_planning', lambda c: _generate_seasonal_plan(c['district_data']))
+report_engine.register('irrigation_advice', lambda c: _generate_irrigation_advice(c['district_data']))
+report_engine.register('soil_management', lambda c: _generate_soil_advice(c['district_data']))
+
+
+@report_engine.section('drought_risk')
+def _report_drought_risk(context):
+    """Drought risk of the subdivisions covering the district's state, as of the latest data"""
+    weather_analysis = context['snapshot'].weather_analysis
+    year = weather_analysis.latest_year + 1
+    return {
+        'as_of_year': year,
+        'subdivisions': weather_analysis.predict_state_drought_risk(
+            context['district_data']['STATE_UT_NAME'], year
+        )
+    }
+
+
+@report_engine.section('market_prices')
+def _report_market_prices(context):
+    """Reference modal price of each crop, from the most local level with data"""
+    crop_predictor = context['snapshot'].crop_predictor
+    if crop_predictor.reference_prices is None:
+        return []
+    
+    district_data = context['district_data']
+    prices, levels = crop_predictor.reference_prices.lookup(
+        district_data['DISTRICT_ID'], district_data['STATE_ID']
+    )
+    return [
+        {'crop': str(crop), 'modal_price_per_quintal': round(float(price), 2), 'price_level': level}
+        for crop, price, level in zip(crop_predictor.model.classes_, prices, levels)
+        if not np.isnan(price)
+    ]
+
+
+if app.config['WEATHER_API_ENABLED']:
+    @report_engine.section('current_weather', kind='io')
+    def _report_current_weather(context):
+        """Current weather at the district's coordinates, if known"""
+        coordinates = context['snapshot'].location_matcher.coordinates.get(context['district_data'].get('DISTRICT_ID'))
+        return weather_client.get_current_weather(*coordinates) if coordinates else None
+
+
+def _normalize_payload(payload):
+    """Normalize request fields that the endpoints treat case-insensitively"""
+    normalized = dict(payload)
+    
+    location = normalized.get('location')
+    if isinstance(location, str):
+        normalized['location'] = ','.join(p.strip().upper() for p in location.split(','))
+    
+    for field in ('soil_type', 'season'):
+        value = normalized.get(field)
+        if isinstance(value, str):
+            normalized[field] = value.strip().lower()
+    
+    return normalized
+
+
+def cached_endpoint(view):
+    """
+    Serve a deterministic JSON endpoint from the response cache.
+    Only successful responses without Cache-Control: no-store are cached, for at most their
+    max-age if they set one. Clients sending If-None-Match with the current ETag get a 304.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict):
+            return view(*args, **kwargs)
+        
+        key = response_cache.make_key(request.path, _normalize_payload(payload), g.snapshot.version)
+        entry = response_cache.get(key)
+        cache_status = 'HIT'
+        
+        if entry is None:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.cache_control.no_store:
+                return response
+            
+            entry = response_cache.put(key, response.get_data(), response.cache_control.max_age)
+            cache_status = 'MISS'
+        
+        if request.if_none_match.contains(entry.etag):
+            response_cache.count('not_modified')
+            response = make_response('', 304)
+        else:
+            response = make_response(entry.body)
+            response.mimetype = 'application/json'
+        
+        response.set_etag(entry.etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Cache'] = cache_status
+        return response
+    
+    return wrapper
+
+
+# Set by warm_up(); /api/ready answers 503 until then
+readiness = {'ready': False, 'warm_up_ms': None}
+
+
+def warm_up():
+    """
+    Run every request path once so lazy initialization (dataset loads, model
+    thread pools, caches) happens before the first real request. Called by
+    wsgi.py in the master process, so forked workers start warm.
+    """
+    start = time.perf_counter()
+    
+    snapshot = snapshots.current
+    warm_snapshot(snapshot)
+    district_data = snapshot.location_matcher.get_district_data('Pune')
+    if district_data:
+        report_engine.run({'district_data': district_data, 'snapshot': snapshot})
+    disease_detector.warm_up()
+    
+    # Warm-up timings are not traffic; forked workers would report them too
+    metrics.reset()
+    
+    readiness['warm_up_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    readiness['ready'] = True
+    print(f"✅ Warm-up complete in {readiness['warm_up_ms']} ms")
+
+
+def serve_static_payload(name):
+    """
+    Serve a pre-serialized payload in the best encoding the client accepts,
+    with a strong ETag per encoding and a 304 for a matching If-None-Match.
+    """
+    payload = g.snapshot.static_payloads.get(name)
+    encoding, body, etag = payload.select(request.accept_encodings)
+    
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        response = make_response(body)
+        response.mimetype = 'application/json'
+        if encoding:
+            response.content_encoding = encoding
+    
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f"public, max-age={app.config['STATIC_PAYLOAD_MAX_AGE']}"
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def _route_label():
+    """Metric label for the current request: the URL rule, not the raw path"""
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+
+def internal_error(e):
+    """Log an unexpected failure with its traceback, count it and answer 500"""
+    app.logger.exception(f"Unhandled error in {request.method} {request.path}")
+    metrics.inc('request_errors_total', {'route': _route_label(), 'exception': type(e).__name__})
+    return jsonify({'error': str(e)}), 500
+
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    
+    # The whole request reads this snapshot, even if a reload replaces it meanwhile
+    g.snapshot = snapshots.acquire()
+    
+    if app.config['PROFILING_ENABLED'] and request.headers.get('X-Profile') == '1':
+        g.profiler = SamplingProfiler(threading.get_ident(), app.config['PROFILE_INTERVAL']).start()
+
+
+@app.after_request
+def record_request(response):
+    """Record request latency and attach profiler output, if one was running"""
+    start = g.pop('request_start', None)
+    if start is not None:
+        metrics.observe(
+            'request_duration_seconds',
+            {'route': _route_label(), 'method': request.method, 'status': str(response.status_code)},
+            time.perf_counter() - start
+        )
+    
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.stop()
+        route = re.sub(r'[^A-Za-z0-9]+', '_', request.path).strip('_') or 'index'
+        path = profiler.save(
+            app.config['PROFILE_DIR'],
+            f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{route}"
+        )
+        response.headers['X-Profile-Path'] = path
+        response.headers['X-Profile-Samples'] = str(profiler.samples)
+        response.headers['X-Profile-Top'] = ', '.join(
+            f"{frame} {share:.0%}" for frame, share in profiler.top(3)
+        )
+    
+    snapshot = g.pop('snapshot', None)
+    if snapshot is not None:
+        response.headers['X-Snapshot-Version'] = snapshot.version
+    
+    metrics.flush()
+    return response
+
 
-# JSON encoder for numpy types
-def convert_to_json_serializable(obj):
-    """Convert numpy/pandas types to Python native types"""
-    if isinstance(obj, (np.integer, np.int64, np.int32)):
-        return int(obj)
-    elif isinstance(obj, (np.floating, np.float64, np.float32)):
-        return float(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif isinstance(obj, pd.Series):
-        return obj.to_dict()
-    elif isinstance(obj, dict):
-        return {k: convert_to_json_serializable(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_to_json_serializable(item) for item in obj]
-    return obj
-
-# Initialize components
-data_loader = DataLoader()
-location_matcher = LocationMatcher(data_loader)
-crop_predictor = CropPredictor(data_loader)
-yield_predictor = YieldPredictor(data_loader)
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Request and stage latency histograms in the Prometheus text format"""
+    return metrics.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
 
 
 @app.route('/')
@@ -46,18 +428,219 @@ def index():
     return render_template('index.html')
 
 
+@app.route('/api/health', methods=['GET'])
+def health():
+    """Liveness: the process is up and serving requests"""
+    return jsonify({'status': 'ok', 'pid': os.getpid()})
+
+
+@app.route('/api/ready', methods=['GET'])
+def ready():
+    """Readiness: 200 only once warm-up has finished"""
+    body = {
+        **readiness,
+        'pid': os.getpid(),
+        'snapshot': snapshots.status(),
+        'data_version': g.snapshot.data_version,
+        'model_version': g.snapshot.crop_predictor.model_version,
+        'unmatched_districts': g.snapshot.location_matcher.unmatched,
+        'disease_model': disease_detector.available
+    }
+    return jsonify(body), 200 if readiness['ready'] else 503
+
+
+@app.route('/api/admin/reload', methods=['POST'])
+def reload_snapshot():
+    """
+    Rebuild the serving snapshot now and swap it in; requests in flight
+    finish on the old one. Needs an X-Admin-Token header matching ADMIN_TOKEN.
+    """
+    token = app.config['ADMIN_TOKEN']
+    if not token:
+        return jsonify({'error': 'Admin endpoints are disabled (ADMIN_TOKEN is not set)'}), 404
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), token):
+        return jsonify({'error': 'Invalid admin token'}), 403
+    
+    # Touching the trigger file changes the sources, so this worker rebuilds
+    # now and the other workers' watchers do on their next poll
+    reload_file = app.config['SNAPSHOT_RELOAD_FILE']
+    os.makedirs(os.path.dirname(reload_file) or '.', exist_ok=True)
+    with open(reload_file, 'a'):
+        os.utime(reload_file)
+    
+    previous = g.snapshot.version
+    try:
+        reloaded = snapshots.reload()
+    except Exception as e:
+        return jsonify({'error': f'Reload failed: {e}', 'snapshot': snapshots.status()}), 500
+    
+    return jsonify({'reloaded': reloaded, 'previous_version': previous, 'snapshot': snapshots.status()})
+
+
 @app.route('/api/locations', methods=['GET'])
 def get_locations():
     """Get list of available states and districts"""
-    locations = data_loader.get_location_hierarchy()
-    return jsonify(locations)
+    return serve_static_payload('locations')
+
+
+@app.route('/api/locations/search', methods=['GET'])
+def search_locations():
+    """Get the best matching districts for a partial or misspelt name"""
+    query = request.args.get('q', '')
+    k = min(request.args.get('k', 5, type=int), 20)
+    if k < 1:
+        return jsonify({'error': 'k must be at least 1'}), 400
+    return jsonify({'query': query, 'matches': g.snapshot.location_matcher.search(query, k)})
+
+
+@app.route('/api/nearby', methods=['GET', 'POST'])
+def nearby_districts():
+    """
+    Get districts near a GPS fix.
+    GET ?lat=&lon=[&k=5][&radius_km=] for one point, or
+    POST {"points": [{"lat": .., "lon": ..}, ...], "k": 5} for many.
+    """
+    try:
+        if request.method == 'POST':
+            data = request.json or {}
+            points = data.get('points') or []
+            k = min(int(data.get('k', 5)), 50)
+            lats = np.array([p['lat'] for p in points], dtype=float)
+            lons = np.array([p['lon'] for p in points], dtype=float)
+        else:
+            k = min(request.args.get('k', 5, type=int), 50)
+            lats = np.array([request.args.get('lat', type=float)], dtype=float)
+            lons = np.array([request.args.get('lon', type=float)], dtype=float)
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': 'lat and lon must be numbers'}), 400
+    
+    if k < 1:
+        return jsonify({'error': 'k must be at least 1'}), 400
+    
+    if not len(lats) or np.isnan(lats).any() or np.isnan(lons).any():
+        return jsonify({'error': 'lat and lon are required'}), 400
+    
+    if (np.abs(lats) > 90).any() or (np.abs(lons) > 180).any():
+        return jsonify({'error': 'lat/lon out of range'}), 400
+    
+    if request.method == 'POST':
+        results = g.snapshot.location_matcher.get_nearest_districts_batch(lats, lons, k)
+        return jsonify({'results': results})
+    
+    radius_km = request.args.get('radius_km', type=float)
+    if radius_km is not None and not (np.isfinite(radius_km) and radius_km > 0):
+        return jsonify({'error': 'radius_km must be a positive number'}), 400
+    
+    if radius_km is not None:
+        districts = g.snapshot.location_matcher.get_nearby_districts(lats[0], lons[0], radius_km)[:k]
+    else:
+        districts = g.snapshot.location_matcher.get_nearest_districts(lats[0], lons[0], k)
+    
+    return jsonify({'lat': lats[0], 'lon': lons[0], 'districts': districts})
+
+
+@app.route('/api/rainfall/trends', methods=['GET'])
+def rainfall_trends():
+    """Get rainfall trends for every subdivision over the last ?years=10"""
+    years = request.args.get('years', 10, type=int)
+    if years < 2:
+        return jsonify({'error': 'years must be at least 2'}), 400
+    
+    return jsonify({'years': years, 'subdivisions': g.snapshot.weather_analysis.analyze_all_trends(years)})
+
+
+@app.route('/api/rainfall/drought-risk', methods=['GET'])
+def rainfall_drought_risk():
+    """Get drought risk for every subdivision as of ?year="""
+    year = request.args.get('year', type=int)
+    if year is None:
+        return jsonify({'error': 'year is required'}), 400
+    
+    return jsonify({'year': year, 'subdivisions': g.snapshot.weather_analysis.predict_all_drought_risk(year)})
+
+
+@app.route('/api/prices', methods=['GET'])
+def get_prices():
+    """
+    Get mandi prices.
+    ?commodity=&district=&state=&from=&to=&limit= returns matching records
+    and a modal-price summary; without commodity, a summary per commodity.
+    state picks one district where several states have one of that name.
+    Dates are dd/mm/yyyy or yyyy-mm-dd.
+    """
+    commodity = request.args.get('commodity')
+    district = request.args.get('district') or None
+    state = request.args.get('state') or None
+    limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+    
+    try:
+        start = parse_date(request.args['from']) if request.args.get('from') else None
+        end = parse_date(request.args['to']) if request.args.get('to') else None
+    except ValueError:
+        return jsonify({'error': 'Dates must be dd/mm/yyyy or yyyy-mm-dd'}), 400
+    
+    query = {
+        'district': district, 'state': state, 'from': request.args.get('from'), 'to': request.args.get('to')
+    }
+    
+    if not commodity:
+        return jsonify({**query, 'commodities': g.snapshot.price_store.modal_summaries(district, start, end, state)})
+    
+    summary = g.snapshot.price_store.modal_summary(commodity, district, start, end, state)
+    if summary is None:
+        return jsonify({'error': f'No prices found for {commodity}'}), 404
+    
+    return jsonify({
+        **query,
+        'commodity': summary['commodity'],
+        'summary': summary,
+        'records': g.snapshot.price_store.query(commodity, district, start, end, limit, state)
+    })
+
+
+@app.route('/api/yield/best-districts', methods=['GET'])
+def best_districts_for_crop():
+    """Get the districts with the highest predicted yield for ?crop=[&k=10][&state=]"""
+    crop = (request.args.get('crop') or '').strip().lower()
+    if crop not in g.snapshot.yield_grid:
+        return jsonify({'error': f'Crop "{crop}" not found'}), 404
+    
+    k = min(request.args.get('k', 10, type=int), 100)
+    if k < 1:
+        return jsonify({'error': 'k must be at least 1'}), 400
+    state = request.args.get('state')
+    return jsonify({
+        'crop': crop,
+        'unit': 'tonnes',
+        'districts': g.snapshot.yield_grid.best_districts(crop, k, state)
+    })
+
+
+@app.route('/api/yield/map', methods=['GET'])
+def yield_map_for_crop():
+    """Get the predicted yield of ?crop= in every district [of ?state=]"""
+    crop = (request.args.get('crop') or '').strip().lower()
+    if crop not in g.snapshot.yield_grid:
+        return jsonify({'error': f'Crop "{crop}" not found'}), 404
+    
+    return jsonify({
+        'crop': crop,
+        'unit': 'tonnes',
+        'districts': g.snapshot.yield_grid.yield_map(crop, request.args.get('state'))
+    })
+
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Get response cache hit/miss counters"""
+    # Entries are keyed by snapshot; report the one serving this request
+    return jsonify({**response_cache.stats(), 'version': g.snapshot.version})
 
 
 @app.route('/api/crops', methods=['GET'])
 def get_crops():
     """Get list of available crops"""
-    crops = data_loader.get_available_crops()
-    return jsonify({'crops': crops})
+    return serve_static_payload('crops')
 
 
 @app.route('/disease-diagnosis', methods=['POST'])
@@ -69,39 +652,55 @@ def disease_diagnosis():
     file = request.files['file']
     if file.filename == '':
         return jsonify({'error': 'No file selected'}), 400
-
-    # Save and process image
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], file.filename)
-    file.save(filepath)
+    
+    # Crop coordinates (if provided), in original image pixels
+    box = None
+    if any(k in request.form for k in ('left', 'top', 'right', 'bottom')):
+        try:
+            box = tuple(
+                int(request.form[k]) if request.form.get(k) else None
+                for k in ('left', 'top', 'right', 'bottom')
+            )
+        except ValueError:
+            return jsonify({'error': 'Crop coordinates must be integers'}), 400
+    
+    store = request.form.get('store', '').lower() in ('1', 'true', 'yes')
     
     try:
-        img = Image.open(filepath)
-        
-        # Crop coordinates (if provided)
-        left = int(request.form.get('left', 0))
-        top = int(request.form.get('top', 0))
-        right = int(request.form.get('right', img.width))
-        bottom = int(request.form.get('bottom', img.height))
-        
-        cropped = img.crop((left, top, right, bottom))
-        cropped_path = os.path.join(app.config['UPLOAD_FOLDER'], f"cropped_{file.filename}")
-        cropped.save(cropped_path)
-        
-        # Placeholder for disease detection (integrate your model here)
-        result = {
-            'disease': 'Sample Disease Name',
-            'confidence': 0.85,
-            'remedy': 'Apply organic neem oil spray every 7 days',
-            'image_url': f'/{cropped_path}'
-        }
+        # Decode from the uploaded bytes; the processed image is only written
+        # if the client asks for it to be kept (Werkzeug may still spool a
+        # large upload to a temporary file while parsing the form)
+        data = file.stream.read()
+        img = load_cropped_image(data, box)
+        
+        # Concurrent requests are grouped into one forward pass
+        if disease_detector.available:
+            result = disease_detector.detect(img)
+        else:
+            result = dict(PLACEHOLDER_RESULT)
+        
+        if store:
+            with timer('image_store'):
+                path = upload_store.put(content_key(data, box), img)
+            result['image_url'] = '/' + path.replace(os.sep, '/')
         
         return jsonify(result)
     
+    except DecompressionBombError:
+        return jsonify({'error': 'Image dimensions are too large'}), 413
+    
+    except (UnidentifiedImageError, ValueError) as e:
+        return jsonify({'error': f'Invalid image: {e}'}), 400
+    
+    except TimeoutError:
+        return jsonify({'error': 'Disease detection is busy, try again shortly'}), 503
+    
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return internal_error(e)
 
 
 @app.route('/yield-prediction', methods=['POST'])
+@cached_endpoint
 def yield_prediction():
     """Predict crop yield based on input parameters"""
     try:
@@ -109,59 +708,142 @@ def yield_prediction():
         crop = data.get('crop')
         location = data.get('location')
         soil_type = data.get('soil_type')
+        season = data.get('season')
+        
+        if season is not None and not isinstance(season, str):
+            return jsonify({'error': '"season" must be a string'}), 400
         
         # Get location data
-        district_data = location_matcher.get_district_data(location)
+        district_data = g.snapshot.location_matcher.get_district_data(location)
         
         if not district_data:
             return jsonify({'error': 'Location not found'}), 404
         
         # Predict yield
-        prediction = yield_predictor.predict_yield(
+        prediction = g.snapshot.yield_predictor.predict_yield(
             crop=crop,
             district_data=district_data,
-            soil_type=soil_type
+            soil_type=soil_type,
+            season=season
         )
         
         return jsonify(prediction)
     
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return internal_error(e)
 
 
 @app.route('/crop-recommendation', methods=['POST'])
+@cached_endpoint
 def crop_recommendation():
     """Recommend best crops for given conditions"""
     try:
         data = request.json
+        error = _batch_item_error(data, 'Request body')
+        if error:
+            return jsonify({'error': error}), 400
+        
         location = data.get('location')
-        soil_type = data.get('soil_type', 'loamy')
-        season = data.get('season', 'kharif')
+        soil_type = data.get('soil_type') or 'loamy'
+        season = data.get('season') or 'kharif'
+        rank_by = data.get('rank_by', 'suitability')
+        
+        if rank_by not in RANKINGS:
+            return jsonify({'error': f"rank_by must be one of: {', '.join(RANKINGS)}"}), 400
         
         # Get location climate data
-        district_data = location_matcher.get_district_data(location)
+        district_data = g.snapshot.location_matcher.get_district_data(location)
         
         if not district_data:
             return jsonify({'error': 'Location not found'}), 404
         
         # Get recommendations
-        recommendations = crop_predictor.recommend_crops(
+        recommendations = g.snapshot.crop_predictor.recommend_crops(
             district_data=district_data,
             soil_type=soil_type,
-            season=season
+            season=season,
+            rank_by=rank_by
         )
         
-        # Convert to JSON serializable format
-        recommendations = convert_to_json_serializable(recommendations)
-        
         return jsonify(recommendations)
     
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return internal_error(e)
 
 
+@app.route('/crop-recommendation/batch', methods=['POST'])
+def crop_recommendation_batch():
+    """Recommend crops for many (location, soil_type, season) tuples at once"""
+    try:
+        data = request.json or {}
+        items = data.get('items')
+        rank_by = data.get('rank_by', 'suitability')
+        
+        if not isinstance(items, list):
+            return jsonify({'error': '"items" must be a list'}), 400
+        
+        try:
+            top_n = int(data.get('top_n', 5))
+        except (TypeError, ValueError):
+            top_n = 0
+        if top_n < 1:
+            return jsonify({'error': '"top_n" must be a positive integer'}), 400
+        
+        if rank_by not in RANKINGS:
+            return jsonify({'error': f"rank_by must be one of: {', '.join(RANKINGS)}"}), 400
+        
+        if len(items) > app.config['MAX_BATCH_ITEMS']:
+            return jsonify({
+                'error': f"Batch too large (max {app.config['MAX_BATCH_ITEMS']} items)"
+            }), 413
+        
+        # Malformed items get their own error; the rest of the batch still runs
+        errors = [_batch_item_error(item) for item in items]
+        items = [item if error is None else {} for item, error in zip(items, errors)]
+        
+        # Resolve all locations up front, each distinct query only once
+        districts = g.snapshot.location_matcher.get_district_data_batch(
+            [item.get('location') for item in items]
+        )
+        
+        results = g.snapshot.crop_predictor.recommend_crops_batch(
+            [
+                {
+                    'district_data': district_data,
+                    'soil_type': item.get('soil_type', 'loamy'),
+                    'season': item.get('season', 'kharif'),
+                    **({'error': error} if error else {})
+                }
+                for item, district_data, error in zip(items, districts, errors)
+            ],
+            top_n=top_n,
+            rank_by=rank_by
+        )
+        
+        return jsonify({
+            'results': [{'index': i, **result} for i, result in enumerate(results)],
+            'count': len(results),
+            'errors': sum(1 for result in results if 'error' in result)
+        })
+    
+    except Exception as e:
+        return internal_error(e)
+
+
+def _batch_item_error(item, name='Item'):
+    """Why a batch item (or single request) cannot be scored, or None if its fields have the right types"""
+    if not isinstance(item, dict):
+        return f'{name} must be an object'
+    
+    for field in ('location', 'soil_type', 'season'):
+        if item.get(field) is not None and not isinstance(item[field], str):
+            return f'"{field}" must be a string'
+    
+    return None
+
 
 @app.route('/farm-report', methods=['POST'])
+@cached_endpoint
 def farm_report():
     """Generate comprehensive farm report"""
     try:
@@ -172,11 +854,17 @@ def farm_report():
         language = data.get('language', 'English')
         
         # Get location data
-        district_data = location_matcher.get_district_data(location)
+        district_data = g.snapshot.location_matcher.get_district_data(location)
         
         if not district_data:
             return jsonify({'error': 'Location not found'}), 404
         
+        zone_code, region = g.snapshot.location_matcher.zones.get(district_data['DISTRICT_ID'], (None, None))
+        
+        # Every section runs concurrently under its own deadline
+        sections, timings = report_engine.run({'district_data': district_data, 'snapshot': g.snapshot})
+        partial = any(timing['status'] != 'ok' for timing in timings.values())
+        
         # Generate comprehensive report
         report = {
             'location_analysis': {
@@ -184,18 +872,26 @@ def farm_report():
                 'state': district_data['STATE_UT_NAME'],
                 'annual_rainfall': district_data['ANNUAL'],
                 'monsoon_rainfall': district_data['Jun-Sep'],
+                'agro_ecological_zone': zone_code,
+                'region': region,
             },
-            'recommended_crops': crop_predictor.recommend_crops(district_data),
-            'seasonal_planning': _generate_seasonal_plan(district_data),
-            'irrigation_advice': _generate_irrigation_advice(district_data),
-            'soil_management': _generate_soil_advice(district_data),
-            'language': language
+            **sections,
+            'language': language,
+            'sections': timings,
+            'partial': partial
         }
         
-        return jsonify(report)
+        response = jsonify(report)
+        if partial:
+            # Do not let the response cache keep an incomplete report
+            response.headers['Cache-Control'] = 'no-store'
+        elif sections.get('current_weather') is not None:
+            # Live weather goes stale long before the rest of the report
+            response.cache_control.max_age = weather_client.current_ttl
+        return response
     
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return internal_error(e)
 
 
 def _generate_seasonal_plan(district_data):
@@ -257,4 +953,6 @@ def _generate_soil_advice(district_data):
 
 
 if __name__ == '__main__':
+    # Development server; see wsgi.py and gunicorn.conf.py for production
+    warm_up()
     app.run(debug=True, host='0.0.0.0', port=5000)
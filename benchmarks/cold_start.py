@@ -0,0 +1,64 @@
+"""
+Cold-start benchmark: retraining the crop model vs loading the artifact.
+
+Each run happens in a fresh interpreter so that imports, page cache and
+allocator state match what a newly forked worker sees.
+
+Usage:
+    python -m benchmarks.cold_start [--runs 5]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+CHILD = """
+import json, resource, sys, time
+start = time.perf_counter()
+from utils.data_loader import DataLoader
+from models.crop_predictor import CropPredictor
+import_time = time.perf_counter() - start
+t0 = time.perf_counter()
+CropPredictor(DataLoader(), retrain={retrain})
+build_time = time.perf_counter() - t0
+rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+sys.stderr.write(json.dumps({{'import': import_time, 'build': build_time, 'rss_mb': rss_mb}}))
+"""
+
+
+def run_once(retrain):
+    """Start a fresh interpreter and return its timings"""
+    result = subprocess.run(
+        [sys.executable, '-c', CHILD.format(retrain=retrain)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True
+    )
+    return json.loads(result.stderr.strip().splitlines()[-1])
+
+
+def summarize(label, runs):
+    builds = [r['build'] for r in runs]
+    print(f"{label:<10} build median {statistics.median(builds) * 1000:8.1f} ms   "
+          f"min {min(builds) * 1000:8.1f} ms   "
+          f"peak RSS {max(r['rss_mb'] for r in runs):7.1f} MB")
+    return statistics.median(builds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    # Make sure an up-to-date artifact exists before timing the load path
+    run_once(retrain=False)
+
+    retrain = summarize('retrain', [run_once(True) for _ in range(args.runs)])
+    load = summarize('artifact', [run_once(False) for _ in range(args.runs)])
+    print(f"Speed-up: {retrain / load:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Single-row latency and accuracy of the crop model's inference paths.
+
+Trains the production RandomForest configuration on a stratified split of
+Crop_recommendation.csv and compares, on the held-out rows:
+  1. sklearn's predict_proba (the previous serving path);
+  2. the same forest compiled to flat node arrays (CompiledForest);
+  3. compiled subsets of the forest with fewer trees, chosen greedily to
+     reproduce the full forest's predictions on the training split.
+
+Usage:
+    python -m benchmarks.crop_inference [--trees 50 25 10] [--test-size 0.2]
+"""
+import argparse
+import time
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+from models.compiled_forest import CompiledForest
+from models.crop_predictor import FEATURES, MODEL_PARAMS
+from utils.data_loader import DataLoader
+
+
+def latency_us(predict_proba, X, repeat=3):
+    """p50 and p99 single-row latency in microseconds"""
+    predict_proba(X[:1])
+    samples = []
+    for _ in range(repeat):
+        for i in range(len(X)):
+            t0 = time.perf_counter()
+            predict_proba(X[i:i + 1])
+            samples.append((time.perf_counter() - t0) * 1e6)
+    return np.percentile(samples, 50), np.percentile(samples, 99)
+
+
+def batch_us_per_row(predict_proba, X):
+    t0 = time.perf_counter()
+    predict_proba(X)
+    return (time.perf_counter() - t0) * 1e6 / len(X)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--trees', type=int, nargs='+', default=[50, 25, 10],
+                        help='Tree counts of the pruned variants')
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--latency-rows', type=int, default=200,
+                        help='Held-out rows timed one at a time')
+    args = parser.parse_args()
+
+    crop_data = DataLoader().get_crop_data()
+    X = crop_data[FEATURES].to_numpy(dtype=float)
+    y = crop_data['label'].to_numpy()
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=args.test_size, stratify=y, random_state=42
+    )
+
+    scaler = StandardScaler().fit(X_train)
+    X_train, X_test = scaler.transform(X_train), scaler.transform(X_test)
+
+    t0 = time.perf_counter()
+    forest = RandomForestClassifier(**MODEL_PARAMS).fit(X_train, y_train)
+    print(f"Trained {MODEL_PARAMS['n_estimators']} trees on {len(X_train)} rows "
+          f"in {time.perf_counter() - t0:.2f}s; {len(X_test)} held out")
+
+    compiled = CompiledForest.from_sklearn(forest)
+    expected = forest.predict_proba(X_test)
+    assert np.array_equal(compiled.predict_proba(X_test), expected)
+    print("✅ Compiled forest matches sklearn predict_proba exactly")
+
+    reference = forest.classes_[np.argmax(expected, axis=1)]
+    order = compiled.select_trees(X_train, max(args.trees))
+
+    variants = [('sklearn predict_proba', forest.n_estimators, None, forest.predict_proba),
+                ('compiled', compiled.n_trees, compiled.n_nodes, compiled.predict_proba)]
+    for n_trees in sorted(args.trees, reverse=True):
+        pruned = CompiledForest.from_sklearn(forest, order[:n_trees])
+        variants.append((f'compiled, {n_trees} trees', n_trees, pruned.n_nodes, pruned.predict_proba))
+
+    rows = X_test[:args.latency_rows]
+    print(f"\n{'model':<24}{'trees':>6}{'nodes':>8}{'p50 us':>10}{'p99 us':>10}"
+          f"{'batch us/row':>14}{'accuracy':>10}{'agrees':>8}")
+    for label, n_trees, n_nodes, predict_proba in variants:
+        p50, p99 = latency_us(predict_proba, rows)
+        per_row = batch_us_per_row(predict_proba, X_test)
+        predicted = forest.classes_[np.argmax(predict_proba(X_test), axis=1)]
+        accuracy = np.mean(predicted == y_test)
+        agreement = np.mean(predicted == reference)
+        print(f"{label:<24}{n_trees:>6}{n_nodes or '':>8}{p50:>10.0f}{p99:>10.0f}"
+              f"{per_row:>14.1f}{accuracy:>10.2%}{agreement:>8.1%}")
+
+
+if __name__ == '__main__':
+    main()
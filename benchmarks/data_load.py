@@ -0,0 +1,103 @@
+"""
+Startup-time and memory report per dataset: CSV/XLSX parse vs binary cache.
+
+Every measurement runs in a fresh interpreter. RSS is the resident set
+growth caused by the load; "private" excludes file-backed pages that are
+shared between processes (memory-mapped cache columns), which is what each
+extra forked worker actually costs.
+
+Usage:
+    python build_artifacts.py data
+    python -m benchmarks.data_load [--runs 3]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from utils.data_cache import SCHEMAS
+
+CHILD = """
+import json, sys, time
+import pandas as pd
+from utils import data_cache
+
+def memory_kb():
+    fields = {{}}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(':'):
+                    fields[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss, rss
+    return fields['Rss'], fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+
+path = {path!r}
+rss0, private0 = memory_kb()
+start = time.perf_counter()
+if {use_cache}:
+    df = data_cache.load_table(path)
+else:
+    df = data_cache._read_source(path)
+# Touch every column, as a request handler eventually would
+for column in df.columns:
+    df[column].to_numpy()
+elapsed = time.perf_counter() - start
+rss1, private1 = memory_kb()
+sys.stderr.write(json.dumps({{
+    'ms': elapsed * 1000,
+    'rss_kb': rss1 - rss0,
+    'private_kb': private1 - private0,
+    'frame_kb': df.memory_usage(deep=True).sum() / 1024
+}}))
+"""
+
+
+def run_once(path, use_cache):
+    result = subprocess.run(
+        [sys.executable, '-c', CHILD.format(path=path, use_cache=use_cache)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True
+    )
+    return json.loads(result.stderr.strip().splitlines()[-1])
+
+
+def measure(path, use_cache, runs):
+    samples = [run_once(path, use_cache) for _ in range(runs)]
+    return {
+        key: statistics.median(s[key] for s in samples)
+        for key in samples[0]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--data-dir', default='data')
+    args = parser.parse_args()
+
+    header = f"{'dataset':<58}{'source ms':>10}{'cache ms':>10}{'src RSS KB':>12}{'cache RSS KB':>13}{'cache priv KB':>14}{'frame KB src/cache':>20}"
+    print(header)
+    print('-' * len(header))
+
+    for filename in SCHEMAS:
+        path = os.path.join(args.data_dir, filename)
+        if not os.path.exists(path):
+            continue
+
+        source = measure(path, False, args.runs)
+        cache = measure(path, True, args.runs)
+        print(f"{filename:<58}{source['ms']:>10.1f}{cache['ms']:>10.1f}"
+              f"{source['rss_kb']:>12.0f}{cache['rss_kb']:>13.0f}{cache['private_kb']:>14.0f}"
+              f"{source['frame_kb']:>10.0f}/{cache['frame_kb']:<9.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Disease detector inference benchmark on CPU.
+
+Trains a throwaway model on synthetic leaf-like images (so it runs without
+a labelled dataset), then reports:
+  1. direct batched inference: images/s and p50/p99 latency per batch size;
+  2. micro-batched serving: concurrent clients calling detect(), with
+     per-request p50/p99 latency and throughput for several max_batch values.
+
+Usage:
+    python -m benchmarks.disease_inference [--image-size 512] [--clients 16]
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image
+from models.disease_detector import DiseaseDetector, SklearnBackend
+
+LABELS = {
+    'healthy': (60, 150, 50),
+    'rust': (170, 100, 40),
+    'powdery_mildew': (200, 210, 190),
+    'leaf_spot': (90, 110, 40),
+}
+
+
+def synthetic_images(n, size, rng):
+    """Noisy leaf-coloured images with label-specific tints and spots"""
+    images, labels = [], []
+    names = list(LABELS)
+
+    for i in range(n):
+        label = names[i % len(names)]
+        base = np.array(LABELS[label], dtype=float)
+        pixels = base + rng.normal(0, 25, (size, size, 3))
+
+        for _ in range(rng.integers(3, 12)):
+            y, x = rng.integers(0, size, 2)
+            r = rng.integers(size // 40 + 1, size // 10 + 2)
+            pixels[max(y - r, 0):y + r, max(x - r, 0):x + r] *= rng.uniform(0.5, 1.2)
+
+        images.append(Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)))
+        labels.append(label)
+
+    return images, labels
+
+
+def percentiles(samples_ms):
+    return np.percentile(samples_ms, 50), np.percentile(samples_ms, 99)
+
+
+def bench_direct(backend, images, batch_sizes, repeats):
+    print(f"\nDirect batched inference ({images[0].size[0]}px images)")
+    print(f"{'batch':>6}{'images/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+
+    for batch_size in batch_sizes:
+        timings = []
+        for r in range(repeats):
+            start = (r * batch_size) % (len(images) - batch_size + 1)
+            batch = images[start:start + batch_size]
+            t0 = time.perf_counter()
+            backend.predict_proba(batch)
+            timings.append((time.perf_counter() - t0) * 1000)
+
+        p50, p99 = percentiles(timings)
+        print(f"{batch_size:>6}{batch_size * 1000 / np.mean(timings):>12.1f}{p50:>10.2f}{p99:>10.2f}")
+
+
+def bench_serving(backend, images, max_batches, clients, requests_per_client, max_wait_ms):
+    print(f"\nMicro-batched serving ({clients} concurrent clients, max_wait {max_wait_ms} ms)")
+    print(f"{'max_batch':>10}{'images/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+
+    for max_batch in max_batches:
+        detector = DiseaseDetector(backend, max_batch=max_batch, max_wait_ms=max_wait_ms, timeout=60)
+        detector.warm_up()
+
+        def client(offset):
+            latencies = []
+            for i in range(requests_per_client):
+                img = images[(offset + i) % len(images)]
+                t0 = time.perf_counter()
+                detector.detect(img)
+                latencies.append((time.perf_counter() - t0) * 1000)
+            return latencies
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(clients) as pool:
+            latencies = [ms for result in pool.map(client, range(clients)) for ms in result]
+        elapsed = time.perf_counter() - t0
+
+        p50, p99 = percentiles(latencies)
+        print(f"{max_batch:>10}{len(latencies) / elapsed:>12.1f}{p50:>10.2f}{p99:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--image-size', type=int, default=512)
+    parser.add_argument('--train-images', type=int, default=200)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=20, help='Requests per client')
+    parser.add_argument('--max-wait-ms', type=float, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    train_images, train_labels = synthetic_images(args.train_images, 96, rng)
+    backend = SklearnBackend.train(train_images, train_labels)
+    images, _ = synthetic_images(64, args.image_size, rng)
+
+    bench_direct(backend, images, [1, 4, 8, 16, 32], repeats=30)
+    bench_serving(backend, images, [1, 4, 8, 16, 32], args.clients, args.requests, args.max_wait_ms)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""
+Local stand-in for the OpenWeatherMap /weather and /forecast endpoints.
+
+Responses are built from the JSON fixtures in benchmarks/fixtures, nudged
+deterministically by the requested coordinates, and delayed by a fixed
+latency so client-side caching and pooling can be measured offline.
+
+Usage:
+    python -m benchmarks.fake_weather_server [--port 8081] [--latency-ms 150]
+    WEATHER_API_URL=http://127.0.0.1:8081 python app.py
+"""
+import argparse
+import copy
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def _load_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name)) as f:
+        return json.load(f)
+
+
+class _Server(ThreadingHTTPServer):
+    request_queue_size = 128  # Accept bursts of concurrent clients
+
+
+class FakeWeatherServer:
+    """Threaded HTTP server serving fixture weather data on localhost"""
+
+    def __init__(self, port=0, latency_ms=150):
+        self.latency = latency_ms / 1000
+        self.current = _load_fixture('weather_current.json')
+        self.forecast = _load_fixture('weather_forecast.json')
+        self.requests = 0
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive, like the real API
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                server._handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = _Server(('127.0.0.1', port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _handle(self, handler):
+        with self._lock:
+            self.requests += 1
+
+        url = urlparse(handler.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        time.sleep(self.latency)
+
+        try:
+            lat, lon = float(params['lat']), float(params['lon'])
+        except (KeyError, ValueError):
+            return self._send(handler, 400, {'cod': '400', 'message': 'wrong latitude'})
+
+        if url.path.endswith('/weather'):
+            return self._send(handler, 200, self._current(lat, lon))
+        if url.path.endswith('/forecast'):
+            return self._send(handler, 200, self._forecast(lat, lon, int(params.get('cnt', 40))))
+        return self._send(handler, 404, {'cod': '404', 'message': 'not found'})
+
+    @staticmethod
+    def _send(handler, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    @staticmethod
+    def _offset(lat, lon):
+        # Cooler towards the north and the hills, wetter towards the coast
+        return (20 - lat) * 0.4, (lon - 78) * 0.05
+
+    def _current(self, lat, lon):
+        data = copy.deepcopy(self.current)
+        temp_offset, _ = self._offset(lat, lon)
+        data['coord'] = {'lat': lat, 'lon': lon}
+        data['main']['temp'] = round(data['main']['temp'] + temp_offset, 2)
+        return data
+
+    def _forecast(self, lat, lon, cnt):
+        temp_offset, rain_scale = self._offset(lat, lon)
+        template = self.forecast['list']
+        start = datetime.strptime(template[0]['dt_txt'], '%Y-%m-%d %H:%M:%S')
+
+        items = []
+        for i in range(cnt):
+            item = copy.deepcopy(template[i % len(template)])
+            moment = start + timedelta(hours=3 * i)
+            item['dt'] = template[0]['dt'] + 3 * 3600 * i
+            item['dt_txt'] = moment.strftime('%Y-%m-%d %H:%M:%S')
+            item['main']['temp'] = round(item['main']['temp'] + temp_offset, 2)
+            if 'rain' in item:
+                item['rain']['3h'] = round(max(item['rain']['3h'] * (1 + rain_scale), 0), 2)
+            items.append(item)
+
+        return {**self.forecast, 'cnt': cnt, 'list': items}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency-ms', type=float, default=150)
+    args = parser.parse_args()
+
+    server = FakeWeatherServer(args.port, args.latency_ms)
+    print(f"Serving fixture weather data at {server.url} ({args.latency_ms:.0f} ms latency)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""
+HTTP load test: requests per second and latency for each endpoint.
+
+Runs a fixed-duration closed loop per endpoint: --concurrency clients,
+each with its own keep-alive session, send requests back to back. Request
+bodies rotate through real district names. Add --cold to make every body
+unique, which bypasses the response cache.
+
+Usage:
+    gunicorn -c gunicorn.conf.py wsgi:app &
+    python -m benchmarks.load_test --url http://127.0.0.1:5000
+
+    # or let the harness start (and stop) gunicorn itself:
+    python -m benchmarks.load_test --spawn --workers 4 --threads 4
+"""
+import argparse
+import itertools
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import numpy as np
+import requests
+
+
+def scenarios(districts, cold):
+    """(name, method, path, request-kwargs factory) per endpoint"""
+    counter = itertools.count()
+
+    def body(**fields):
+        def make():
+            i = next(counter)
+            payload = {k: v(i) if callable(v) else v for k, v in fields.items()}
+            if cold:
+                payload['nonce'] = i
+            return {'json': payload}
+        return make
+
+    location = lambda i: districts[i % len(districts)]
+    static = lambda: {'headers': {'Accept-Encoding': 'gzip'}}
+
+    return [
+        ('GET /api/locations', 'GET', '/api/locations', static),
+        ('GET /api/crops', 'GET', '/api/crops', static),
+        ('GET /api/locations/search', 'GET', '/api/locations/search',
+         lambda: {'params': {'q': location(next(counter))[:6]}}),
+        ('GET /api/nearby', 'GET', '/api/nearby',
+         lambda: {'params': {'lat': 18.5 + (next(counter) % 50) / 10, 'lon': 73.8}}),
+        ('POST /crop-recommendation', 'POST', '/crop-recommendation', body(location=location)),
+        ('POST /crop-recommendation profit', 'POST', '/crop-recommendation',
+         body(location=location, rank_by='profit')),
+        ('POST /crop-recommendation/batch', 'POST', '/crop-recommendation/batch',
+         lambda: {'json': {'items': [{'location': location(next(counter))} for _ in range(100)]}}),
+        ('POST /yield-prediction', 'POST', '/yield-prediction',
+         body(location=location, crop='rice', soil_type='loamy')),
+        ('POST /farm-report', 'POST', '/farm-report', body(location=location)),
+        ('GET /api/yield/best-districts', 'GET', '/api/yield/best-districts',
+         lambda: {'params': {'crop': 'rice', 'k': 20}}),
+        ('GET /api/prices', 'GET', '/api/prices', lambda: {'params': {'commodity': 'Onion'}}),
+        ('GET /api/rainfall/trends', 'GET', '/api/rainfall/trends', lambda: {'params': {'years': 10}}),
+    ]
+
+
+def run_scenario(url, method, path, make_kwargs, concurrency, duration):
+    latencies, errors, hits = [], [0], [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client():
+        session = requests.Session()
+        local_latencies, local_errors, local_hits = [], 0, 0
+        while time.perf_counter() < deadline:
+            kwargs = make_kwargs()
+            t0 = time.perf_counter()
+            try:
+                response = session.request(method, url + path, timeout=30, **kwargs)
+                ok = response.status_code < 400
+                local_hits += response.headers.get('X-Cache') == 'HIT'
+            except requests.RequestException:
+                ok = False
+            local_latencies.append((time.perf_counter() - t0) * 1000)
+            local_errors += not ok
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+            hits[0] += local_hits
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    t0 = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - t0
+
+    return len(latencies) / elapsed, np.array(latencies), errors[0], hits[0]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def spawn_server(workers, threads):
+    """Start gunicorn with the production config and wait for /api/ready"""
+    port = free_port()
+    env = {**os.environ, 'BIND': f'127.0.0.1:{port}',
+           'WEB_CONCURRENCY': str(workers), 'GUNICORN_THREADS': str(threads)}
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f'http://127.0.0.1:{port}'
+
+    for _ in range(300):
+        try:
+            if requests.get(f'{url}/api/ready', timeout=1).status_code == 200:
+                return process, url
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+
+    process.terminate()
+    raise RuntimeError('gunicorn did not become ready within 60 s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=5, help='Seconds per endpoint')
+    parser.add_argument('--only', help='Run only endpoints whose name contains this text')
+    parser.add_argument('--cold', action='store_true', help='Unique bodies (no response cache hits)')
+    parser.add_argument('--spawn', action='store_true', help='Start gunicorn for the run')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+
+    process = None
+    url = args.url
+    if args.spawn:
+        process, url = spawn_server(args.workers, args.threads)
+        print(f"Started gunicorn at {url} ({args.workers} workers x {args.threads} threads)")
+
+    try:
+        ready = requests.get(f'{url}/api/ready', timeout=5).json()
+        if not ready.get('ready'):
+            print('⚠️  Server reports it is not ready yet')
+
+        hierarchy = requests.get(f'{url}/api/locations', timeout=5).json()
+        districts = [f'{d}, {s}' for s, names in hierarchy.items() for d in names]
+
+        print(f"\n{args.concurrency} concurrent clients, {args.duration:.0f} s per endpoint"
+              f"{' (cold cache)' if args.cold else ''}")
+        print(f"{'endpoint':<36}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}{'cache hits':>12}")
+
+        for name, method, path, make_kwargs in scenarios(districts, args.cold):
+            if args.only and args.only not in name:
+                continue
+            rps, latencies, errors, hits = run_scenario(
+                url, method, path, make_kwargs, args.concurrency, args.duration
+            )
+            print(f"{name:<36}{rps:>9.0f}{np.percentile(latencies, 50):>9.1f}"
+                  f"{np.percentile(latencies, 99):>9.1f}{errors:>8}{hits / len(latencies):>12.0%}")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Fuzzy location matching: indexed search vs the original linear scan.
+
+Queries are every district name with one random typo, plus every name
+unchanged. The linear scan is the previous implementation of
+LocationMatcher._fuzzy_match (iterrows + fuzz.ratio on every district).
+
+Usage:
+    python -m benchmarks.location_match [--seed 0]
+"""
+import argparse
+import random
+import string
+import time
+from fuzzywuzzy import fuzz
+from utils.data_loader import DataLoader
+from utils.location_matcher import LocationMatcher, FUZZY_THRESHOLD
+
+
+def linear_scan(district_data, query):
+    """Previous _fuzzy_match: score every district row"""
+    best_match = None
+    best_score = 0
+
+    for _, row in district_data.iterrows():
+        score = fuzz.ratio(query.upper(), row['DISTRICT'].upper())
+        if score > best_score:
+            best_score = score
+            best_match = row
+
+    return best_match['DISTRICT'] if best_score > FUZZY_THRESHOLD else None
+
+
+def add_typo(name, rng):
+    """Replace, drop or insert one character"""
+    i = rng.randrange(len(name))
+    op = rng.choice('rdi')
+    if op == 'r':
+        return name[:i] + rng.choice(string.ascii_uppercase) + name[i + 1:]
+    if op == 'd' and len(name) > 3:
+        return name[:i] + name[i + 1:]
+    return name[:i] + rng.choice(string.ascii_uppercase) + name[i:]
+
+
+def timed(fn, queries):
+    start = time.perf_counter()
+    results = [fn(q) for q in queries]
+    return results, (time.perf_counter() - start) / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    matcher = LocationMatcher(DataLoader())
+    rng = random.Random(args.seed)
+    names = list(matcher.district_data['DISTRICT'])
+    queries = [add_typo(n, rng) for n in names] + names
+
+    def indexed(query):
+        match = matcher._fuzzy_match(query)
+        return match['DISTRICT'] if match else None
+
+    legacy, legacy_time = timed(lambda q: linear_scan(matcher.district_data, q), queries)
+
+    matcher.index.search.cache_clear()
+    cold, cold_time = timed(indexed, queries)
+    warm, warm_time = timed(indexed, queries)
+
+    agree = sum(a == b for a, b in zip(legacy, cold)) / len(queries)
+    print(f"{len(queries)} queries over {len(names)} districts ({len(matcher.index)} indexed names)")
+    print(f"linear scan     {legacy_time * 1e6:10.1f} us/query")
+    print(f"index (cold)    {cold_time * 1e6:10.1f} us/query   {legacy_time / cold_time:6.0f}x")
+    print(f"index (cached)  {warm_time * 1e6:10.1f} us/query   {legacy_time / warm_time:6.0f}x")
+    print(f"same district as linear scan: {agree:.1%}")
+
+
+if __name__ == '__main__':
+    main()
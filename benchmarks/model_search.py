@@ -0,0 +1,185 @@
+"""
+Model family and size search for the crop recommendation model.
+
+Evaluates random forests, extra-trees, histogram gradient boosting and
+k-NN (all on standardized features, like CropPredictor) on
+Crop_recommendation.csv. Cross-validation and fitting run in a process
+pool, one candidate per task. Latency is measured afterwards in this
+process, one model at a time, so that the timings do not compete for CPU.
+
+Reported per candidate:
+- mean and std of the stratified k-fold accuracy
+- training time on the full dataset
+- artifact size, as written by ArtifactStore (uncompressed joblib)
+- single-row p50 predict_proba latency, through sklearn and, for tree
+  ensembles, through CompiledForest (the serving path)
+- batch latency per row over the whole dataset
+
+Rows on the Pareto front (no other candidate is at least as accurate,
+as fast and as small, and strictly better in one of them) are marked *.
+
+Usage:
+    python -m benchmarks.model_search [--folds 5] [--workers N] [--families rf knn]
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import joblib
+import numpy as np
+from sklearn.ensemble import ExtraTreesClassifier, HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.model_selection import StratifiedKFold, cross_val_score
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from models.compiled_forest import CompiledForest
+from models.crop_predictor import FEATURES, MODEL_PARAMS
+from utils.data_loader import DataLoader
+
+FAMILIES = {
+    'rf': RandomForestClassifier,
+    'extra_trees': ExtraTreesClassifier,
+    'hist_gb': HistGradientBoostingClassifier,
+    'knn': KNeighborsClassifier,
+}
+
+
+def candidates(families):
+    """(family, params) for every configuration in the search grid"""
+    grid = []
+    for family in families:
+        if family in ('rf', 'extra_trees'):
+            for n_estimators in (10, 25, 50, 100, 200):
+                for max_depth in (10, 20, None):
+                    grid.append((family, {'n_estimators': n_estimators, 'max_depth': max_depth,
+                                          'random_state': 42}))
+        elif family == 'hist_gb':
+            for max_iter in (25, 50, 100):
+                for max_leaf_nodes in (15, 31):
+                    grid.append((family, {'max_iter': max_iter, 'max_leaf_nodes': max_leaf_nodes,
+                                          'early_stopping': False, 'random_state': 42}))
+        elif family == 'knn':
+            for n_neighbors in (1, 3, 5, 11, 21):
+                for weights in ('uniform', 'distance'):
+                    grid.append((family, {'n_neighbors': n_neighbors, 'weights': weights}))
+    return grid
+
+
+def evaluate(family, params, X, y, folds):
+    """Cross-validate one candidate, then fit it on everything (runs in a worker)"""
+    model = FAMILIES[family](**params)
+    cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=42)
+    scores = cross_val_score(make_pipeline(StandardScaler(), model), X, y, cv=cv)
+
+    scaler = StandardScaler().fit(X)
+    t0 = time.perf_counter()
+    model.fit(scaler.transform(X), y)
+    train_s = time.perf_counter() - t0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'model.joblib')
+        joblib.dump({'scaler': scaler, 'model': model}, path)
+        size = os.path.getsize(path)
+
+    return {
+        'family': family,
+        'params': params,
+        'accuracy': scores.mean(),
+        'accuracy_std': scores.std(),
+        'train_s': train_s,
+        'size_kb': size / 1024,
+        'scaler': scaler,
+        'model': model,
+    }
+
+
+def p50_single_row_us(predict_proba, X, rows=200):
+    predict_proba(X[:1])
+    samples = []
+    for i in range(min(rows, len(X))):
+        t0 = time.perf_counter()
+        predict_proba(X[i:i + 1])
+        samples.append((time.perf_counter() - t0) * 1e6)
+    return float(np.percentile(samples, 50))
+
+
+def measure_latency(result, X):
+    X_scaled = result['scaler'].transform(X)
+    model = result['model']
+
+    result['sklearn_us'] = p50_single_row_us(model.predict_proba, X_scaled)
+    result['compiled_us'] = None
+    serving = model.predict_proba
+    if result['family'] in ('rf', 'extra_trees'):
+        compiled = CompiledForest.from_sklearn(model)
+        result['compiled_us'] = p50_single_row_us(compiled.predict_proba, X_scaled)
+        serving = compiled.predict_proba
+    result['serving_us'] = result['compiled_us'] or result['sklearn_us']
+
+    t0 = time.perf_counter()
+    serving(X_scaled)
+    result['batch_us'] = (time.perf_counter() - t0) * 1e6 / len(X)
+
+
+def pareto_front(results):
+    """Mark results not dominated on (accuracy, serving latency, size)"""
+    for r in results:
+        r['pareto'] = not any(
+            o['accuracy'] >= r['accuracy'] and o['serving_us'] <= r['serving_us']
+            and o['size_kb'] <= r['size_kb']
+            and (o['accuracy'] > r['accuracy'] or o['serving_us'] < r['serving_us']
+                 or o['size_kb'] < r['size_kb'])
+            for o in results
+        )
+
+
+def describe(result):
+    params = {k: v for k, v in result['params'].items() if k not in ('random_state', 'early_stopping')}
+    return f"{result['family']} " + ','.join(f"{k}={v}" for k, v in params.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--families', nargs='+', choices=list(FAMILIES), default=list(FAMILIES))
+    parser.add_argument('--pareto-only', action='store_true', help='Print only the Pareto front')
+    args = parser.parse_args()
+
+    crop_data = DataLoader().get_crop_data()
+    X = crop_data[FEATURES].to_numpy(dtype=float)
+    y = crop_data['label'].to_numpy()
+    grid = candidates(args.families)
+    print(f"Evaluating {len(grid)} candidates with {args.folds}-fold CV on {len(X)} rows "
+          f"({args.workers} worker processes)")
+
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(evaluate, family, params, X, y, args.folds) for family, params in grid]
+        for future in as_completed(futures):
+            results.append(future.result())
+    print(f"Search finished in {time.perf_counter() - start:.1f}s; measuring latency")
+
+    for result in results:
+        measure_latency(result, X)
+    pareto_front(results)
+
+    print(f"\n{'':2}{'model':<44}{'cv acc':>9}{'±':>6}{'train s':>9}{'size KB':>10}"
+          f"{'sklearn us':>12}{'compiled us':>13}{'batch us':>10}")
+    for r in sorted(results, key=lambda r: (-r['accuracy'], r['serving_us'])):
+        if args.pareto_only and not r['pareto']:
+            continue
+        marker = '*' if r['pareto'] else ' '
+        if r['family'] == 'rf' and r['params'] == MODEL_PARAMS:
+            marker += '<'
+        compiled = f"{r['compiled_us']:.0f}" if r['compiled_us'] is not None else '-'
+        print(f"{marker:<2}{describe(r):<44}{r['accuracy']:>9.2%}{r['accuracy_std']:>6.2%}"
+              f"{r['train_s']:>9.2f}{r['size_kb']:>10.0f}{r['sklearn_us']:>12.0f}"
+              f"{compiled:>13}{r['batch_us']:>10.1f}")
+    print("\n* Pareto front on (cv accuracy, serving latency, size)   < current production model")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Price store benchmark: incremental ingest and query latency at scale.
+
+Synthesizes daily mandi dumps by replaying price.unknown over consecutive
+days with noisy prices, ingests them as a few bulk files plus one extra
+daily dump (incremental merge), then compares query latency against a
+pandas boolean-mask scan of the same rows.
+
+Usage:
+    python -m benchmarks.price_query [--days 900] [--bulk-files 4]
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from utils.price_store import PRICE_SOURCE, PriceStore
+
+
+def daily_dumps(base, first_day, days, rng):
+    """One DataFrame with `days` copies of base, one per arrival date"""
+    n = len(base)
+    dates = pd.date_range(first_day, periods=days).strftime('%d/%m/%Y')
+    frame = base.loc[np.tile(np.arange(n), days)].reset_index(drop=True)
+    frame['arrival_date'] = np.repeat(dates.to_numpy(), n)
+    noise = rng.normal(1, 0.08, len(frame))
+    for column in ['min_price', 'max_price', 'modal_price']:
+        frame[column] = (frame[column].to_numpy() * noise).round().astype(int)
+    return frame
+
+
+def timed(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return np.percentile(samples, 50), np.percentile(samples, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', type=int, default=900)
+    parser.add_argument('--bulk-files', type=int, default=4)
+    parser.add_argument('--queries', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    base = pd.read_csv(PRICE_SOURCE)
+    store = PriceStore()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        per_file = args.days // args.bulk_files
+        paths = []
+        for i in range(args.bulk_files):
+            first = pd.Timestamp('2017-01-01') + pd.Timedelta(days=i * per_file)
+            path = os.path.join(tmp, f'bulk_{i}.csv')
+            daily_dumps(base, first, per_file, rng).to_csv(path, index=False)
+            paths.append(path)
+
+        t0 = time.perf_counter()
+        for path in paths:
+            store.ingest(path)
+        elapsed = time.perf_counter() - t0
+        print(f"Bulk ingest: {len(store):,} rows in {elapsed:.1f} s ({len(store) / elapsed:,.0f} rows/s)")
+
+        last = pd.Timestamp('2017-01-01') + pd.Timedelta(days=args.bulk_files * per_file)
+        path = os.path.join(tmp, 'daily.csv')
+        daily_dumps(base, last, 1, rng).to_csv(path, index=False)
+        t0 = time.perf_counter()
+        added = store.ingest(path)
+        print(f"Incremental daily dump: {added:,} rows merged in "
+              f"{(time.perf_counter() - t0) * 1000:.0f} ms (total {len(store):,})")
+
+    memory = sum(values.nbytes for values in store.columns.values()) + store.key.nbytes
+    print(f"Column memory: {memory / 1e6:.1f} MB ({memory / len(store):.1f} bytes/row)")
+
+    # The same rows as a pandas frame, for the per-query scan baseline
+    frame = pd.DataFrame({
+        'commodity': pd.Categorical.from_codes(store.columns['commodity'], store.categories['commodity']),
+        'district': pd.Categorical.from_codes(store.columns['district'], store.categories['district']),
+        'day': store.columns['day'],
+        'modal_price': store.columns['modal_price'],
+    })
+
+    pairs = base[['commodity', 'district']].drop_duplicates().to_numpy()
+    picks = pairs[rng.integers(0, len(pairs), args.queries)]
+    first_day, last_day = int(store.columns['day'].min()), int(store.columns['day'].max())
+    starts = rng.integers(first_day, last_day - 30, args.queries)
+
+    def store_queries():
+        for (commodity, district), start in zip(picks, starts):
+            store.query(commodity, district, int(start), int(start) + 30)
+
+    def store_summaries():
+        for (commodity, district), start in zip(picks, starts):
+            store.modal_summary(commodity, district, int(start), int(start) + 30)
+
+    def pandas_queries():
+        for (commodity, district), start in zip(picks, starts):
+            frame[(frame['commodity'] == commodity) & (frame['district'] == district)
+                  & (frame['day'] >= start) & (frame['day'] <= start + 30)]
+
+    print(f"\n{'query (30-day range)':<36}{'p50 ms':>10}{'p99 ms':>10}")
+    for label, fn, n in [
+        ('store.query (commodity+district)', store_queries, args.queries),
+        ('store.modal_summary', store_summaries, args.queries),
+        ('pandas boolean mask', pandas_queries, args.queries),
+    ]:
+        p50, p99 = timed(fn, 3)
+        print(f"{label:<36}{p50 / n:>10.3f}{p99 / n:>10.3f}")
+
+    commodity = base['commodity'].value_counts().index[0]
+    p50, p99 = timed(lambda: store.modal_summary(commodity), 20)
+    print(f"{f'modal_summary({commodity}, all districts)':<36}{p50:>10.3f}{p99:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
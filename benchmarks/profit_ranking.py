@@ -0,0 +1,104 @@
+"""
+Per-request cost of profit-aware crop ranking.
+
+Compares, for every district in the rainfall dataset:
+  1. recommend_crops ranked by suitability (the existing endpoint);
+  2. recommend_crops ranked by profit (vectorized yields + price lookup);
+  3. a naive profit ranking calling predict_yield and querying the price
+     store once per crop.
+It also checks that the vectorized yields match predict_yield.
+
+Usage:
+    python -m benchmarks.profit_ranking [--soil loamy] [--season kharif]
+"""
+import argparse
+import time
+import numpy as np
+from models.crop_predictor import CropPredictor, CROP_COMMODITIES, QUINTALS_PER_TONNE
+from models.yield_predictor import YieldPredictor
+from utils.data_loader import DataLoader
+from utils.location_matcher import LocationMatcher
+from utils.price_store import PriceStore
+
+
+def naive_profit_ranking(crop_predictor, yield_predictor, price_store, district_data,
+                         soil_type, season, top_n=5):
+    """Profit ranking without vectorization: one yield and price lookup per crop"""
+    features = np.array([crop_predictor._build_features(district_data, soil_type, season)])
+    probabilities = crop_predictor.model.predict_proba(crop_predictor.scaler.transform(features))[0]
+
+    scored = []
+    for crop, probability in zip(crop_predictor.model.classes_, probabilities):
+        crop = str(crop)
+        predicted = yield_predictor.predict_yield(crop, district_data, soil_type, season)
+        price = None
+        for commodity in CROP_COMMODITIES.get(crop, []):
+            summary = (price_store.modal_summary(commodity, district_data['DISTRICT'])
+                       or price_store.modal_summary(commodity))
+            if summary:
+                price = summary['median_modal_price']
+                break
+        if price is not None:
+            revenue = predicted['predicted_yield_per_hectare'] * QUINTALS_PER_TONNE * price
+            scored.append((probability * revenue, crop))
+
+    return sorted(scored, reverse=True)[:top_n]
+
+
+def timed(fn, items):
+    samples = []
+    for item in items:
+        t0 = time.perf_counter()
+        fn(item)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return np.percentile(samples, 50), np.percentile(samples, 99), np.mean(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--soil', default='loamy')
+    parser.add_argument('--season', default='kharif')
+    args = parser.parse_args()
+
+    data_loader = DataLoader()
+    yield_predictor = YieldPredictor(data_loader)
+    price_store = PriceStore.open()
+    location_matcher = LocationMatcher(data_loader)
+    crop_predictor = CropPredictor(data_loader, yield_predictor=yield_predictor, price_store=price_store,
+                                   gazetteer=location_matcher.gazetteer)
+    districts = location_matcher.records
+
+    crops = [str(c) for c in crop_predictor.model.classes_]
+    for district in districts[:50]:
+        expected = [yield_predictor.predict_yield(c, district, args.soil, args.season)['predicted_yield_per_hectare']
+                    for c in crops]
+        np.testing.assert_allclose(
+            np.round(yield_predictor.predict_yields(crops, [district], [args.season])[0], 2), expected
+        )
+    print(f"✅ Vectorized yields match predict_yield for {len(crops)} crops")
+
+    # Warm up model and caches
+    crop_predictor.recommend_crops(districts[0], args.soil, args.season, rank_by='profit')
+
+    print(f"\n{len(districts)} districts, one request each")
+    print(f"{'ranking':<28}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for label, fn in [
+        ('suitability', lambda d: crop_predictor.recommend_crops(d, args.soil, args.season)),
+        ('profit (vectorized)', lambda d: crop_predictor.recommend_crops(
+            d, args.soil, args.season, rank_by='profit')),
+        ('profit (per-crop loop)', lambda d: naive_profit_ranking(
+            crop_predictor, yield_predictor, price_store, d, args.soil, args.season)),
+    ]:
+        p50, p99, mean = timed(fn, districts)
+        print(f"{label:<28}{p50:>10.2f}{p99:>10.2f}{mean:>10.2f}")
+
+    items = [{'district_data': d, 'soil_type': args.soil, 'season': args.season} for d in districts]
+    for rank_by in ('suitability', 'profit'):
+        t0 = time.perf_counter()
+        crop_predictor.recommend_crops_batch(items, rank_by=rank_by)
+        elapsed = (time.perf_counter() - t0) * 1000
+        print(f"{f'batch of {len(items)}, {rank_by}':<28}{elapsed / len(items):>30.3f} ms/item")
+
+
+if __name__ == '__main__':
+    main()
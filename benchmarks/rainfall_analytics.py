@@ -0,0 +1,129 @@
+"""
+Rainfall analytics: per-call pandas filtering vs the precomputed RainfallCube.
+
+The legacy implementation filtered the full 1901-2015 table by SUBDIVISION
+on every call and recomputed means, percentiles and np.polyfit. This
+reports per-call latency for trends, drought risk and planting windows,
+the cost of answering all subdivisions at once, and checks that both
+implementations agree.
+
+Usage:
+    python -m benchmarks.rainfall_analytics [--repeats 5]
+"""
+import argparse
+import os
+import time
+import numpy as np
+from utils.advanced_weather import AdvancedWeatherAnalysis
+from utils.data_cache import load_table
+from utils.rainfall_cube import RainfallCube
+
+HISTORY_PATH = os.path.join('data', 'rainfall in india 1901-2015.csv')
+MONTHS = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN',
+          'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
+
+
+def legacy_trends(df, subdivision, years=10):
+    data = df[df['SUBDIVISION'] == subdivision].sort_values('YEAR').tail(years)
+    if data.empty:
+        return None
+
+    annual = data['ANNUAL'].to_numpy(dtype=float)
+    finite = np.isfinite(annual)
+    slope = np.polyfit(data['YEAR'].to_numpy(dtype=float)[finite], annual[finite], 1)[0] \
+        if finite.sum() > 1 else 0
+    return (data['ANNUAL'].mean(), data['ANNUAL'].std(), data['Jun-Sep'].mean(), slope)
+
+
+def legacy_drought(df, subdivision, current_year):
+    data = df[df['SUBDIVISION'] == subdivision]
+    annual = data['ANNUAL'].dropna().to_numpy()
+    recent = data[data['YEAR'] >= current_year - 5]['ANNUAL'].mean()
+    return recent, np.percentile(annual, 25), np.percentile(annual, 40)
+
+
+def legacy_planting(df, subdivision):
+    data = df[df['SUBDIVISION'] == subdivision].tail(10)
+    return [data[month].mean() for month in MONTHS]
+
+
+def timed(fn, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def check(df, analysis, subdivisions):
+    cube = analysis.cube
+    for i, name in enumerate(subdivisions):
+        for years in (10, 30):
+            mean, std, monsoon, slope = legacy_trends(df, name, years)
+            stats = cube.trend_stats(years, [i])
+            np.testing.assert_allclose(
+                [stats['annual_average'][0], stats['standard_deviation'][0],
+                 stats['monsoon_average'][0], stats['trend_slope'][0]],
+                [mean, std, monsoon, slope], rtol=1e-6, atol=1e-6, err_msg=name
+            )
+
+        recent, p25, p40 = legacy_drought(df, name, 2010)
+        np.testing.assert_allclose(
+            [cube.recent_average(2005, [i])[0], cube.p25[i], cube.p40[i]],
+            [recent, p25, p40], rtol=1e-6, err_msg=name
+        )
+        np.testing.assert_allclose(
+            cube.recent_monthly_avg[i], legacy_planting(df, name), rtol=1e-6, err_msg=name
+        )
+    print(f"✅ Cube matches per-call filtering for {len(subdivisions)} subdivisions")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    df = load_table(HISTORY_PATH)
+
+    t0 = time.perf_counter()
+    RainfallCube(df)
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    analysis = AdvancedWeatherAnalysis(HISTORY_PATH)
+    subdivisions = analysis.subdivisions
+    check(df, analysis, subdivisions)
+
+    print(f"\nCube build: {build_ms:.1f} ms "
+          f"({len(subdivisions)} subdivisions x {len(analysis.cube.years)} years)")
+    print(f"\n{'query (all subdivisions)':<34}{'legacy ms':>12}{'cube ms':>12}{'speedup':>10}")
+
+    rows = [
+        ('trends, years=10 (per call)',
+         lambda: [legacy_trends(df, s, 10) for s in subdivisions],
+         lambda: [analysis.analyze_trends(s, 10) for s in subdivisions]),
+        ('trends, years=30 (per call)',
+         lambda: [legacy_trends(df, s, 30) for s in subdivisions],
+         lambda: [analysis.analyze_trends(s, 30) for s in subdivisions]),
+        ('trends, years=30 (one call)',
+         lambda: [legacy_trends(df, s, 30) for s in subdivisions],
+         lambda: analysis.analyze_all_trends(30)),
+        ('drought risk (per call)',
+         lambda: [legacy_drought(df, s, 2010) for s in subdivisions],
+         lambda: [analysis.predict_drought_risk(s, 2010) for s in subdivisions]),
+        ('drought risk (one call)',
+         lambda: [legacy_drought(df, s, 2010) for s in subdivisions],
+         lambda: analysis.predict_all_drought_risk(2010)),
+        ('planting window (per call)',
+         lambda: [legacy_planting(df, s) for s in subdivisions],
+         lambda: [analysis.get_optimal_planting_window(s) for s in subdivisions]),
+    ]
+
+    for label, legacy, fast in rows:
+        legacy_ms = timed(legacy, args.repeats)
+        fast_ms = timed(fast, args.repeats)
+        print(f"{label:<34}{legacy_ms:>12.2f}{fast_ms:>12.2f}{legacy_ms / fast_ms:>9.0f}x")
+
+
+if __name__ == '__main__':
+    main()
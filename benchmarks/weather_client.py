@@ -0,0 +1,113 @@
+"""
+Weather client benchmark against the local fake server (no network needed).
+
+Replays a skewed workload of farm coordinates (a few popular villages plus
+jitter within a couple of km) and reports per-call p50/p99 latency, wall
+time, upstream requests and cache hit rate for:
+  1. the legacy client: requests.get per call, no cache;
+  2. WeatherIntegration called sequentially (pooled session + grid cache);
+  3. WeatherIntegration under concurrent callers (request coalescing);
+  4. bulk fetches of distinct cells vs fetching them one by one.
+
+Usage:
+    python -m benchmarks.weather_client [--calls 400] [--latency-ms 50]
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import requests
+from benchmarks.fake_weather_server import FakeWeatherServer
+from utils.weather_integration import WeatherIntegration
+
+
+def workload(calls, villages, rng):
+    """Coordinates drawn from Zipf-popular villages with ~2 km jitter"""
+    centres = np.column_stack([rng.uniform(10, 30, villages), rng.uniform(72, 88, villages)])
+    popularity = 1 / np.arange(1, villages + 1)
+    picks = rng.choice(villages, size=calls, p=popularity / popularity.sum())
+    jitter = rng.normal(0, 0.01, (calls, 2))
+    return [tuple(point) for point in centres[picks] + jitter]
+
+
+def legacy_current_weather(base_url, lat, lon):
+    response = requests.get(f"{base_url}/weather", params={
+        'lat': lat, 'lon': lon, 'appid': 'demo_key', 'units': 'metric'
+    }, timeout=5)
+    return response.json() if response.status_code == 200 else None
+
+
+def report(label, latencies, elapsed, server, upstream_before, hit_rate=None):
+    p50, p99 = np.percentile(latencies, 50), np.percentile(latencies, 99)
+    hits = '-' if hit_rate is None else f"{hit_rate:.0%}"
+    print(f"{label:<30}{len(latencies):>7}{elapsed:>9.2f}{p50:>9.1f}{p99:>9.1f}"
+          f"{server.requests - upstream_before:>10}{hits:>8}")
+
+
+def timed_calls(fn, points, clients=1):
+    def call(point):
+        t0 = time.perf_counter()
+        fn(*point)
+        return (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    if clients == 1:
+        latencies = [call(point) for point in points]
+    else:
+        with ThreadPoolExecutor(clients) as pool:
+            latencies = list(pool.map(call, points))
+    return latencies, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=400)
+    parser.add_argument('--villages', type=int, default=60)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    points = workload(args.calls, args.villages, rng)
+    server = FakeWeatherServer(latency_ms=args.latency_ms).start()
+
+    print(f"Fake server at {server.url}, {args.latency_ms:.0f} ms upstream latency")
+    print(f"\n{'client':<30}{'calls':>7}{'wall s':>9}{'p50 ms':>9}{'p99 ms':>9}{'upstream':>10}{'hits':>8}")
+
+    try:
+        before = server.requests
+        latencies, elapsed = timed_calls(lambda lat, lon: legacy_current_weather(server.url, lat, lon), points)
+        report('legacy, sequential', latencies, elapsed, server, before)
+
+        client = WeatherIntegration(base_url=server.url)
+        before = server.requests
+        latencies, elapsed = timed_calls(client.get_current_weather, points)
+        report('cached, sequential', latencies, elapsed, server, before, client.stats()['hit_rate'])
+
+        client = WeatherIntegration(base_url=server.url)
+        before = server.requests
+        latencies, elapsed = timed_calls(client.get_current_weather, points, args.clients)
+        stats = client.stats()
+        report(f'cached, {args.clients} clients', latencies, elapsed, server, before, stats['hit_rate'])
+        print(f"  ({stats['coalesced']} calls coalesced onto an in-flight fetch)")
+
+        client = WeatherIntegration(base_url=server.url)
+        cells = list(dict.fromkeys(client.grid_cell(*p) for p in points))
+        before = server.requests
+        latencies, elapsed = timed_calls(lambda lat, lon: legacy_current_weather(server.url, lat, lon), cells)
+        report(f'{len(cells)} cells one by one', latencies, elapsed, server, before)
+
+        before = server.requests
+        t0 = time.perf_counter()
+        client.get_forecast_bulk(cells)
+        client.get_current_weather_bulk(cells)
+        elapsed = time.perf_counter() - t0
+        print(f"{f'{len(cells)} cells bulk (+ forecast)':<30}{2 * len(cells):>7}{elapsed:>9.2f}"
+              f"{'-':>9}{'-':>9}{server.requests - before:>10}{'-':>8}")
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
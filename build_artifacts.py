@@ -0,0 +1,140 @@
+"""
+Build serving artifacts ahead of deployment.
+
+Usage:
+    python build_artifacts.py             # build everything that is stale
+    python build_artifacts.py data model  # build selected targets only
+    python build_artifacts.py --force     # rebuild even if up to date
+"""
+import argparse
+import os
+import time
+from utils.data_cache import build_cache
+from utils.data_loader import DataLoader
+from models.artifact_store import ARTIFACT_DIR, ArtifactStore
+from models.crop_predictor import CropPredictor
+from models.disease_detector import DiseaseDetector
+from models.recommendation_table import RecommendationTable
+from utils.feature_store import FeatureStore
+from utils.gazetteer import Gazetteer, source_version
+from utils.location_matcher import LocationMatcher
+from utils.price_store import PriceStore, PRICE_SOURCE
+
+
+def build_data(args):
+    """Convert the datasets under data/ to the columnar cache"""
+    rebuilt = build_cache(
+        data_dir='data',
+        cache_dir=os.path.join(args.artifact_dir, 'data'),
+        force=args.force
+    )
+    return f"{len(rebuilt)} dataset(s) converted" + (f": {', '.join(rebuilt)}" if rebuilt else '')
+
+
+def build_gazetteer(args):
+    """Reconcile the district datasets and price districts into integer IDs"""
+    data_loader = DataLoader(cache_dir=os.path.join(args.artifact_dir, 'data'))
+    directory = os.path.join(args.artifact_dir, 'gazetteer')
+    saved = None if args.force else Gazetteer.load(directory)
+    if saved is not None and saved.version == source_version(data_loader.data_dir, args.prices):
+        return f"up to date ({len(saved)} districts)"
+    
+    gazetteer = Gazetteer.build(data_loader, args.prices)
+    gazetteer.save(directory)
+    return (f"{len(gazetteer)} districts, {len(gazetteer.aliases)} aliases, "
+            f"{len(gazetteer.coordinates)} with coordinates")
+
+
+def build_model(args):
+    """Train the crop recommendation model and persist it"""
+    crop_predictor = CropPredictor(
+        DataLoader(cache_dir=os.path.join(args.artifact_dir, 'data')),
+        artifact_store=ArtifactStore(args.artifact_dir),
+        retrain=args.force
+    )
+    return f"crop model version {crop_predictor.model_version}"
+
+
+def build_disease(args):
+    """Train the disease detector from labelled images, if any are present"""
+    if not os.path.isdir(args.disease_images):
+        return f"skipped (no training images under {args.disease_images}/<label>/)"
+
+    version = DiseaseDetector.build_artifact(
+        args.disease_images,
+        artifact_store=ArtifactStore(args.artifact_dir),
+        force=args.force
+    )
+    return f"disease model version {version}"
+
+
+def build_prices(args):
+    """Ingest mandi price dumps into the indexed price store"""
+    directory = os.path.join(args.artifact_dir, 'prices')
+    store = (None if args.force else PriceStore.load(directory)) or PriceStore()
+    
+    added = sum(store.ingest(path) for path in args.prices if os.path.exists(path))
+    if added or args.force or not os.path.isdir(directory):
+        store.save(directory)
+    return f"{added} new price rows ({len(store)} total)"
+
+
+def build_recommendations(args):
+    """Score every district x soil x season with the crop model"""
+    data_loader = DataLoader(cache_dir=os.path.join(args.artifact_dir, 'data'))
+    location_matcher = LocationMatcher(
+        data_loader, Gazetteer.open(data_loader, os.path.join(args.artifact_dir, 'gazetteer'))
+    )
+    feature_store = FeatureStore(location_matcher.records, location_matcher.coordinates)
+    crop_predictor = CropPredictor(
+        data_loader,
+        artifact_store=ArtifactStore(args.artifact_dir),
+        max_trees=int(os.environ.get('CROP_MODEL_TREES', 0)) or None,
+        feature_store=feature_store
+    )
+    
+    directory = os.path.join(args.artifact_dir, 'recommendations')
+    previous = None if args.force else RecommendationTable.load(directory)
+    table, scored = RecommendationTable.build(crop_predictor, feature_store, previous)
+    if scored or previous is None:
+        table.save(directory)
+    return f"{scored} of {len(table)} districts scored (model {table.model_version})"
+
+
+TARGETS = {
+    'data': build_data,
+    'gazetteer': build_gazetteer,
+    'model': build_model,
+    'disease': build_disease,
+    'prices': build_prices,
+    'recommendations': build_recommendations,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build CropSenseAI serving artifacts')
+    parser.add_argument('targets', nargs='*', metavar='target',
+                        help=f"Artifacts to build: {', '.join(TARGETS)} (default: all)")
+    parser.add_argument('--force', action='store_true',
+                        help='Rebuild even if the artifact is up to date')
+    parser.add_argument('--artifact-dir', default=ARTIFACT_DIR,
+                        help='Directory to write artifacts to (default: $ARTIFACT_DIR or artifacts; '
+                             'the server reads ARTIFACT_DIR too)')
+    parser.add_argument('--disease-images', default=os.path.join('data', 'disease_images'),
+                        help='Training images for the disease detector, one folder per label')
+    parser.add_argument('--prices', nargs='+', default=[PRICE_SOURCE], metavar='CSV',
+                        help='Mandi price dumps to ingest, oldest first')
+    args = parser.parse_args()
+
+    unknown = [t for t in args.targets if t not in TARGETS]
+    if unknown:
+        parser.error(f"unknown target(s): {', '.join(unknown)}")
+
+    for target in args.targets or list(TARGETS):
+        start = time.perf_counter()
+        summary = TARGETS[target](args)
+        print(f"✅ {target}: {summary} ({time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == '__main__':
+    main()
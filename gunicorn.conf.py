@@ -0,0 +1,53 @@
+"""
+Gunicorn settings for serving wsgi:app.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Environment overrides: PORT / BIND, WEB_CONCURRENCY (worker processes),
+GUNICORN_THREADS (threads per worker), GUNICORN_TIMEOUT (seconds),
+METRICS_DIR (where workers share their /metrics snapshots).
+"""
+import gc
+import glob
+import multiprocessing
+import os
+import tempfile
+
+bind = os.environ.get('BIND', f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+
+# Model inference is CPU-bound: one process per core, plus a few threads
+# each to overlap request I/O
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+keepalive = 5
+
+# Load datasets and models once in the master, then fork
+preload_app = True
+
+# Each worker writes its metrics here so any worker can answer /metrics for
+# all of them. Must be set before the app (and utils.metrics) is imported.
+os.environ.setdefault('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'cropsense-metrics'))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', None)
+errorlog = '-'
+
+
+def on_starting(server):
+    # Drop snapshots left behind by a previous run
+    for path in glob.glob(os.path.join(os.environ['METRICS_DIR'], '*.json')):
+        os.remove(path)
+
+
+def when_ready(server):
+    # Move everything allocated during preload out of the collector's reach,
+    # so garbage collection in workers does not write to (and un-share)
+    # the pages inherited from the master
+    gc.collect()
+    gc.freeze()
+    server.log.info(f"Preloaded app; {gc.get_freeze_count()} objects frozen before fork")
+
+
+def post_fork(server, worker):
+    server.log.info(f"Worker {worker.pid} forked from preloaded master")
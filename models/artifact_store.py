@@ -0,0 +1,78 @@
+import hashlib
+import json
+import os
+import joblib
+
+# Root of every serving artifact, shared by build_artifacts.py and the server
+ARTIFACT_DIR = os.environ.get('ARTIFACT_DIR', 'artifacts')
+
+
+def fingerprint(paths, params):
+    """Hash training files and hyperparameters into a short version string"""
+    digest = hashlib.sha256()
+
+    for path in paths:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+class ArtifactStore:
+    """Save and load trained models keyed by a fingerprint of their inputs"""
+
+    def __init__(self, artifact_dir=ARTIFACT_DIR):
+        self.artifact_dir = artifact_dir
+
+    def _paths(self, name):
+        base = os.path.join(self.artifact_dir, name)
+        return f"{base}.joblib", f"{base}.json"
+
+    def read_metadata(self, name):
+        """Read the metadata sidecar of an artifact, or None if missing"""
+        _, meta_path = self._paths(name)
+
+        try:
+            with open(meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load(self, name, version):
+        """
+        Load an artifact if it was built from the given version.
+        Plain numpy arrays in the payload are memory-mapped read-only, but
+        most objects copy theirs when unpickled (sklearn trees rebuild their
+        node arrays), so a loaded model is private memory. Workers share it
+        only copy-on-write, when it is loaded before the fork.
+        """
+        model_path, _ = self._paths(name)
+        metadata = self.read_metadata(name)
+
+        if not metadata or metadata.get('version') != version:
+            return None
+
+        try:
+            return joblib.load(model_path, mmap_mode='r')
+        except (OSError, EOFError, ValueError) as e:
+            print(f"⚠️  Could not load artifact {model_path}: {e}")
+            return None
+
+    def save(self, name, payload, version, **metadata):
+        """Write an artifact atomically, followed by its metadata sidecar"""
+        os.makedirs(self.artifact_dir, exist_ok=True)
+        model_path, meta_path = self._paths(name)
+
+        # Uncompressed dump so that plain arrays can be memory-mapped on load
+        tmp_path = f"{model_path}.{os.getpid()}.tmp"
+        joblib.dump(payload, tmp_path)
+        os.replace(tmp_path, model_path)
+
+        tmp_meta = f"{meta_path}.{os.getpid()}.tmp"
+        with open(tmp_meta, 'w') as f:
+            json.dump({'version': version, **metadata}, f, indent=2)
+        os.replace(tmp_meta, meta_path)
+
+        return model_path
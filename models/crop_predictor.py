@@ -1,21 +1,116 @@
-import pandas as pd
+import os
 import numpy as np
+import sklearn
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
+from models.artifact_store import ArtifactStore, fingerprint
+from models.compiled_forest import CompiledForest
+from utils.metrics import timed, timer
+from utils.feature_store import district_features
+from utils.gazetteer import Gazetteer
+
+FEATURES = ['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall']
+MODEL_PARAMS = {'n_estimators': 100, 'random_state': 42, 'max_depth': 20}
+# Bump when the layout of the persisted payload changes
+ARTIFACT_FORMAT = 2
+ARTIFACT_NAME = 'crop_predictor'
+TRAINING_FILE = 'Crop_recommendation.csv'
+
+# Mandi commodity names each crop trades under, most specific first
+CROP_COMMODITIES = {
+    'apple': ['Apple'],
+    'banana': ['Banana'],
+    'blackgram': ['Black Gram (Urd Beans)(Whole)'],
+    'chickpea': ['Bengal Gram(Gram)(Whole)'],
+    'coconut': ['Coconut'],
+    'cotton': ['Cotton'],
+    'grapes': ['Grapes'],
+    'jute': ['Jute'],
+    'kidneybeans': ['Rajma', 'Beans'],
+    'lentil': ['Lentil (Masur)(Whole)'],
+    'maize': ['Maize'],
+    'mango': ['Mango'],
+    'mothbeans': ['Moath Dal'],
+    'mungbean': ['Green Gram (Moong)(Whole)'],
+    'muskmelon': ['Karbuja(Musk Melon)'],
+    'orange': ['Orange'],
+    'papaya': ['Papaya'],
+    'pigeonpeas': ['Arhar (Tur/Red Gram)(Whole)'],
+    'pomegranate': ['Pomegranate'],
+    'rice': ['Paddy(Dhan)(Common)', 'Rice'],
+    'watermelon': ['Water Melon'],
+    'wheat': ['Wheat'],
+}
+QUINTALS_PER_TONNE = 10
+RANKINGS = ('suitability', 'profit')
 
 class CropPredictor:
     """Predict suitable crops based on conditions"""
     
-    def __init__(self, data_loader):
+    def __init__(self, data_loader, artifact_store=None, retrain=False,
+                 yield_predictor=None, price_store=None, max_trees=None, feature_store=None,
+                 gazetteer=None):
         self.data_loader = data_loader
+        self.feature_store = feature_store
+        # Precomputed probabilities, set with use_table()
+        self.table = None
         self.crop_data = data_loader.get_crop_data()
+        self.artifact_store = artifact_store or ArtifactStore()
+        self._load_or_train_model(retrain)
+        self._compile_model(max_trees)
+        
+        # Profit ranking needs yields and prices for every model class
+        self.yield_predictor = yield_predictor
+        self.reference_prices = None
+        if price_store is not None:
+            self.reference_prices = price_store.reference_prices(
+                [CROP_COMMODITIES.get(str(crop), []) for crop in self.model.classes_],
+                gazetteer or Gazetteer.open(data_loader)
+            )
+    
+    def _model_version(self):
+        """Fingerprint of the training CSV and hyperparameters"""
+        training_path = os.path.join(self.data_loader.data_dir, TRAINING_FILE)
+        params = {
+            'format': ARTIFACT_FORMAT,
+            'features': FEATURES,
+            'model': MODEL_PARAMS,
+            'sklearn': sklearn.__version__
+        }
+        return fingerprint([training_path], params)
+    
+    def _load_or_train_model(self, retrain=False):
+        """Load the persisted model, training it only if the inputs changed"""
+        self.model_version = self._model_version()
+        
+        artifact = None
+        if not retrain:
+            artifact = self.artifact_store.load(ARTIFACT_NAME, self.model_version)
+        
+        if artifact is not None:
+            self.scaler = artifact['scaler']
+            self.model = artifact['model']
+            print(f"✅ Crop predictor loaded from artifact (version {self.model_version})")
+            return
+        
         self._train_model()
+        
+        try:
+            path = self.artifact_store.save(
+                ARTIFACT_NAME,
+                {'scaler': self.scaler, 'model': self.model},
+                self.model_version,
+                samples=len(self.crop_data),
+                params=MODEL_PARAMS
+            )
+            print(f"   - Saved model artifact to {path}")
+        except OSError as e:
+            print(f"⚠️  Could not save model artifact: {e}")
     
     def _train_model(self):
         """Train crop recommendation model"""
-        # Prepare features and labels
-        features = ['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall']
-        X = self.crop_data[features]
+        # Prepare features and labels (plain arrays, matching inference)
+        X = self.crop_data[FEATURES].to_numpy(dtype=float)
         y = self.crop_data['label']
         
         # Scale features
@@ -23,85 +118,198 @@ class CropPredictor:
         X_scaled = self.scaler.fit_transform(X)
         
         # Train Random Forest
-        self.model = RandomForestClassifier(
-            n_estimators=100,
-            random_state=42,
-            max_depth=20
-        )
+        self.model = RandomForestClassifier(**MODEL_PARAMS)
         self.model.fit(X_scaled, y)
         
         print(f"✅ Crop predictor trained with {len(self.crop_data)} samples")
     
-    def recommend_crops(self, district_data, soil_type='loamy', season='kharif', top_n=5):
-        """Recommend top N crops for given conditions"""
-        
-        # Extract rainfall based on season
-        if season == 'kharif':
-            rainfall = district_data['Jun-Sep']
-        elif season == 'rabi':
-            rainfall = district_data['Oct-Dec'] + district_data['Jan-Feb']
-        else:  # zaid
-            rainfall = district_data['Mar-May']
-        
-        # Estimated parameters based on soil type
-        soil_params = self._get_soil_parameters(soil_type)
-        
-        # Create feature vector
-        features = pd.DataFrame([{
-            'N': soil_params['N'],
-            'P': soil_params['P'],
-            'K': soil_params['K'],
-            'temperature': 25,  # Average temperature
-            'humidity': 75,     # Average humidity
-            'ph': soil_params['ph'],
-            'rainfall': rainfall / 4  # Monthly average
-        }])
+    def _compile_model(self, max_trees=None):
+        """
+        Flatten the forest into node arrays for inference. With max_trees,
+        keep only that many trees, chosen to best reproduce the full
+        forest's predictions on the training data.
+        """
+        trees = None
+        if max_trees and max_trees < len(self.model.estimators_):
+            X_scaled = self._scale(self.crop_data[FEATURES].to_numpy(dtype=float))
+            trees = CompiledForest.from_sklearn(self.model).select_trees(X_scaled, max_trees)
+            self.model_version = f"{self.model_version}-t{max_trees}"
         
-        # Scale features
-        features_scaled = self.scaler.transform(features)
+        self.forest = CompiledForest.from_sklearn(self.model, trees)
+        if trees is not None:
+            print(f"   - Crop model pruned to {max_trees} of {len(self.model.estimators_)} trees")
+    
+    def _scale(self, features):
+        """StandardScaler.transform without sklearn's per-call validation"""
+        return (features - self.scaler.mean_) / self.scaler.scale_
+    
+    def predict_proba(self, features):
+        """Class probabilities for raw (unscaled) feature rows"""
+        return self.forest.predict_proba(self._scale(np.asarray(features, dtype=float)))
+    
+    def use_table(self, table):
+        """Answer districts of the feature store from a bound RecommendationTable"""
+        self.table = table if self.feature_store is not None else None
+    
+    def _table_probabilities(self, district_data, soil_type, season):
+        """Precomputed probabilities for a known district, or None"""
+        if self.table is None:
+            return None
+        
+        row = self.feature_store.row(district_data)
+        if row is None:
+            return None
+        return self.table.lookup(row, soil_type, season)
+    
+    @property
+    def profit_ranking_available(self):
+        return self.yield_predictor is not None and self.reference_prices is not None
+    
+    @timed('recommend_crops')
+    def recommend_crops(self, district_data, soil_type='loamy', season='kharif', top_n=5,
+                        rank_by='suitability'):
+        """
+        Recommend top N crops for given conditions, ranked by model
+        suitability or, with rank_by='profit', by expected revenue
+        """
+        with timer('crop_table_lookup'):
+            probabilities = self._table_probabilities(district_data, soil_type, season)
+        
+        if probabilities is None:
+            features = np.array([self._build_features(district_data, soil_type, season)])
+            
+            # Scale features
+            with timer('crop_scale'):
+                features_scaled = self._scale(features)
+            
+            # Get probabilities for all crops
+            with timer('crop_predict_proba'):
+                probabilities = self.forest.predict_proba(features_scaled)[0]
         
-        # Get probabilities for all crops
-        probabilities = self.model.predict_proba(features_scaled)[0]
+        with timer('crop_rank'):
+            if rank_by == 'profit':
+                return self._rank_by_profit(probabilities, district_data, season, top_n)
+            return self._rank_crops(probabilities, top_n)
+    
+    @timed('recommend_crops_batch')
+    def recommend_crops_batch(self, items, top_n=5, rank_by='suitability'):
+        """
+        Recommend top N crops for many conditions with a single model call.
+        items is a list of dicts with 'district_data', 'soil_type' and
+        'season'. Results come back in input order; an item that cannot be
+        scored gets {'error': ...} instead of failing the whole batch.
+        """
+        results = [None] * len(items)
+        scored = {}
+        rows = []
+        positions = []
+        
+        for i, item in enumerate(items):
+            if not item.get('district_data'):
+                results[i] = {'error': item.get('error', 'Location not found')}
+                continue
+            
+            try:
+                conditions = (
+                    item['district_data'],
+                    item.get('soil_type') or 'loamy',
+                    item.get('season') or 'kharif'
+                )
+                probabilities = self._table_probabilities(*conditions)
+                if probabilities is not None:
+                    scored[i] = probabilities
+                else:
+                    rows.append(self._build_features(*conditions))
+                    positions.append(i)
+            except (KeyError, TypeError, ValueError, AttributeError) as e:
+                results[i] = {'error': f'Invalid input: {e}'}
+        
+        # Everything the table could not answer goes through one model call
+        if rows:
+            with timer('crop_scale'):
+                features_scaled = self._scale(np.array(rows, dtype=float))
+            with timer('crop_predict_proba'):
+                scored.update(zip(positions, self.forest.predict_proba(features_scaled)))
+        
+        for i, row_probabilities in scored.items():
+            if rank_by == 'profit':
+                ranked = self._rank_by_profit(
+                    row_probabilities, items[i]['district_data'], items[i].get('season') or 'kharif', top_n
+                )
+            else:
+                ranked = self._rank_crops(row_probabilities, top_n)
+            results[i] = {'recommendations': ranked}
+        
+        return results
+    
+    def _build_features(self, district_data, soil_type, season):
+        """Build the model feature row for a district, soil type and season"""
+        if self.feature_store is not None:
+            row = self.feature_store.lookup(district_data, soil_type, season)
+            if row is not None:
+                return row
+        
+        # District not in the store: same features, computed directly
+        return district_features(district_data, soil_type, season)
+    
+    def _rank_crops(self, probabilities, top_n):
+        """Turn one row of class probabilities into top N recommendations"""
         crop_names = self.model.classes_
         
-        # Get top N recommendations
-        top_indices = np.argsort(probabilities)[-top_n:][::-1]
+        # Get top N recommendations (none for top_n < 1)
+        top_indices = np.argsort(probabilities)[::-1][:max(top_n, 0)]
         
         recommendations = []
         for idx in top_indices:
-            crop_req = self.data_loader.get_crop_requirements(crop_names[idx])
+            crop_name = str(crop_names[idx])
             
-            # Convert all numpy types to Python native types for JSON serialization
             recommendations.append({
-                'crop': str(crop_names[idx]),
+                'crop': crop_name,
                 'suitability_score': float(probabilities[idx]),
-                'requirements': {
-                    'crop': str(crop_req['crop']),
-                    'N_avg': float(crop_req['N_avg']),
-                    'P_avg': float(crop_req['P_avg']),
-                    'K_avg': float(crop_req['K_avg']),
-                    'temperature_avg': float(crop_req['temperature_avg']),
-                    'humidity_avg': float(crop_req['humidity_avg']),
-                    'ph_avg': float(crop_req['ph_avg']),
-                    'rainfall_avg': float(crop_req['rainfall_avg']),
-                    'N_range': (float(crop_req['N_range'][0]), float(crop_req['N_range'][1])),
-                    'temperature_range': (float(crop_req['temperature_range'][0]), float(crop_req['temperature_range'][1])),
-                    'humidity_range': (float(crop_req['humidity_range'][0]), float(crop_req['humidity_range'][1])),
-                    'rainfall_range': (float(crop_req['rainfall_range'][0]), float(crop_req['rainfall_range'][1]))
-                }
+                'requirements': dict(self.data_loader.get_crop_requirements(crop_name))
             })
         
         return recommendations
     
-    def _get_soil_parameters(self, soil_type):
-        """Get typical NPK and pH for soil types"""
-        soil_params = {
-            'sandy': {'N': 30, 'P': 20, 'K': 30, 'ph': 6.0},
-            'loamy': {'N': 60, 'P': 40, 'K': 40, 'ph': 6.5},
-            'clay': {'N': 80, 'P': 50, 'K': 50, 'ph': 7.0},
-            'black': {'N': 70, 'P': 45, 'K': 45, 'ph': 7.5},
-            'red': {'N': 50, 'P': 35, 'K': 35, 'ph': 6.2},
-            'laterite': {'N': 40, 'P': 30, 'K': 30, 'ph': 5.5}
-        }
+    def _rank_by_profit(self, probabilities, district_data, season, top_n):
+        """
+        Rank crops by suitability x predicted yield in the season x local
+        modal price, in one vectorized pass. Crops without a known price keep
+        the place their suitability gives them and are marked ranked_by
+        'suitability'; the priced crops fill the other places in profit order.
+        """
+        if not self.profit_ranking_available:
+            raise RuntimeError('Profit ranking needs a yield predictor and price data')
+        
+        crop_names = self.model.classes_
+        yields = self.yield_predictor.predict_yields(crop_names, [district_data], [season])[0]
+        prices, levels = self.reference_prices.lookup(
+            district_data.get('DISTRICT_ID'), district_data.get('STATE_ID')
+        )
+        revenue = yields * QUINTALS_PER_TONNE * prices
+        scores = probabilities * revenue
+        
+        priced = ~np.isnan(scores)
+        ranking = np.argsort(-probabilities, kind='stable')
+        by_profit = np.flatnonzero(priced)[np.lexsort((-probabilities[priced], -scores[priced]))]
+        ranking[priced[ranking]] = by_profit
+        top_indices = ranking[:max(top_n, 0)]
         
-        return soil_params.get(soil_type.lower(), soil_params['loamy'])
+        recommendations = []
+        for idx in top_indices:
+            crop_name = str(crop_names[idx])
+            has_price = bool(priced[idx])
+            
+            recommendations.append({
+                'crop': crop_name,
+                'suitability_score': float(probabilities[idx]),
+                'predicted_yield_per_hectare': round(float(yields[idx]), 2),
+                'modal_price_per_quintal': round(float(prices[idx]), 2) if has_price else None,
+                'price_level': levels[idx],
+                'expected_revenue_per_hectare': round(float(revenue[idx]), 2) if has_price else None,
+                'profit_score': round(float(scores[idx]), 2) if has_price else None,
+                'ranked_by': 'profit' if has_price else 'suitability',
+                'requirements': dict(self.data_loader.get_crop_requirements(crop_name))
+            })
+        
+        return recommendations
@@ -0,0 +1,246 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+from PIL import Image
+from sklearn.ensemble import ExtraTreesClassifier
+from models.artifact_store import ArtifactStore, fingerprint
+from utils.metrics import timed
+
+ARTIFACT_NAME = 'disease_detector'
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+FEATURE_SIZE = 64          # Images are reduced to FEATURE_SIZE x FEATURE_SIZE
+HISTOGRAM_BINS = 16        # Bins per HSV channel
+MODEL_PARAMS = {'n_estimators': 200, 'random_state': 42, 'min_samples_leaf': 2}
+
+DEFAULT_REMEDY = 'Consult your local agricultural extension officer for treatment'
+
+# Served while no model has been built, as before the detector existed
+PLACEHOLDER_RESULT = {
+    'disease': 'Sample Disease Name',
+    'confidence': 0.85,
+    'remedy': 'Apply organic neem oil spray every 7 days',
+    'placeholder': True
+}
+REMEDIES = {
+    'healthy': 'No disease detected. Continue regular crop monitoring',
+    'bacterial_blight': 'Remove infected leaves and spray copper oxychloride (3 g/L)',
+    'early_blight': 'Spray mancozeb (2.5 g/L) and rotate crops next season',
+    'late_blight': 'Spray metalaxyl + mancozeb and avoid overhead irrigation',
+    'leaf_spot': 'Remove affected leaves and apply carbendazim (1 g/L)',
+    'mosaic_virus': 'Uproot infected plants and control aphids/whiteflies with neem oil',
+    'powdery_mildew': 'Spray wettable sulphur (2 g/L) at 10-day intervals',
+    'rust': 'Apply propiconazole (1 ml/L) and use resistant varieties',
+}
+
+
+def extract_features(images):
+    """
+    Colour features for a batch of PIL images, shape (n, 3 * HISTOGRAM_BINS + 6).
+    Normalized HSV histograms plus per-channel RGB mean and std.
+    """
+    rgb = np.stack([
+        np.asarray(img.convert('RGB').resize(
+            (FEATURE_SIZE, FEATURE_SIZE), Image.BILINEAR, reducing_gap=2.0
+        ))
+        for img in images
+    ])
+    hsv = np.stack([
+        np.asarray(Image.fromarray(pixels).convert('HSV'))
+        for pixels in rgb
+    ])
+
+    # One bincount for the whole batch: offset bins by channel and image
+    n = len(images)
+    bins = (hsv.reshape(n, -1, 3).astype(np.int64) * HISTOGRAM_BINS) // 256
+    bins += np.arange(3) * HISTOGRAM_BINS
+    bins += (np.arange(n) * 3 * HISTOGRAM_BINS)[:, None, None]
+    histograms = np.bincount(bins.ravel(), minlength=n * 3 * HISTOGRAM_BINS)
+    histograms = histograms.reshape(n, 3 * HISTOGRAM_BINS) / (FEATURE_SIZE * FEATURE_SIZE)
+
+    pixels = rgb.reshape(n, -1, 3) / 255.0
+    return np.hstack([histograms, pixels.mean(axis=1), pixels.std(axis=1)]).astype(np.float32)
+
+
+def load_training_images(image_dir):
+    """Load images from image_dir/<label>/*.jpg; returns (images, labels)"""
+    images, labels = [], []
+
+    for label in sorted(os.listdir(image_dir)):
+        label_dir = os.path.join(image_dir, label)
+        if not os.path.isdir(label_dir):
+            continue
+
+        for filename in sorted(os.listdir(label_dir)):
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                with Image.open(os.path.join(label_dir, filename)) as img:
+                    img.draft('RGB', (FEATURE_SIZE * 2, FEATURE_SIZE * 2))
+                    images.append(img.convert('RGB'))
+                labels.append(label)
+
+    return images, labels
+
+
+class SklearnBackend:
+    """CPU inference backend: scikit-learn classifier over colour features"""
+
+    def __init__(self, model):
+        self.model = model
+        self.labels = [str(label) for label in model.classes_]
+
+    @classmethod
+    def train(cls, images, labels, params=None):
+        model = ExtraTreesClassifier(**(params or MODEL_PARAMS))
+        model.fit(extract_features(images), labels)
+        return cls(model)
+
+    def predict_proba(self, images):
+        """Class probabilities for a batch of images, shape (n, n_labels)"""
+        return self.model.predict_proba(extract_features(images))
+
+
+class MicroBatcher:
+    """
+    Group concurrent predictions into one forward pass.
+
+    The first request in an empty queue waits at most max_wait_ms for
+    others to arrive; the batch is flushed as soon as it has max_batch items.
+    """
+
+    def __init__(self, predict_batch, max_batch=16, max_wait_ms=5):
+        self.predict_batch = predict_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def _ensure_worker(self):
+        # Threads do not survive a fork, so start one per process on first use
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                threading.Thread(target=self._run, name='disease-batcher', daemon=True).start()
+                self._pid = os.getpid()
+
+    def submit(self, item):
+        """Queue one item and return a Future for its result"""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            items, futures = zip(*batch)
+            try:
+                results = self.predict_batch(list(items))
+                for future, result in zip(futures, results):
+                    future.set_result(result)
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+
+
+class DiseaseDetector:
+    """Detect crop diseases from leaf images with micro-batched CPU inference"""
+
+    def __init__(self, backend=None, max_batch=16, max_wait_ms=5, timeout=5.0):
+        self.backend = backend
+        self.timeout = timeout
+        self.batcher = MicroBatcher(self._predict_batch, max_batch, max_wait_ms)
+
+    @classmethod
+    def from_artifacts(cls, artifact_store=None, **kwargs):
+        """Load the most recently built model, if any"""
+        artifact_store = artifact_store or ArtifactStore()
+        metadata = artifact_store.read_metadata(ARTIFACT_NAME)
+        model = None
+        if metadata:
+            model = artifact_store.load(ARTIFACT_NAME, metadata['version'])
+
+        if model is None:
+            print("⚠️  Disease model not found; build it with 'python build_artifacts.py disease'")
+            return cls(None, **kwargs)
+
+        print(f"✅ Disease detector loaded (version {metadata['version']})")
+        return cls(SklearnBackend(model), **kwargs)
+
+    @classmethod
+    def build_artifact(cls, image_dir, artifact_store=None, force=False):
+        """Train on image_dir/<label>/* and persist; returns the model version"""
+        artifact_store = artifact_store or ArtifactStore()
+        paths = sorted(
+            os.path.join(root, name)
+            for root, _, names in os.walk(image_dir)
+            for name in names if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        version = fingerprint(paths, {'model': MODEL_PARAMS, 'labels': [
+            os.path.relpath(p, image_dir) for p in paths
+        ]})
+
+        if not force and artifact_store.load(ARTIFACT_NAME, version) is not None:
+            return version
+
+        images, labels = load_training_images(image_dir)
+        if len(set(labels)) < 2:
+            raise ValueError(f'Need images for at least two labels under {image_dir}')
+
+        backend = SklearnBackend.train(images, labels)
+        artifact_store.save(ARTIFACT_NAME, backend.model, version,
+                            samples=len(images), labels=backend.labels)
+        return version
+
+    @property
+    def available(self):
+        return self.backend is not None
+
+    def warm_up(self):
+        """Run one full batch so lazy initialization happens before serving"""
+        if self.available:
+            blank = Image.new('RGB', (FEATURE_SIZE, FEATURE_SIZE), (90, 140, 60))
+            self.backend.predict_proba([blank] * self.batcher.max_batch)
+
+    @timed('disease_forward')
+    def _predict_batch(self, images):
+        probabilities = self.backend.predict_proba(images)
+        return [self._format_result(row) for row in probabilities]
+
+    def _format_result(self, probabilities):
+        best = int(np.argmax(probabilities))
+        disease = self.backend.labels[best]
+        return {
+            'disease': disease,
+            'confidence': round(float(probabilities[best]), 4),
+            'remedy': REMEDIES.get(disease.lower(), DEFAULT_REMEDY)
+        }
+
+    @timed('disease_detect')
+    def detect(self, image):
+        """
+        Diagnose one image; concurrent calls share a forward pass. Raises
+        TimeoutError if the batch does not finish within self.timeout.
+        """
+        if not self.available:
+            raise RuntimeError('Disease model not available')
+        return self.batcher.submit(image).result(timeout=self.timeout)
+
+    def detect_batch(self, images):
+        """Diagnose a list of images in one forward pass"""
+        if not self.available:
+            raise RuntimeError('Disease model not available')
+        return self._predict_batch(images)
@@ -0,0 +1,160 @@
+"""
+Crop model probabilities precomputed for every district, soil type and season.
+
+The table is built offline (python build_artifacts.py recommendations) by
+scoring the whole feature store in one batch, and is memory-mapped by the
+server. Rows are keyed by gazetteer district ID, and each carries a digest of the feature rows it was scored
+from. A rebuild rescores only districts whose digest changed, and the
+server serves a district from the table only while its digest still matches
+the live feature store and the model version is unchanged. Everything else
+falls back to live inference.
+"""
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+from models.artifact_store import ARTIFACT_DIR
+from utils.feature_store import SEASONS, SEASON_INDEX, SOILS, SOIL_INDEX, season_key, soil_key
+
+TABLE_DIR = os.path.join(ARTIFACT_DIR, 'recommendations')
+
+# Bump when the on-disk layout changes
+TABLE_FORMAT = 2
+
+
+def district_digests(feature_store):
+    """16-byte digest of each district's (soil, season, feature) block"""
+    return np.array(
+        [hashlib.blake2b(block.tobytes(), digest_size=16).digest() for block in feature_store.features],
+        dtype='S16'
+    )
+
+
+class RecommendationTable:
+    """Class probabilities per (district, soil, season), keyed by district ID"""
+
+    def __init__(self, district_ids, digests, probabilities, model_version, classes):
+        self.district_ids = np.asarray(district_ids)
+        self.digests = digests
+        self.probabilities = probabilities
+        self.model_version = model_version
+        self.classes = list(classes)
+        self.rows = None
+
+    def __len__(self):
+        return len(self.district_ids)
+
+    @classmethod
+    def build(cls, crop_predictor, feature_store, previous=None):
+        """
+        Score every district of the feature store. Districts whose features
+        and model are unchanged since previous are copied from it.
+        Returns (table, number of districts scored).
+        """
+        district_ids = feature_store.district_ids
+        digests = district_digests(feature_store)
+        classes = [str(c) for c in crop_predictor.model.classes_]
+        shape = feature_store.features.shape[:3] + (len(classes),)
+        probabilities = np.empty(shape)
+
+        reused = np.zeros(len(district_ids), dtype=bool)
+        if previous is not None and previous.compatible(crop_predictor.model_version, classes):
+            previous_rows = previous.row_index()
+            for row, district_id in enumerate(district_ids):
+                i = previous_rows.get(int(district_id))
+                if i is not None and previous.digests[i] == digests[row]:
+                    probabilities[row] = previous.probabilities[i]
+                    reused[row] = True
+
+        stale = np.flatnonzero(~reused)
+        if len(stale):
+            features = feature_store.features[stale].reshape(-1, feature_store.features.shape[-1])
+            probabilities[stale] = crop_predictor.predict_proba(features).reshape((len(stale),) + shape[1:])
+
+        return cls(district_ids, digests, probabilities, crop_predictor.model_version, classes), len(stale)
+
+    def row_index(self):
+        """Table row of each district ID"""
+        return {int(district_id): i for i, district_id in enumerate(self.district_ids)}
+
+    def compatible(self, model_version, classes):
+        return self.model_version == model_version and self.classes == list(classes)
+
+    def save(self, directory=TABLE_DIR):
+        """Write the table atomically; returns the directory"""
+        tmp_path = f"{directory}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        np.save(os.path.join(tmp_path, 'probabilities.npy'), self.probabilities)
+        np.save(os.path.join(tmp_path, 'digests.npy'), self.digests)
+        np.save(os.path.join(tmp_path, 'district_ids.npy'), self.district_ids)
+        with open(os.path.join(tmp_path, 'manifest.json'), 'w') as f:
+            json.dump({
+                'format': TABLE_FORMAT,
+                'model_version': self.model_version,
+                'classes': self.classes,
+                'soils': SOILS,
+                'seasons': SEASONS,
+            }, f)
+
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp_path, directory)
+        return directory
+
+    @classmethod
+    def load(cls, directory=TABLE_DIR):
+        """Memory-map a saved table, or None if missing or in an old layout"""
+        try:
+            with open(os.path.join(directory, 'manifest.json')) as f:
+                manifest = json.load(f)
+            if (manifest.get('format') != TABLE_FORMAT
+                    or manifest['soils'] != SOILS or manifest['seasons'] != SEASONS):
+                return None
+
+            return cls(
+                np.load(os.path.join(directory, 'district_ids.npy')),
+                np.load(os.path.join(directory, 'digests.npy')),
+                np.load(os.path.join(directory, 'probabilities.npy'), mmap_mode='r'),
+                manifest['model_version'],
+                manifest['classes']
+            )
+        except (OSError, ValueError, KeyError):
+            return None
+
+    @classmethod
+    def open(cls, feature_store, model_version, classes, directory=TABLE_DIR):
+        """Load the table and bind it to the live feature store; None if unusable"""
+        table = cls.load(directory)
+        if table is None:
+            print("⚠️  Recommendation table not found; build it with "
+                  "'python build_artifacts.py recommendations'")
+            return None
+
+        current = table.bind(feature_store, model_version, classes)
+        print(f"   - Recommendation table: {current} of {len(feature_store.district_ids)} districts current")
+        return table if current else None
+
+    def bind(self, feature_store, model_version, classes):
+        """
+        Map feature store rows to table rows, keeping only districts whose
+        features are unchanged. Returns the number of usable districts.
+        """
+        self.rows = np.full(len(feature_store.district_ids), -1, dtype=np.intp)
+        if not self.compatible(model_version, [str(c) for c in classes]):
+            return 0
+
+        table_rows = self.row_index()
+        for row, (district_id, digest) in enumerate(zip(feature_store.district_ids, district_digests(feature_store))):
+            i = table_rows.get(int(district_id))
+            if i is not None and self.digests[i] == digest:
+                self.rows[row] = i
+        return int((self.rows >= 0).sum())
+
+    def lookup(self, row, soil_type, season):
+        """Class probabilities for a feature store row, or None if not in the table"""
+        i = self.rows[row]
+        if i < 0:
+            return None
+        return self.probabilities[i, SOIL_INDEX[soil_key(soil_type)], SEASON_INDEX[season_key(season)]]
@@ -1,13 +1,29 @@
 import numpy as np
+from utils.feature_store import SEASONS, monthly_rainfall, season_key
+from utils.location_index import normalize_state
+from utils.metrics import timed
+
+# Base yield (tonnes per hectare) - typical values
+BASE_YIELDS = {
+    'rice': 3.5, 'wheat': 3.2, 'maize': 2.8,
+    'cotton': 1.5, 'sugarcane': 70, 'jute': 2.0
+}
+DEFAULT_BASE_YIELD = 2.0
 
 class YieldPredictor:
     """Predict crop yield based on conditions"""
     
     def __init__(self, data_loader):
         self.data_loader = data_loader
+        self._parameters = {}
     
-    def predict_yield(self, crop, district_data, soil_type):
-        """Predict yield for given crop and conditions"""
+    @timed('predict_yield')
+    def predict_yield(self, crop, district_data, soil_type, season=None):
+        """
+        Predict yield for given crop and conditions. Rainfall stress is
+        measured in the given season, or in the crop's least-stressed season
+        if none is given (the same value as the crop's yield grid cell).
+        """
         
         # Get crop requirements
         crop_req = self.data_loader.get_crop_requirements(crop)
@@ -16,27 +32,18 @@ class YieldPredictor:
             return {'error': f'Crop "{crop}" not found'}
         
         # Calculate stress factors
-        rainfall_stress = self._calculate_rainfall_stress(
-            district_data['ANNUAL'],
-            crop_req['rainfall_avg']
+        stress, yields, seasons = self.season_yields(
+            [crop], [district_data], None if season is None else [season]
         )
-        
-        # Base yield (tonnes per hectare) - typical values
-        base_yields = {
-            'rice': 3.5, 'wheat': 3.2, 'maize': 2.8,
-            'cotton': 1.5, 'sugarcane': 70, 'jute': 2.0
-        }
-        
-        base_yield = base_yields.get(crop, 2.0)
-        
-        # Adjust for stress
-        predicted_yield = base_yield * (1 - rainfall_stress * 0.3)
+        rainfall_stress = float(stress[0, 0])
+        predicted_yield = float(yields[0, 0])
         
         return {
             'crop': crop,
             'predicted_yield_per_hectare': round(predicted_yield, 2),
             'unit': 'tonnes',
             'rainfall_stress': round(rainfall_stress, 2),
+            'season': str(seasons[0, 0]),
             'confidence': 0.75,
             'recommendations': self._generate_yield_recommendations(
                 rainfall_stress,
@@ -44,10 +51,81 @@ class YieldPredictor:
             )
         }
     
-    def _calculate_rainfall_stress(self, actual_rainfall, optimal_rainfall):
-        """Calculate stress factor based on rainfall deviation"""
-        deviation = abs(actual_rainfall - optimal_rainfall) / optimal_rainfall
-        return min(deviation, 1.0)  # Cap at 100% stress
+    def predict_yields(self, crops, districts, seasons=None):
+        """
+        Vectorized predict_yield: predicted yield (tonnes/ha) for every crop
+        in every district, shape (len(districts), len(crops)). See
+        season_yields for seasons; NaN for crops without requirements and
+        for districts that are None.
+        """
+        return self.season_yields(crops, districts, seasons)[1]
+    
+    def season_yields(self, crops, districts, seasons=None):
+        """
+        Rainfall stress, yield and the season they were measured in, for
+        every crop in every district, each of shape (len(districts),
+        len(crops)). districts are district_data dicts (or None).
+        
+        A crop's rainfall requirement is on the crop model's scale (mean
+        monthly rainfall over its growing season), so it is compared with
+        the district's mean monthly normal over a season's months, not the
+        annual total. seasons gives each district's season; without it,
+        every season is tried and the least-stressed one is kept per crop.
+        """
+        if seasons is None:
+            candidates = [SEASONS] * len(districts)
+        else:
+            candidates = [[season_key(season)] for season in seasons]
+        
+        monthly = np.array([
+            [monthly_rainfall(district, season) if district else np.nan for season in options]
+            for district, options in zip(districts, candidates)
+        ], dtype=float).reshape(len(districts), -1)
+        stress, yields = self._stress_and_yield(crops, monthly)
+        
+        # (district, season, crop) -> (district, crop) at the best season
+        best = np.argmin(np.nan_to_num(stress, nan=np.inf), axis=1)
+        rows = np.arange(len(districts))[:, None]
+        names = np.array(candidates, dtype=object).reshape(len(districts), -1)
+        return (
+            np.take_along_axis(stress, best[:, None, :], axis=1)[:, 0, :],
+            np.take_along_axis(yields, best[:, None, :], axis=1)[:, 0, :],
+            names[rows, best]
+        )
+    
+    def _stress_and_yield(self, crops, rainfall):
+        """Stress and yield for every crop at each mean monthly rainfall value"""
+        base_yields, optimal = self._yield_parameters(tuple(crops))
+        rainfall = np.asarray(rainfall, dtype=float)[..., None]
+        
+        stress = np.minimum(np.abs(rainfall - optimal) / optimal, 1.0)
+        return stress, base_yields * (1 - stress * 0.3)
+    
+    def build_grid(self, districts, coordinates=None):
+        """
+        Stress and yield for every known crop in every district, each in
+        the crop's least-stressed season, as (district, crop) arrays.
+        districts are district_data dicts; coordinates optionally maps a
+        DISTRICT_ID to (lat, lon).
+        """
+        crops = self.data_loader.get_available_crops()
+        stress, yields, seasons = self.season_yields(crops, districts)
+        
+        grid = YieldGrid(crops, districts, stress, yields, seasons, coordinates or {})
+        print(f"   - Yield grid: {len(crops)} crops x {len(districts)} districts")
+        return grid
+    
+    def _yield_parameters(self, crops):
+        """Base yields and optimal rainfall per crop, as aligned arrays"""
+        cache = self._parameters
+        if crops not in cache:
+            base_yields = np.array([BASE_YIELDS.get(c, DEFAULT_BASE_YIELD) for c in crops])
+            optimal = np.array([
+                (self.data_loader.get_crop_requirements(c) or {}).get('rainfall_avg', np.nan)
+                for c in crops
+            ], dtype=float)
+            cache[crops] = (base_yields, optimal)
+        return cache[crops]
     
     def _generate_yield_recommendations(self, stress, crop):
         """Generate recommendations to improve yield"""
@@ -62,3 +140,57 @@ class YieldPredictor:
         recommendations.append("Apply balanced NPK fertilizers based on soil test.")
         
         return recommendations
+
+
+class YieldGrid:
+    """Precomputed crop x district yields for heat-map style queries"""
+    
+    def __init__(self, crops, districts, stress, yields, seasons, coordinates):
+        self.crops = list(crops)
+        self.crop_index = {crop: i for i, crop in enumerate(self.crops)}
+        self.stress = stress
+        self.yields = yields
+        self.seasons = seasons
+        
+        self.districts = [district['DISTRICT'] for district in districts]
+        self.states = [district['STATE_UT_NAME'] for district in districts]
+        self.district_ids = [district.get('DISTRICT_ID') for district in districts]
+        self.state_keys = [normalize_state(state) for state in self.states]
+        self.coordinates = coordinates
+        
+        # Districts ordered from highest to lowest yield, per crop
+        self.ranking = np.argsort(-self.yields, axis=0, kind='stable')
+    
+    def __contains__(self, crop):
+        return crop in self.crop_index
+    
+    def _cell(self, row, col):
+        lat, lon = self.coordinates.get(self.district_ids[row], (None, None))
+        return {
+            'district': self.districts[row],
+            'state': self.states[row],
+            'predicted_yield_per_hectare': round(float(self.yields[row, col]), 2),
+            'rainfall_stress': round(float(self.stress[row, col]), 2),
+            'season': str(self.seasons[row, col]),
+            'lat': None if lat is None else round(float(lat), 5),
+            'lon': None if lon is None else round(float(lon), 5)
+        }
+    
+    def best_districts(self, crop, k=10, state=None):
+        """Top k districts by predicted yield for a crop, optionally in one state"""
+        col = self.crop_index[crop]
+        rows = self.ranking[:, col]
+        if state:
+            state = normalize_state(state)
+            rows = [row for row in rows if self.state_keys[row] == state]
+        return [self._cell(row, col) for row in rows[:k]]
+    
+    def yield_map(self, crop, state=None):
+        """Predicted yield for a crop in every district (or every district of a state)"""
+        col = self.crop_index[crop]
+        state = state and normalize_state(state)
+        return [
+            self._cell(row, col)
+            for row in range(len(self.districts))
+            if not state or self.state_keys[row] == state
+        ]
@@ -0,0 +1,327 @@
+"""
+Score a farm registry offline: crop recommendations and expected yield per row.
+
+Reads a CSV or Parquet registry in chunks. Each chunk is scored in a
+worker process: locations are resolved once per distinct value, and crops
+are scored in a single model call (or read from the recommendation table).
+Results are appended to the output CSV in input order. At most two chunks
+per worker are in flight, so memory stays bounded however large the input
+is.
+
+Input columns:
+    location    "District, State" or a district name (required)
+    soil_type   default loamy
+    season      default kharif
+    crop        crop to predict yield for; default the top recommendation
+
+After every chunk, a checkpoint next to the output records how many rows
+are done. Rerunning the same command resumes from there. Use --restart to
+start over.
+
+Usage:
+    python score_registry.py registry.csv scores.csv [--chunk-size 20000] [--workers N]
+    python score_registry.py registry.parquet scores.csv --top-n 3 --rank-by profit --id-column farm_id
+"""
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from models.artifact_store import ARTIFACT_DIR, ArtifactStore
+from models.crop_predictor import CropPredictor, RANKINGS
+from models.recommendation_table import RecommendationTable
+from models.yield_predictor import YieldPredictor
+from utils.data_loader import DataLoader
+from utils.feature_store import FeatureStore
+from utils.gazetteer import Gazetteer
+from utils.location_matcher import LocationMatcher
+from utils.price_store import PriceStore
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # Optional: only needed for Parquet input
+    pq = None
+
+CHUNK_SIZE = 20000
+
+# Bump when the output columns (or how they are computed) change, so old
+# checkpoints are not resumed
+CHECKPOINT_FORMAT = 2
+
+
+class RegistryScorer:
+    """Location matching, crop and yield models, built once per process"""
+
+    def __init__(self, artifact_dir, top_n, rank_by):
+        self.top_n = top_n
+        self.rank_by = rank_by
+
+        data_loader = DataLoader(cache_dir=os.path.join(artifact_dir, 'data'))
+        self.location_matcher = LocationMatcher(
+            data_loader, Gazetteer.open(data_loader, os.path.join(artifact_dir, 'gazetteer'))
+        )
+        feature_store = FeatureStore(self.location_matcher.records, self.location_matcher.coordinates)
+        self.yield_predictor = YieldPredictor(data_loader)
+        self.crop_predictor = CropPredictor(
+            data_loader,
+            artifact_store=ArtifactStore(artifact_dir),
+            yield_predictor=self.yield_predictor,
+            price_store=PriceStore.open(os.path.join(artifact_dir, 'prices')) if rank_by == 'profit' else None,
+            max_trees=int(os.environ.get('CROP_MODEL_TREES', 0)) or None,
+            feature_store=feature_store,
+            gazetteer=self.location_matcher.gazetteer
+        )
+        self.crop_predictor.use_table(RecommendationTable.open(
+            feature_store,
+            self.crop_predictor.model_version,
+            self.crop_predictor.model.classes_,
+            directory=os.path.join(artifact_dir, 'recommendations')
+        ))
+
+    def score(self, chunk, first_row, id_column=None):
+        """Score one input chunk; returns the output frame for it"""
+        n = len(chunk)
+        column = lambda name, default: _text_column(chunk, name, default)
+        locations = column('location', '')
+        districts = self.location_matcher.get_district_data_batch(locations)
+
+        results = self.crop_predictor.recommend_crops_batch(
+            [
+                {'district_data': district, 'soil_type': soil_type, 'season': season}
+                for district, soil_type, season in zip(
+                    districts, column('soil_type', 'loamy'), column('season', 'kharif')
+                )
+            ],
+            top_n=self.top_n,
+            rank_by=self.rank_by
+        )
+
+        out = {'row': np.arange(first_row, first_row + n)}
+        if id_column:
+            out[id_column] = chunk[id_column].to_numpy()
+        out['location'] = locations
+        out['state'] = [d['STATE_UT_NAME'] if d else '' for d in districts]
+        out['district'] = [d['DISTRICT'] if d else '' for d in districts]
+
+        for i in range(self.top_n):
+            ranked = [r['recommendations'][i] if len(r.get('recommendations', ())) > i else None
+                      for r in results]
+            out[f'crop_{i + 1}'] = [r['crop'] if r else '' for r in ranked]
+            out[f'score_{i + 1}'] = [round(r['suitability_score'], 4) if r else np.nan for r in ranked]
+
+        # Yield for the requested crop, else the top recommendation
+        requested = column('crop', '')
+        yield_crops = [crop.strip().lower() or top for crop, top in zip(requested, out['crop_1'])]
+        out['yield_crop'] = yield_crops
+        out['predicted_yield_t_ha'] = self._yields(yield_crops, districts, column('season', 'kharif'))
+        out['error'] = [
+            r.get('error') or (f'Crop "{crop}" not found' if np.isnan(y) else '')
+            for r, crop, y in zip(results, yield_crops, out['predicted_yield_t_ha'])
+        ]
+        return pd.DataFrame(out)
+
+    def _yields(self, crops, districts, seasons):
+        """Predicted yield per row in its season, one vectorized call for the whole chunk"""
+        names = sorted({crop for crop in crops if crop})
+        if not names:
+            return np.full(len(crops), np.nan)
+
+        yields = self.yield_predictor.predict_yields(names, districts, seasons)
+        position = {name: i for i, name in enumerate(names)}
+        picked = np.array([
+            yields[row, position[crop]] if crop else np.nan for row, crop in enumerate(crops)
+        ])
+        return np.round(picked, 2)
+
+
+def _text_column(chunk, name, default):
+    """A column as a list of stripped strings, blanks replaced by default"""
+    if name not in chunk:
+        return [default] * len(chunk)
+    values = chunk[name].astype(object).where(chunk[name].notna(), '')
+    return [str(value).strip() or default for value in values]
+
+
+_scorer = None
+
+
+def _init_worker(artifact_dir, top_n, rank_by):
+    """Build the scorer, unless it was inherited from the parent by fork"""
+    global _scorer
+    if _scorer is None:
+        _scorer = RegistryScorer(artifact_dir, top_n, rank_by)
+
+
+def _score_chunk(chunk, first_row, id_column):
+    return _scorer.score(chunk, first_row, id_column)
+
+
+def read_chunks(path, chunk_size, skip_rows=0):
+    """Yield (first row number, frame) chunks of a CSV or Parquet file"""
+    if path.endswith('.parquet'):
+        if pq is None:
+            raise SystemExit("Reading Parquet needs pyarrow: pip install pyarrow")
+
+        offset = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            start, offset = offset, offset + batch.num_rows
+            if offset <= skip_rows:
+                continue
+            chunk = batch.to_pandas()
+            if start < skip_rows:
+                chunk, start = chunk.iloc[skip_rows - start:], skip_rows
+            yield start, chunk
+        return
+
+    reader = pd.read_csv(
+        path, chunksize=chunk_size, dtype=str, keep_default_na=False,
+        skiprows=range(1, skip_rows + 1)
+    )
+    offset = skip_rows
+    for chunk in reader:
+        yield offset, chunk
+        offset += len(chunk)
+
+
+class Checkpoint:
+    """Rows done and output size, rewritten atomically after every chunk"""
+
+    def __init__(self, path, job):
+        self.path = path
+        self.job = job
+        self.rows = 0
+        self.output_bytes = 0
+        self.complete = False
+
+    def load(self):
+        """Resume state of the same job, or None if there is none"""
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if state.get('job') != self.job:
+            raise SystemExit(f"{self.path} belongs to a different input or options; "
+                             "rerun with --restart to start over")
+        self.rows = state['rows']
+        self.output_bytes = state['output_bytes']
+        self.complete = state['complete']
+        return self
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'job': self.job,
+                'rows': self.rows,
+                'output_bytes': self.output_bytes,
+                'complete': self.complete,
+            }, f)
+        os.replace(tmp_path, self.path)
+
+
+def job_description(args):
+    """What a checkpoint must match to be resumed"""
+    stat = os.stat(args.input)
+    return {
+        'format': CHECKPOINT_FORMAT,
+        'input': os.path.abspath(args.input),
+        'input_size': stat.st_size,
+        'input_mtime_ns': stat.st_mtime_ns,
+        'top_n': args.top_n,
+        'rank_by': args.rank_by,
+        'id_column': args.id_column,
+    }
+
+
+def _completed(value):
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('input', help='Registry to score (.csv or .parquet)')
+    parser.add_argument('output', help='CSV file to write scores to')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='Worker processes; 0 scores in this process')
+    parser.add_argument('--top-n', type=int, default=3)
+    parser.add_argument('--rank-by', choices=RANKINGS, default='suitability')
+    parser.add_argument('--id-column', help='Input column copied to the output as is')
+    parser.add_argument('--artifact-dir', default=ARTIFACT_DIR)
+    parser.add_argument('--restart', action='store_true', help='Ignore any checkpoint and start over')
+    args = parser.parse_args()
+
+    checkpoint = Checkpoint(f"{args.output}.checkpoint", job_description(args))
+    if args.restart or checkpoint.load() is None:
+        checkpoint = Checkpoint(checkpoint.path, checkpoint.job)
+    elif checkpoint.complete:
+        print(f"✅ {args.output} is already complete ({checkpoint.rows:,} rows); use --restart to redo it")
+        return
+    else:
+        print(f"   - Resuming after row {checkpoint.rows:,}")
+
+    # Build once here; fork-started workers inherit it instead of rebuilding
+    _init_worker(args.artifact_dir, args.top_n, args.rank_by)
+    pool = None
+    if args.workers > 0:
+        pool = ProcessPoolExecutor(
+            max_workers=args.workers,
+            initializer=_init_worker,
+            initargs=(args.artifact_dir, args.top_n, args.rank_by)
+        )
+    submit = pool.submit if pool else lambda fn, *a: _completed(fn(*a))
+    max_pending = 2 * max(args.workers, 1)
+
+    # Drop anything written after the last checkpoint
+    with open(args.output, 'a+b') as f:
+        f.truncate(checkpoint.output_bytes)
+
+    start = time.perf_counter()
+    scored = unmatched = 0
+
+    with open(args.output, 'a', newline='') as output:
+        def write(frame):
+            nonlocal scored, unmatched
+            frame.to_csv(output, header=checkpoint.output_bytes == 0, index=False)
+            output.flush()
+            os.fsync(output.fileno())
+
+            scored += len(frame)
+            unmatched += int((frame['state'] == '').sum())
+            checkpoint.rows += len(frame)
+            checkpoint.output_bytes = output.tell()
+            checkpoint.save()
+
+            elapsed = time.perf_counter() - start
+            print(f"   - {checkpoint.rows:,} rows done, {scored / elapsed:,.0f} rows/s")
+
+        try:
+            pending = deque()
+            for first_row, chunk in read_chunks(args.input, args.chunk_size, checkpoint.rows):
+                if 'location' not in chunk:
+                    raise SystemExit(f"{args.input} has no 'location' column")
+                pending.append(submit(_score_chunk, chunk, first_row, args.id_column))
+                if len(pending) >= max_pending:
+                    write(pending.popleft().result())
+            while pending:
+                write(pending.popleft().result())
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+
+    checkpoint.complete = True
+    checkpoint.save()
+    elapsed = time.perf_counter() - start
+    print(f"✅ Scored {scored:,} rows in {elapsed:.1f}s ({scored / max(elapsed, 1e-9):,.0f} rows/s); "
+          f"{unmatched:,} locations not found -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
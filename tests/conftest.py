@@ -0,0 +1,14 @@
+import os
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope='session')
+def client():
+    """Test client of the full app, built once (relative data paths need the repo root)"""
+    os.chdir(ROOT)
+    from app import app
+    return app.test_client()
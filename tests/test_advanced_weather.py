@@ -0,0 +1,29 @@
+import os
+from utils.advanced_weather import AdvancedWeatherAnalysis
+from utils.rainfall_cube import MONTHS
+
+COLUMNS = ['SUBDIVISION', 'YEAR', *MONTHS, 'ANNUAL', 'Jan-Feb', 'Mar-May', 'Jun-Sep', 'Oct-Dec']
+
+
+def write_history(path, annual_by_year, mtime):
+    with open(path, 'w') as f:
+        f.write(','.join(COLUMNS) + '\n')
+        for year, annual in annual_by_year.items():
+            monthly = [annual / 12] * 12
+            seasons = [annual, sum(monthly[:2]), sum(monthly[2:5]), sum(monthly[5:9]), sum(monthly[9:])]
+            f.write(','.join(['KONKAN & GOA', str(year), *map(str, monthly + seasons)]) + '\n')
+    os.utime(path, (mtime, mtime))
+
+
+def test_cube_is_rebuilt_when_the_history_file_changes(tmp_path):
+    path = str(tmp_path / 'history.csv')
+    write_history(path, {2000: 1000.0, 2001: 1100.0, 2002: 1200.0}, mtime=1_000_000_000)
+    first = AdvancedWeatherAnalysis(path)
+    assert AdvancedWeatherAnalysis(path).cube is first.cube
+
+    write_history(path, {2000: 3000.0, 2001: 2000.0, 2002: 1000.0, 2003: 500.0}, mtime=1_000_000_100)
+    second = AdvancedWeatherAnalysis(path)
+
+    assert second.cube is not first.cube
+    assert second.analyze_trends('KONKAN & GOA')['trend'] == 'decreasing'
+    assert first.analyze_trends('KONKAN & GOA')['trend'] == 'increasing'
@@ -0,0 +1,23 @@
+import json
+import os
+import subprocess
+import sys
+from conftest import ROOT
+
+PROBE = """
+import json
+from models.artifact_store import ArtifactStore
+from models.recommendation_table import TABLE_DIR
+from utils.data_cache import CACHE_DIR
+from utils.gazetteer import GAZETTEER_DIR
+from utils.price_store import PRICE_DIR
+print(json.dumps([ArtifactStore().artifact_dir, CACHE_DIR, GAZETTEER_DIR, PRICE_DIR, TABLE_DIR]))
+"""
+
+
+def test_artifact_dir_moves_every_default(tmp_path):
+    env = {**os.environ, 'ARTIFACT_DIR': str(tmp_path)}
+    output = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    paths = json.loads(output)
+    assert all(os.path.commonpath([path, str(tmp_path)]) == str(tmp_path) for path in paths)
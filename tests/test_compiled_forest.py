@@ -0,0 +1,33 @@
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from models.compiled_forest import CHUNK_ROWS, CompiledForest
+
+
+def fitted_forest():
+    X, y = make_classification(n_samples=600, n_features=7, n_informative=5,
+                               n_classes=4, random_state=0)
+    forest = RandomForestClassifier(n_estimators=25, random_state=0).fit(X, y)
+    return forest, X
+
+
+def test_matches_sklearn_exactly():
+    forest, X = fitted_forest()
+    compiled = CompiledForest.from_sklearn(forest)
+    rows = np.vstack([X, np.random.default_rng(0).normal(scale=3, size=(CHUNK_ROWS, X.shape[1]))])
+
+    np.testing.assert_array_equal(compiled.predict_proba(rows), forest.predict_proba(rows))
+    np.testing.assert_array_equal(compiled.predict(rows), forest.predict(rows))
+
+
+def test_subset_matches_the_same_trees_in_sklearn():
+    forest, X = fitted_forest()
+    trees = CompiledForest.from_sklearn(forest).select_trees(X, 5)
+    assert len(set(trees)) == 5
+
+    subset = RandomForestClassifier(n_estimators=5).fit(X[:10], np.arange(10) % 4)
+    subset.estimators_ = [forest.estimators_[i] for i in trees]
+    subset.classes_, subset.n_classes_ = forest.classes_, forest.n_classes_
+
+    compiled = CompiledForest.from_sklearn(forest, trees)
+    np.testing.assert_allclose(compiled.predict_proba(X), subset.predict_proba(X), rtol=0, atol=1e-12)
@@ -0,0 +1,61 @@
+import pytest
+
+
+def test_batch_reports_malformed_items_individually(client):
+    response = client.post('/crop-recommendation/batch', json={
+        'items': [
+            {'location': 'Pune', 'soil_type': 'loamy'},
+            {'location': 5},
+            'Pune',
+            {'location': 'Pune', 'soil_type': ['loamy']},
+        ],
+        'top_n': 2
+    })
+
+    assert response.status_code == 200
+    results = response.json['results']
+    assert len(results[0]['recommendations']) == 2
+    assert [result.get('error') for result in results[1:]] == [
+        '"location" must be a string',
+        'Item must be an object',
+        '"soil_type" must be a string',
+    ]
+    assert response.json['errors'] == 3
+
+
+def test_batch_matches_single_requests(client):
+    items = [
+        {'location': 'Pune', 'soil_type': 'clay', 'season': 'rabi'},
+        {'location': 'Patna', 'soil_type': 'loamy', 'season': 'kharif'},
+    ]
+    batch = client.post('/crop-recommendation/batch', json={'items': items, 'top_n': 5}).json['results']
+    for item, result in zip(items, batch):
+        single = client.post('/crop-recommendation', json=item).json
+        assert result['recommendations'] == single
+
+
+@pytest.mark.parametrize('top_n', [0, -1, 'x', None])
+def test_batch_rejects_bad_top_n(client, top_n):
+    response = client.post('/crop-recommendation/batch', json={
+        'items': [{'location': 'Pune'}], 'top_n': top_n
+    })
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('payload, error', [
+    ({'location': ['Pune']}, '"location" must be a string'),
+    ({'location': 'Pune', 'soil_type': 5}, '"soil_type" must be a string'),
+    ({'location': 'Pune', 'season': {'name': 'kharif'}}, '"season" must be a string'),
+    (['Pune'], 'Request body must be an object'),
+])
+def test_single_rejects_wrong_types(client, payload, error):
+    response = client.post('/crop-recommendation', json=payload)
+    assert response.status_code == 400
+    assert response.json == {'error': error}
+
+
+def test_single_null_fields_use_defaults(client):
+    defaults = client.post('/crop-recommendation', json={'location': 'Pune'}).json
+    response = client.post('/crop-recommendation', json={'location': 'Pune', 'soil_type': None, 'season': None})
+    assert response.status_code == 200
+    assert response.json == defaults
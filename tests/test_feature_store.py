@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from utils.data_loader import DataLoader
+from utils.feature_store import (
+    DEFAULT_HUMIDITY, DEFAULT_TEMPERATURE, FEATURES, SEASONS, SOILS, FeatureStore, district_features
+)
+from utils.location_matcher import LocationMatcher
+
+
+@pytest.fixture(scope='module')
+def store():
+    matcher = LocationMatcher(DataLoader())
+    return matcher, FeatureStore(matcher.records, matcher.coordinates)
+
+
+def test_defaults_are_close_to_the_training_means():
+    crops = DataLoader().get_crop_data()
+    assert abs(crops['temperature'].mean() - DEFAULT_TEMPERATURE) < crops['temperature'].std() / 4
+    assert abs(crops['humidity'].mean() - DEFAULT_HUMIDITY) < crops['humidity'].std() / 4
+
+
+def test_rows_match_direct_features(store):
+    matcher, features = store
+    pune = matcher.get_district_data('Pune')
+    for soil in SOILS:
+        for season in SEASONS:
+            expected = district_features(pune, soil, season)
+            assert np.allclose(features.lookup(pune, soil, season), expected)
+
+
+def test_rainfall_is_the_seasonal_monthly_mean(store):
+    matcher, features = store
+    pune = matcher.get_district_data('Pune')
+    row = features.lookup(pune, 'loamy', 'kharif')
+    kharif = [pune[month] for month in ('JUN', 'JUL', 'AUG', 'SEP')]
+    assert row[FEATURES.index('rainfall')] == pytest.approx(np.mean(kharif))
+    assert row[FEATURES.index('temperature')] == DEFAULT_TEMPERATURE
+    assert row[FEATURES.index('humidity')] == DEFAULT_HUMIDITY
+
+
+def test_weather_replaces_the_defaults_for_one_season():
+    matcher = LocationMatcher(DataLoader())
+    features = FeatureStore(matcher.records, matcher.coordinates)
+    pune = matcher.get_district_data('Pune')
+    row = features.row(pune)
+
+    features.apply_weather({row: {'temperature': 31.0, 'humidity': 40.0}}, 'kharif')
+
+    kharif = features.lookup(pune, 'clay', 'kharif')
+    assert (kharif[FEATURES.index('temperature')], kharif[FEATURES.index('humidity')]) == (31.0, 40.0)
+    rabi = features.lookup(pune, 'clay', 'rabi')
+    assert rabi[FEATURES.index('temperature')] == DEFAULT_TEMPERATURE
@@ -0,0 +1,19 @@
+from utils.data_loader import DataLoader
+from utils.gazetteer import Gazetteer, source_version
+
+
+def write_dump(path, district):
+    path.write_text('state,district\nMaharashtra,' + district + '\n')
+    return str(path)
+
+
+def test_price_aliases_come_from_every_dump(tmp_path):
+    data_loader = DataLoader()
+    dumps = [write_dump(tmp_path / 'a.csv', 'Pune'), write_dump(tmp_path / 'b.csv', 'Nagpur')]
+
+    gazetteer = Gazetteer.build(data_loader, dumps)
+
+    price_names = {name for name, _, source in gazetteer.aliases if source == 'prices'}
+    assert price_names == {'Pune', 'Nagpur'}
+    assert gazetteer.version == source_version(data_loader.data_dir, dumps)
+    assert gazetteer.version != source_version(data_loader.data_dir, dumps[:1])
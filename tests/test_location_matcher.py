@@ -0,0 +1,38 @@
+import pytest
+from utils.data_loader import DataLoader
+from utils.gazetteer import Gazetteer
+from utils.location_matcher import LocationMatcher
+
+
+class PartialRainfall(DataLoader):
+    """Rainfall table without the districts named in `drop`"""
+
+    def __init__(self, drop):
+        super().__init__()
+        self.drop = drop
+
+    def get_rainfall_data(self):
+        df = super().get_rainfall_data()
+        return df[~df['DISTRICT'].isin(self.drop)]
+
+
+@pytest.fixture(scope='module')
+def gazetteer():
+    return Gazetteer.open(DataLoader())
+
+
+def test_districts_without_rainfall_are_skipped(gazetteer):
+    matcher = LocationMatcher(PartialRainfall(['PUNE', 'NAGPUR']), gazetteer)
+
+    assert matcher.unmatched == 2
+    assert len(matcher.records) == len(gazetteer) - 2
+    assert matcher.get_district_data('Pune, Maharashtra') is None
+    assert matcher.get_district_data('Satara, Maharashtra')['DISTRICT'] == 'SATARA'
+    nearby = {d['district'] for d in matcher.get_nearest_districts(18.52, 73.86, k=10)}
+    assert 'PUNE' not in nearby and 'SATARA' in nearby
+
+
+def test_no_matching_district_raises(gazetteer):
+    rainfall = DataLoader().get_rainfall_data()
+    with pytest.raises(ValueError):
+        LocationMatcher(PartialRainfall(list(rainfall['DISTRICT'])), gazetteer)
@@ -0,0 +1,19 @@
+import pytest
+
+
+def test_misspelt_name_finds_the_district(client):
+    response = client.get('/api/locations/search?q=puen&k=3')
+    assert response.status_code == 200
+    assert response.json['matches'][0]['district'] == 'PUNE'
+
+
+def test_k_limits_results(client):
+    response = client.get('/api/locations/search?q=pune&k=3')
+    assert len(response.json['matches']) == 3
+
+
+@pytest.mark.parametrize('k', [0, -1])
+def test_k_must_be_positive(client, k):
+    response = client.get(f'/api/locations/search?q=pune&k={k}')
+    assert response.status_code == 400
+    assert response.json == {'error': 'k must be at least 1'}
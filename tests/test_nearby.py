@@ -0,0 +1,49 @@
+import pytest
+
+PUNE = 'lat=18.52&lon=73.86'
+
+
+def test_nearest_district_comes_first(client):
+    response = client.get(f'/api/nearby?{PUNE}&k=3')
+    assert response.status_code == 200
+    districts = response.json['districts']
+    assert len(districts) == 3
+    assert districts[0]['district'] == 'PUNE'
+
+
+def test_batch_of_points(client):
+    response = client.post('/api/nearby', json={
+        'points': [{'lat': 18.52, 'lon': 73.86}, {'lat': 25.6, 'lon': 85.1}], 'k': 2
+    })
+    assert response.status_code == 200
+    results = response.json['results']
+    assert [len(result) for result in results] == [2, 2]
+
+
+@pytest.mark.parametrize('k', [0, -1])
+def test_k_must_be_positive(client, k):
+    response = client.get(f'/api/nearby?{PUNE}&k={k}')
+    assert response.status_code == 400
+    assert response.json == {'error': 'k must be at least 1'}
+
+    response = client.post('/api/nearby', json={'points': [{'lat': 18.52, 'lon': 73.86}], 'k': k})
+    assert response.status_code == 400
+
+
+def test_misplaced_geocodes_are_dropped(client):
+    # GADCHIROLI's source geocode points at Mumbai
+    response = client.get(f'/api/nearby?{PUNE}&k=10')
+    assert 'GADCHIROLI' not in [district['district'] for district in response.json['districts']]
+
+
+@pytest.mark.parametrize('radius', ['-5', '0', 'nan', 'inf'])
+def test_radius_must_be_positive_and_finite(client, radius):
+    response = client.get(f'/api/nearby?{PUNE}&radius_km={radius}')
+    assert response.status_code == 400
+    assert response.json == {'error': 'radius_km must be a positive number'}
+
+
+def test_radius_limits_distance(client):
+    response = client.get(f'/api/nearby?{PUNE}&radius_km=150&k=50')
+    distances = [district['distance_km'] for district in response.json['districts']]
+    assert distances and max(distances) <= 150
@@ -0,0 +1,92 @@
+import csv
+import numpy as np
+import pandas as pd
+import pytest
+from utils.price_store import MAX_DAY, PriceStore, parse_date
+
+HEADER = ['state', 'district', 'market', 'commodity', 'variety',
+          'arrival_date', 'min_price', 'max_price', 'modal_price']
+
+
+def write_dump(path, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+    return str(path)
+
+
+def row(district, date, modal, state='Maharashtra', commodity='Onion'):
+    return [state, district, 'Market', commodity, 'Other', date, modal - 100, modal + 100, modal]
+
+
+def test_query_days_outside_key_range_do_not_spill(tmp_path):
+    store = PriceStore()
+    store.ingest(write_dump(tmp_path / 'prices.csv', [
+        row('Pune', '01/03/2019', 1000),
+        row('Pune', '02/03/2019', 1100),
+        row('Satara', '01/03/2019', 2000),
+    ]))
+
+    assert len(store.query('Onion', 'Pune', start=-10, end=MAX_DAY + 10)) == 2
+    assert store.query('Onion', 'Pune', start=-10, end=-1) == []
+    assert store.query('Onion', 'Pune', start=MAX_DAY + 1) == []
+    assert [r['district'] for r in store.query('Onion', 'Pune', end=parse_date('01/03/2019'))] == ['Pune']
+
+
+def test_rows_dated_before_the_epoch_are_dropped(tmp_path):
+    store = PriceStore()
+    added = store.ingest(write_dump(tmp_path / 'prices.csv', [
+        row('Pune', '31/12/1969', 900),
+        row('Pune', '01/03/2019', 1000),
+    ]))
+
+    assert added == 1
+    assert [r['modal_price'] for r in store.query('Onion', 'Pune')] == [1000.0]
+
+
+def test_reingesting_a_changed_file_replaces_its_rows(tmp_path):
+    store = PriceStore()
+    path = write_dump(tmp_path / 'prices.csv', [row('Pune', '01/03/2019', 1000)])
+    other = write_dump(tmp_path / 'other.csv', [row('Satara', '01/03/2019', 2000)])
+    assert store.ingest(path) == 1
+    assert store.ingest(other) == 1
+    assert store.ingest(path) == 0
+
+    write_dump(path, [row('Pune', '01/03/2019', 1000), row('Pune', '02/03/2019', 1200)])
+    assert store.ingest(path) == 2
+    assert len(store) == 3
+    assert [r['modal_price'] for r in store.query('Onion', 'Pune')] == [1000.0, 1200.0]
+    assert len(store.query('Onion', 'Satara')) == 1
+
+
+def test_same_district_name_in_two_states(tmp_path):
+    store = PriceStore()
+    store.ingest(write_dump(tmp_path / 'prices.csv', [
+        row('Aurangabad', '01/03/2019', 1000, state='Maharashtra'),
+        row('Aurangabad', '01/03/2019', 3000, state='Bihar'),
+    ]))
+
+    assert len(store.query('Onion', 'Aurangabad')) == 2
+    bihar = store.query('Onion', 'Aurangabad', state='Bihar')
+    assert [r['modal_price'] for r in bihar] == [3000.0]
+    assert np.isclose(store.modal_summary('Onion', 'Aurangabad', state='Maharashtra')['median_modal_price'], 1000.0)
+
+
+def test_failed_ingest_leaves_no_labels_behind(tmp_path):
+    store = PriceStore()
+    store.ingest(write_dump(tmp_path / 'prices.csv', [row('Pune', '01/03/2019', 1000)]))
+    categories = {column: list(labels) for column, labels in store.categories.items()}
+    places = list(store.places)
+
+    # The first chunk encodes a new district, then the second fails to parse
+    path = write_dump(tmp_path / 'broken.csv', [row('Nashik', '01/03/2019', 1500)])
+    with open(path, 'a') as f:
+        f.write('Maharashtra,"Nashik,Market\n')
+    with pytest.raises(pd.errors.ParserError):
+        store.ingest(path, chunksize=1)
+
+    assert store.categories == categories
+    assert store.places == places
+    assert store.query('Onion', 'Nashik') == []
+    assert len(store.query('Onion', 'Pune')) == 1
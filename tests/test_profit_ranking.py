@@ -0,0 +1,28 @@
+def recommend(client, location, season):
+    response = client.post('/crop-recommendation', json={
+        'location': location, 'season': season, 'rank_by': 'profit', 'soil_type': 'loamy'
+    })
+    assert response.status_code == 200
+    return response.json
+
+
+def test_unpriced_crops_keep_their_suitability_place(client):
+    ranked = recommend(client, 'Jaipur', 'kharif')
+    by_suitability = client.post('/crop-recommendation', json={
+        'location': 'Jaipur', 'season': 'kharif', 'soil_type': 'loamy'
+    }).json
+
+    for position, crop in enumerate(ranked):
+        if crop['ranked_by'] == 'suitability':
+            assert crop['profit_score'] is None
+            assert by_suitability[position]['crop'] == crop['crop']
+        else:
+            assert crop['profit_score'] is not None
+    assert 'suitability' in {crop['ranked_by'] for crop in ranked}
+
+
+def test_yields_follow_the_requested_season(client):
+    kharif = {crop['crop']: crop['predicted_yield_per_hectare'] for crop in recommend(client, 'Pune', 'kharif')}
+    rabi = {crop['crop']: crop['predicted_yield_per_hectare'] for crop in recommend(client, 'Pune', 'rabi')}
+    shared = kharif.keys() & rabi.keys()
+    assert shared and any(kharif[crop] != rabi[crop] for crop in shared)
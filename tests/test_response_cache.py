@@ -0,0 +1,25 @@
+import pytest
+
+
+@pytest.mark.parametrize('variant', [
+    {'location': 'pune', 'soil_type': 'Loamy ', 'season': 'Kharif'},
+    {'location': ' PUNE', 'soil_type': 'LOAMY', 'season': ' kharif '},
+])
+def test_case_variants_share_one_entry(client, variant):
+    canonical = {'location': 'Pune', 'soil_type': 'loamy', 'season': 'kharif'}
+    first = client.post('/crop-recommendation', json=canonical)
+    response = client.post('/crop-recommendation', json=variant)
+
+    assert response.status_code == 200
+    assert response.headers['X-Cache'] == 'HIT'
+    assert response.headers['ETag'] == first.headers['ETag']
+
+
+def test_season_case_does_not_change_the_answer(client):
+    # Equal cache keys are only correct if scoring ignores case too
+    from app import snapshots
+    snapshot = snapshots.current
+    district = snapshot.location_matcher.get_district_data('Pune')
+    lower = snapshot.crop_predictor.recommend_crops(district, 'loamy', 'rabi')
+    assert snapshot.crop_predictor.recommend_crops(district, ' Loamy', 'RABI ') == lower
+    assert snapshot.crop_predictor.recommend_crops(district, 'loamy', 'kharif') != lower
@@ -0,0 +1,82 @@
+import json
+import os
+import pytest
+import score_registry
+
+LOCATIONS = ['Pune', 'Nashik, Maharashtra', 'Patna', 'Nowhere', 'Ludhiana',
+             'Mysore', 'Guntur', 'Jaipur', 'Kolkata', 'Madurai']
+
+
+def run(monkeypatch, *args):
+    monkeypatch.setattr('sys.argv', ['score_registry.py', *args, '--workers', '0', '--chunk-size', '3'])
+    score_registry.main()
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.chdir(os.path.dirname(os.path.abspath(score_registry.__file__)))
+    path = tmp_path / 'registry.csv'
+    path.write_text('farm_id,location,soil_type\n' + ''.join(
+        f'F{i},"{location}",loamy\n' for i, location in enumerate(LOCATIONS)
+    ))
+    return str(path)
+
+
+def test_resume_after_interruption_matches_an_uninterrupted_run(tmp_path, monkeypatch, registry):
+    expected = str(tmp_path / 'expected.csv')
+    run(monkeypatch, registry, expected, '--id-column', 'farm_id')
+
+    output = str(tmp_path / 'scores.csv')
+    score_chunk = score_registry._score_chunk
+    calls = []
+
+    def failing_score_chunk(*args):
+        calls.append(args)
+        if len(calls) == 3:
+            raise RuntimeError('interrupted')
+        return score_chunk(*args)
+
+    monkeypatch.setattr(score_registry, '_score_chunk', failing_score_chunk)
+    with pytest.raises(RuntimeError):
+        run(monkeypatch, registry, output, '--id-column', 'farm_id')
+
+    with open(f'{output}.checkpoint') as f:
+        checkpoint = json.load(f)
+    assert checkpoint['rows'] == 3 and not checkpoint['complete']
+
+    # A write cut short after the checkpoint is discarded on resume
+    with open(output, 'a') as f:
+        f.write('3,F3,Nowh')
+
+    monkeypatch.setattr(score_registry, '_score_chunk', score_chunk)
+    run(monkeypatch, registry, output, '--id-column', 'farm_id')
+
+    with open(output) as f, open(expected) as g:
+        assert f.read() == g.read()
+    with open(f'{output}.checkpoint') as f:
+        assert json.load(f)['complete']
+
+
+def test_checkpoint_of_other_options_is_not_resumed(tmp_path, monkeypatch, registry):
+    output = str(tmp_path / 'scores.csv')
+    run(monkeypatch, registry, output)
+
+    with pytest.raises(SystemExit):
+        run(monkeypatch, registry, output, '--id-column', 'farm_id')
+
+
+def test_yield_uses_each_rows_season(monkeypatch, registry):
+    scorer = score_registry.RegistryScorer('artifacts', 3, 'suitability')
+    chunk = score_registry.pd.DataFrame({
+        'location': ['Pune', 'Pune', 'Nowhere'],
+        'season': ['kharif', 'zaid', 'kharif'],
+        'crop': ['rice', 'rice', 'rice'],
+    })
+    scores = scorer.score(chunk, 0)
+
+    district = scorer.location_matcher.get_district_data('Pune')
+    expected = [scorer.yield_predictor.predict_yield('rice', district, 'loamy', season)['predicted_yield_per_hectare']
+                for season in ('kharif', 'zaid')]
+    assert list(scores['predicted_yield_t_ha'][:2]) == expected
+    assert expected[0] != expected[1]
+    assert score_registry.np.isnan(scores['predicted_yield_t_ha'][2])
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from models.yield_predictor import YieldPredictor
+from utils.data_loader import DataLoader
+from utils.location_matcher import LocationMatcher
+
+
+@pytest.fixture(scope='module')
+def setup():
+    data_loader = DataLoader()
+    districts = LocationMatcher(data_loader).records
+    predictor = YieldPredictor(data_loader)
+    return predictor, districts, predictor.build_grid(districts)
+
+
+def test_predict_yield_matches_its_grid_cell(setup):
+    predictor, districts, grid = setup
+    for row in range(0, len(districts), 7):
+        for crop in grid.crops:
+            col = grid.crop_index[crop]
+            predicted = predictor.predict_yield(crop, districts[row], 'loamy')
+            assert predicted['predicted_yield_per_hectare'] == round(float(grid.yields[row, col]), 2)
+            assert predicted['rainfall_stress'] == round(float(grid.stress[row, col]), 2)
+            assert predicted['season'] == grid.seasons[row, col]
+
+
+def test_rainfall_stress_is_not_saturated(setup):
+    _, _, grid = setup
+    assert (grid.stress >= 1).mean() < 0.05
+    assert (grid.stress[:, grid.crop_index['rice']] < 1).sum() > len(grid.districts) // 2
+
+
+def test_season_is_honoured(setup):
+    predictor, districts, _ = setup
+    district = next(d for d in districts if d['DISTRICT'] == 'PUNE')
+    kharif = predictor.predict_yield('rice', district, 'loamy', 'kharif')
+    zaid = predictor.predict_yield('rice', district, 'loamy', 'zaid')
+    assert (kharif['season'], zaid['season']) == ('kharif', 'zaid')
+    assert kharif['rainfall_stress'] < zaid['rainfall_stress']
+
+    vectorized = predictor.predict_yields(['rice'], [district, None], ['zaid', 'kharif'])
+    assert vectorized[0, 0] == pytest.approx(zaid['predicted_yield_per_hectare'], abs=0.005)
+    assert np.isnan(vectorized[1, 0])
+
+
+def test_best_districts_endpoint(client):
+    response = client.get('/api/yield/best-districts?crop=rice&k=3')
+    assert response.status_code == 200
+    districts = response.json['districts']
+    assert len(districts) == 3
+    yields = [district['predicted_yield_per_hectare'] for district in districts]
+    assert yields == sorted(yields, reverse=True)
+
+
+@pytest.mark.parametrize('k', [0, -3])
+def test_best_districts_k_must_be_positive(client, k):
+    response = client.get(f'/api/yield/best-districts?crop=rice&k={k}')
+    assert response.status_code == 400
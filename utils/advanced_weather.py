@@ -1,71 +1,119 @@
-import pandas as pd
+import threading
 import numpy as np
-from datetime import datetime
+from utils.data_cache import load_table
+from utils.rainfall_cube import RainfallCube, MONTHS
+from utils.location_index import normalize_state
+
+# Meteorological subdivisions covering each state of the district table
+STATE_SUBDIVISIONS = {
+    'ANDAMAN AND NICOBAR ISLANDS': ['ANDAMAN & NICOBAR ISLANDS'],
+    'ANDHRA PRADESH': ['COASTAL ANDHRA PRADESH', 'TELANGANA', 'RAYALSEEMA'],
+    'ARUNACHAL PRADESH': ['ARUNACHAL PRADESH'],
+    'ASSAM': ['ASSAM & MEGHALAYA'],
+    'BIHAR': ['BIHAR'],
+    'CHANDIGARH': ['HARYANA DELHI & CHANDIGARH'],
+    'CHATISGARH': ['CHHATTISGARH'],
+    'DADAR NAGAR HAVELI': ['GUJARAT REGION'],
+    'DAMAN AND DUI': ['GUJARAT REGION'],
+    'DELHI': ['HARYANA DELHI & CHANDIGARH'],
+    'GOA': ['KONKAN & GOA'],
+    'GUJARAT': ['GUJARAT REGION', 'SAURASHTRA & KUTCH'],
+    'HARYANA': ['HARYANA DELHI & CHANDIGARH'],
+    'HIMACHAL': ['HIMACHAL PRADESH'],
+    'JAMMU AND KASHMIR': ['JAMMU & KASHMIR'],
+    'JHARKHAND': ['JHARKHAND'],
+    'KARNATAKA': ['COASTAL KARNATAKA', 'NORTH INTERIOR KARNATAKA', 'SOUTH INTERIOR KARNATAKA'],
+    'KERALA': ['KERALA'],
+    'LAKSHADWEEP': ['LAKSHADWEEP'],
+    'MADHYA PRADESH': ['WEST MADHYA PRADESH', 'EAST MADHYA PRADESH'],
+    'MAHARASHTRA': ['KONKAN & GOA', 'MADHYA MAHARASHTRA', 'MATATHWADA', 'VIDARBHA'],
+    'MANIPUR': ['NAGA MANI MIZO TRIPURA'],
+    'MEGHALAYA': ['ASSAM & MEGHALAYA'],
+    'MIZORAM': ['NAGA MANI MIZO TRIPURA'],
+    'NAGALAND': ['NAGA MANI MIZO TRIPURA'],
+    'ORISSA': ['ORISSA'],
+    'PONDICHERRY': ['TAMIL NADU'],
+    'PUNJAB': ['PUNJAB'],
+    'RAJASTHAN': ['WEST RAJASTHAN', 'EAST RAJASTHAN'],
+    'SIKKIM': ['SUB HIMALAYAN WEST BENGAL & SIKKIM'],
+    'TAMIL NADU': ['TAMIL NADU'],
+    'TRIPURA': ['NAGA MANI MIZO TRIPURA'],
+    'UTTAR PRADESH': ['EAST UTTAR PRADESH', 'WEST UTTAR PRADESH'],
+    'UTTARANCHAL': ['UTTARAKHAND'],
+    'WEST BENGAL': ['GANGETIC WEST BENGAL', 'SUB HIMALAYAN WEST BENGAL & SIKKIM'],
+}
+
+_cubes = {}
+_cubes_lock = threading.Lock()
+
+
+def load_cube(historical_data_path, historical_data):
+    """
+    RainfallCube for a history file, built once per process and again
+    whenever load_table() hands out a new frame for it (the file changed)
+    """
+    with _cubes_lock:
+        cached = _cubes.get(historical_data_path)
+        if cached is None or cached[0] is not historical_data:
+            cached = _cubes[historical_data_path] = (historical_data, RainfallCube(historical_data))
+        return cached[1]
+
 
 class AdvancedWeatherAnalysis:
     """Advanced weather pattern analysis"""
     
     def __init__(self, historical_data_path):
-        self.historical_data = pd.read_csv(historical_data_path)
+        # Shared by every instance in the process
+        self.historical_data = load_table(historical_data_path)
+        self.cube = load_cube(historical_data_path, self.historical_data)
     
-    def analyze_trends(self, subdivision, years=10):
-        """Analyze rainfall trends over years"""
-        data = self.historical_data[
-            self.historical_data['SUBDIVISION'] == subdivision
-        ].sort_values('YEAR').tail(years)
-        
-        if data.empty:
-            return None
-        
-        # Calculate trends
-        annual_avg = data['ANNUAL'].mean()
-        annual_std = data['ANNUAL'].std()
-        
-        # Seasonal patterns
-        monsoon_avg = data['Jun-Sep'].mean()
-        winter_avg = data['Oct-Dec'].mean()
-        summer_avg = data['Mar-May'].mean()
-        
-        # Trend direction
-        years_list = data['YEAR'].values
-        rainfall_list = data['ANNUAL'].values
-        
-        if len(years_list) > 1:
-            trend_slope = np.polyfit(years_list, rainfall_list, 1)[0]
-        else:
-            trend_slope = 0
+    @property
+    def subdivisions(self):
+        return list(self.cube.subdivisions)
+    
+    def _trend_stats(self, years, rows=None):
+        stats = self.cube.trends(years)
+        return stats if rows is None else {k: v[rows] for k, v in stats.items()}
+    
+    @staticmethod
+    def _format_trend(stats, i):
+        annual_avg = float(stats['annual_average'][i])
+        annual_std = float(stats['standard_deviation'][i])
+        trend_slope = float(stats['trend_slope'][i])
         
         return {
             'annual_average': round(annual_avg, 2),
             'standard_deviation': round(annual_std, 2),
-            'monsoon_average': round(monsoon_avg, 2),
+            'monsoon_average': round(float(stats['monsoon_average'][i]), 2),
             'trend': 'increasing' if trend_slope > 0 else 'decreasing',
             'trend_magnitude': abs(round(trend_slope, 2)),
             'variability': 'high' if annual_std > annual_avg * 0.2 else 'moderate'
         }
     
-    def predict_drought_risk(self, subdivision, current_year):
-        """Predict drought risk based on historical patterns"""
-        data = self.historical_data[
-            self.historical_data['SUBDIVISION'] == subdivision
-        ]
-        
-        if data.empty:
-            return {'risk': 'unknown', 'probability': 0}
-        
-        # Calculate percentiles
-        annual_rainfall = data['ANNUAL'].values
-        p25 = np.percentile(annual_rainfall, 25)
-        
-        recent_years = data[data['YEAR'] >= current_year - 5]['ANNUAL'].mean()
+    def analyze_trends(self, subdivision, years=10):
+        """Analyze rainfall trends over years"""
+        row = self.cube.subdivision_index.get(subdivision)
+        if row is None:
+            return None
         
-        if recent_years < p25:
+        return self._format_trend(self._trend_stats(years, [row]), 0)
+    
+    def analyze_all_trends(self, years=10):
+        """Rainfall trends for every subdivision in one pass"""
+        stats = self._trend_stats(years)
+        return {
+            name: self._format_trend(stats, i)
+            for i, name in enumerate(self.cube.subdivisions)
+        }
+    
+    def _drought_risk(self, recent, p25, p40):
+        if recent < p25:
             return {
                 'risk': 'high',
                 'probability': 0.7,
                 'recommendation': 'Water conservation measures strongly advised'
             }
-        elif recent_years < np.percentile(annual_rainfall, 40):
+        elif recent < p40:
             return {
                 'risk': 'moderate',
                 'probability': 0.4,
@@ -78,23 +126,50 @@ class AdvancedWeatherAnalysis:
                 'recommendation': 'Normal water management practices'
             }
     
+    def predict_drought_risk(self, subdivision, current_year):
+        """Predict drought risk based on historical patterns"""
+        row = self.cube.subdivision_index.get(subdivision)
+        if row is None:
+            return {'risk': 'unknown', 'probability': 0}
+        
+        recent = self.cube.recent_average(current_year - 5, [row])[0]
+        return self._drought_risk(recent, self.cube.p25[row], self.cube.p40[row])
+    
+    def predict_all_drought_risk(self, current_year):
+        """Drought risk for every subdivision in one pass"""
+        recent = self.cube.recent_average(current_year - 5)
+        return {
+            name: {
+                **self._drought_risk(recent[i], self.cube.p25[i], self.cube.p40[i]),
+                'recent_average': None if np.isnan(recent[i]) else round(float(recent[i]), 2)
+            }
+            for i, name in enumerate(self.cube.subdivisions)
+        }
+    
+    @property
+    def latest_year(self):
+        """Last year with recorded rainfall"""
+        return int(self.cube.years[-1])
+    
+    def state_subdivisions(self, state):
+        """Subdivisions covering a state, in any spelling normalize_state accepts"""
+        return STATE_SUBDIVISIONS.get(normalize_state(state), [])
+    
+    def predict_state_drought_risk(self, state, current_year):
+        """Drought risk for each subdivision covering a state"""
+        return {
+            subdivision: self.predict_drought_risk(subdivision, current_year)
+            for subdivision in self.state_subdivisions(state)
+        }
+    
     def get_optimal_planting_window(self, subdivision):
         """Determine optimal planting windows"""
-        data = self.historical_data[
-            self.historical_data['SUBDIVISION'] == subdivision
-        ].tail(10)
-        
-        if data.empty:
+        row = self.cube.subdivision_index.get(subdivision)
+        if row is None:
             return None
         
-        # Analyze monthly patterns
-        months = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 
-                  'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
-        
-        monthly_avg = {}
-        for month in months:
-            if month in data.columns:
-                monthly_avg[month] = data[month].mean()
+        # Monthly averages over the last 10 recorded years
+        monthly_avg = dict(zip(MONTHS, self.cube.recent_monthly_avg[row]))
         
         # Find optimal windows
         kharif_start = next((m for m in ['JUN', 'JUL'] if monthly_avg.get(m, 0) > 100), 'JUN')
@@ -0,0 +1,203 @@
+"""
+Columnar .npy cache for the datasets under data/, with compact dtypes and
+memory-mapped loading so forked workers share the pages. Files without an
+up-to-date cache are parsed from source with the same dtypes.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import numpy as np
+import pandas as pd
+from models.artifact_store import ARTIFACT_DIR
+
+CACHE_DIR = os.path.join(ARTIFACT_DIR, 'data')
+
+# Bump when the on-disk layout or the schemas below change
+CACHE_FORMAT = 1
+
+# Per-file read options and numeric dtype narrowing. Text columns are always
+# stored as categoricals. Values echoed verbatim into API responses stay
+# float64 so that they serialize exactly as written in the CSV.
+SCHEMAS = {
+    'Crop_recommendation.csv': {
+        'dtypes': {'N': 'int16', 'P': 'int16', 'K': 'int16'},
+    },
+    'rainfall_lat_long.csv': {
+        'dtypes': {'Unnamed: 0': 'int16'},
+    },
+    'rainfall_lat_long_fuzzy.csv': {
+        'dtypes': {'Unnamed: 0': 'int16'},
+    },
+    'city_lat.csv': {
+        'dtypes': {'Unnamed: 0': 'int16'},
+    },
+    'district-wise-rainfall-normal.csv': {},
+    'rainfall in india 1901-2015.csv': {
+        'dtypes': {'YEAR': 'int16', '*': 'float32'},
+    },
+    'ApportionedIdentifiers.csv': {},
+    'list_of_latitudelongitude_of_cities_of_india-2049j.csv': {
+        'read': {'encoding': 'latin-1'},
+    },
+    'cities_list.xlsx': {},
+    'geocode_rejects.csv': {},
+}
+
+_tables = {}
+_lock = threading.Lock()
+
+
+def _cache_path(source_path, cache_dir):
+    return os.path.join(cache_dir, os.path.basename(source_path))
+
+
+def _source_stamp(source_path):
+    stat = os.stat(source_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'format': CACHE_FORMAT}
+
+
+def dataset_version(data_dir='data'):
+    """Short hash of the size and mtime of every known dataset under data_dir"""
+    stamps = []
+    for filename in sorted(SCHEMAS):
+        source_path = os.path.join(data_dir, filename)
+        if os.path.exists(source_path):
+            stamps.append([filename, _source_stamp(source_path)])
+
+    raw = json.dumps(stamps, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+def _read_source(source_path):
+    """Parse a source file and apply its schema dtypes"""
+    schema = SCHEMAS.get(os.path.basename(source_path), {})
+    options = schema.get('read', {})
+
+    if source_path.endswith('.xlsx'):
+        df = pd.read_excel(source_path, **options)
+    else:
+        df = pd.read_csv(source_path, **options)
+
+    dtypes = schema.get('dtypes', {})
+    for column in df.columns:
+        if pd.api.types.is_numeric_dtype(df[column]):
+            dtype = dtypes.get(column, dtypes.get('*'))
+            if dtype:
+                df[column] = df[column].astype(dtype)
+        else:
+            df[column] = df[column].astype('category')
+
+    return df
+
+
+def write_table(df, path):
+    """Write a DataFrame as one .npy file per column plus a manifest"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    columns = []
+    for i, column in enumerate(df.columns):
+        series = df[column]
+        base = os.path.join(tmp_path, f'{i:03d}')
+
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            np.save(f'{base}.codes.npy', series.cat.codes.to_numpy())
+            np.save(f'{base}.categories.npy', np.array(series.cat.categories.astype(str), dtype=str))
+            columns.append({'name': column, 'kind': 'category'})
+        else:
+            np.save(f'{base}.npy', series.to_numpy())
+            columns.append({'name': column, 'kind': 'numeric'})
+
+    return tmp_path, columns
+
+
+def read_table(path, manifest, mmap_mode='r'):
+    """Load a table written by write_table, memory-mapping its arrays"""
+    data = {}
+    for i, column in enumerate(manifest['columns']):
+        base = os.path.join(path, f'{i:03d}')
+
+        if column['kind'] == 'category':
+            codes = np.load(f'{base}.codes.npy', mmap_mode=mmap_mode)
+            categories = np.load(f'{base}.categories.npy')
+            data[column['name']] = pd.Categorical.from_codes(codes, categories.tolist())
+        else:
+            data[column['name']] = np.load(f'{base}.npy', mmap_mode=mmap_mode)
+
+    return pd.DataFrame(data, copy=False)
+
+
+def build_table(source_path, cache_dir=CACHE_DIR, force=False):
+    """Convert one source file into the cache; returns True if (re)built"""
+    path = _cache_path(source_path, cache_dir)
+    stamp = _source_stamp(source_path)
+
+    if not force and _read_manifest(path).get('source') == stamp:
+        return False
+
+    df = _read_source(source_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path, columns = write_table(df, path)
+
+    with open(os.path.join(tmp_path, 'manifest.json'), 'w') as f:
+        json.dump({'source': stamp, 'rows': len(df), 'columns': columns}, f, indent=2)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+    return True
+
+
+def build_cache(data_dir='data', cache_dir=CACHE_DIR, force=False):
+    """Convert every known dataset under data_dir; returns names rebuilt"""
+    rebuilt = []
+    for filename in SCHEMAS:
+        source_path = os.path.join(data_dir, filename)
+        if os.path.exists(source_path) and build_table(source_path, cache_dir, force):
+            rebuilt.append(filename)
+    return rebuilt
+
+
+def _read_manifest(path):
+    try:
+        with open(os.path.join(path, 'manifest.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_table(source_path, cache_dir=CACHE_DIR):
+    """
+    Load a dataset once per process, and again only if the source file
+    changes. Uses the binary cache when it matches the source file,
+    otherwise parses the source. Callers share the returned frame and must
+    not mutate it.
+    """
+    key = os.path.abspath(source_path)
+
+    with _lock:
+        stamp = _source_stamp(source_path)
+        cached = _tables.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        start = time.perf_counter()
+        path = _cache_path(source_path, cache_dir)
+        manifest = _read_manifest(path)
+
+        if manifest.get('source') == stamp:
+            df = read_table(path, manifest)
+            origin = 'cache'
+        else:
+            df = _read_source(source_path)
+            origin = 'source'
+
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"   - Loaded {os.path.basename(source_path)} from {origin}: "
+              f"{len(df)} rows in {elapsed:.1f} ms")
+
+        _tables[key] = (stamp, df)
+        return df
@@ -1,97 +1,181 @@
-import pandas as pd
 import os
+from types import MappingProxyType
+from utils.data_cache import CACHE_DIR, SCHEMAS, dataset_version, load_table
+
+# Columns summarised per crop and the statistics exposed for each
+REQUIREMENT_AVERAGES = ['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall']
+REQUIREMENT_RANGES = ['N', 'temperature', 'humidity', 'rainfall']
 
 class DataLoader:
     """Load and manage all datasets"""
     
-    def __init__(self):
-        self.data_dir = 'data'
-        self._load_datasets()
+    def __init__(self, data_dir='data', cache_dir=CACHE_DIR):
+        self.data_dir = data_dir
+        self.cache_dir = cache_dir
+        self._crop_requirements = None
+        self._district_positions = None
+        self._pinned = None
     
-    def _load_datasets(self):
-        """Load all CSV datasets"""
-        # Crop recommendation data
-        self.crop_data = pd.read_csv(
-            os.path.join(self.data_dir, 'Crop_recommendation.csv')
-        )
-        
-        # Rainfall data with coordinates
-        self.rainfall_data = pd.read_csv(
-            os.path.join(self.data_dir, 'rainfall_lat_long.csv')
-        )
-        
-        # City coordinates
-        self.city_lat = pd.read_csv(
-            os.path.join(self.data_dir, 'city_lat.csv')
-        )
-        
-        # District-wise rainfall normals
-        self.district_rainfall = pd.read_csv(
-            os.path.join(self.data_dir, 'district-wise-rainfall-normal.csv')
-        )
-        
-        print("✅ All datasets loaded successfully")
-        print(f"   - Crop recommendations: {len(self.crop_data)} records")
-        print(f"   - Districts with rainfall data: {len(self.district_rainfall)}")
+    def _table(self, filename):
+        """Load a dataset lazily, shared by every loader in the process"""
+        if self._pinned is not None:
+            return self._pinned[1][filename]
+        return load_table(os.path.join(self.data_dir, filename), self.cache_dir)
+    
+    def pin(self):
+        """
+        Load every dataset now and keep serving those frames (and that data
+        version) even if the files change later; returns self
+        """
+        version = dataset_version(self.data_dir)
+        frames = {
+            filename: load_table(os.path.join(self.data_dir, filename), self.cache_dir)
+            for filename in SCHEMAS
+            if os.path.exists(os.path.join(self.data_dir, filename))
+        }
+        self._pinned = (version, frames)
+        return self
+    
+    def data_version(self):
+        """Version string that changes whenever a dataset file changes"""
+        if self._pinned is not None:
+            return self._pinned[0]
+        return dataset_version(self.data_dir)
+    
+    @property
+    def crop_data(self):
+        """Crop recommendation data"""
+        return self._table('Crop_recommendation.csv')
+    
+    @property
+    def rainfall_data(self):
+        """Rainfall data with coordinates"""
+        return self._table('rainfall_lat_long.csv')
+    
+    @property
+    def city_lat(self):
+        """City coordinates"""
+        return self._table('city_lat.csv')
+    
+    @property
+    def district_rainfall(self):
+        """District-wise rainfall normals"""
+        return self._table('district-wise-rainfall-normal.csv')
+    
+    @property
+    def crop_requirements(self):
+        """Per-crop requirement statistics, computed on first use"""
+        crop_data = self.crop_data
+        if self._crop_requirements is None or self._crop_requirements[0] is not crop_data:
+            self._crop_requirements = (crop_data, self._build_crop_requirements(crop_data))
+        return self._crop_requirements[1]
+    
+    @property
+    def district_positions(self):
+        """
+        Row positions of the district rainfall table by upper-cased state
+        and by upper-cased district name, computed on first use
+        """
+        df = self.district_rainfall
+        if self._district_positions is None or self._district_positions[0] is not df:
+            by_state, by_district = {}, {}
+            for position, (state, district) in enumerate(zip(df['STATE_UT_NAME'], df['DISTRICT'])):
+                by_state.setdefault(str(state).upper(), []).append(position)
+                by_district.setdefault(str(district).upper(), []).append(position)
+            self._district_positions = (df, by_state, by_district)
+        return self._district_positions[1:]
+    
+    # Getters return shallow copies: callers get their own frame object, while
+    # the (possibly memory-mapped) column data stays shared
     
     def get_crop_data(self):
         """Get crop recommendation dataset"""
-        return self.crop_data.copy()
+        return self.crop_data.copy(deep=False)
     
     def get_rainfall_data(self):
         """Get rainfall data with coordinates"""
-        return self.rainfall_data.copy()
+        return self.rainfall_data.copy(deep=False)
+    
+    def get_city_lat_data(self):
+        """Get district rainfall data with geocoded coordinates"""
+        return self.city_lat.copy(deep=False)
+    
+    def get_fuzzy_city_lat_data(self):
+        """Get district rainfall data with fuzzy-matched geocoded coordinates"""
+        return self._table('rainfall_lat_long_fuzzy.csv').copy(deep=False)
+    
+    def get_indian_city_coordinates(self):
+        """Get Indian cities with degree/minute coordinate strings"""
+        return self._table('list_of_latitudelongitude_of_cities_of_india-2049j.csv').copy(deep=False)
+    
+    def get_district_identifiers(self):
+        """Get census district identifiers with coordinates and agro-ecological zones"""
+        return self._table('ApportionedIdentifiers.csv').copy(deep=False)
+    
+    def get_city_list(self):
+        """Get world city list with coordinates"""
+        return self._table('cities_list.xlsx').copy(deep=False)
+    
+    def get_geocode_rejects(self):
+        """Get source geocodes known to point at the wrong place"""
+        return self._table('geocode_rejects.csv').copy(deep=False)
     
     def get_district_data(self, state=None, district=None):
         """Get district rainfall data"""
-        df = self.district_rainfall.copy()
+        df = self.district_rainfall
+        if not state and not district:
+            return df.copy(deep=False)
         
-        if state:
-            df = df[df['STATE_UT_NAME'].str.upper() == state.upper()]
+        by_state, by_district = self.district_positions
+        positions = None
+        for index, name in ((by_state, state), (by_district, district)):
+            if name:
+                matches = set(index.get(name.upper(), ()))
+                positions = matches if positions is None else positions & matches
         
-        if district:
-            df = df[df['DISTRICT'].str.upper() == district.upper()]
-        
-        return df
+        return df.iloc[sorted(positions)].copy(deep=False)
     
     def get_location_hierarchy(self):
         """Get hierarchical structure of states and districts"""
-        hierarchy = {}
+        pairs = self.district_rainfall[['STATE_UT_NAME', 'DISTRICT']].astype(str).drop_duplicates()
         
-        for _, row in self.district_rainfall.iterrows():
-            state = row['STATE_UT_NAME']
-            district = row['DISTRICT']
-            
-            if state not in hierarchy:
-                hierarchy[state] = []
-            
-            if district not in hierarchy[state]:
-                hierarchy[state].append(district)
-        
-        return hierarchy
+        # States and districts keep the order of their first appearance
+        return {
+            state: districts.tolist()
+            for state, districts in pairs.groupby('STATE_UT_NAME', sort=False)['DISTRICT']
+        }
     
     def get_available_crops(self):
         """Get list of all available crops"""
-        return sorted(self.crop_data['label'].unique().tolist())
+        return list(self.crop_requirements)
     
-    def get_crop_requirements(self, crop_name):
-        """Get average requirements for a specific crop"""
-        crop_df = self.crop_data[self.crop_data['label'] == crop_name]
+    def _build_crop_requirements(self, crop_data):
+        """
+        Compute requirement statistics for every crop in one groupby.
+        Returns a read-only mapping of crop -> read-only dict whose values
+        are plain Python floats, ready for JSON serialization.
+        """
+        stats = (
+            crop_data
+            .groupby('label')[REQUIREMENT_AVERAGES]
+            .agg(['mean', 'min', 'max'])
+            .astype(float)
+        )
         
-        if crop_df.empty:
-            return None
+        requirements = {}
+        for crop, row in stats.to_dict('index').items():
+            crop_req = {'crop': str(crop)}
+            
+            for column in REQUIREMENT_AVERAGES:
+                crop_req[f'{column}_avg'] = row[(column, 'mean')]
+            
+            for column in REQUIREMENT_RANGES:
+                crop_req[f'{column}_range'] = (row[(column, 'min')], row[(column, 'max')])
+            
+            requirements[crop_req['crop']] = MappingProxyType(crop_req)
         
-        return {
-            'crop': crop_name,
-            'N_avg': crop_df['N'].mean(),
-            'P_avg': crop_df['P'].mean(),
-            'K_avg': crop_df['K'].mean(),
-            'temperature_avg': crop_df['temperature'].mean(),
-            'humidity_avg': crop_df['humidity'].mean(),
-            'ph_avg': crop_df['ph'].mean(),
-            'rainfall_avg': crop_df['rainfall'].mean(),
-            'N_range': (crop_df['N'].min(), crop_df['N'].max()),
-            'temperature_range': (crop_df['temperature'].min(), crop_df['temperature'].max()),
-            'humidity_range': (crop_df['humidity'].min(), crop_df['humidity'].max()),
-            'rainfall_range': (crop_df['rainfall'].min(), crop_df['rainfall'].max())
-        }
+        return MappingProxyType(requirements)
+    
+    def get_crop_requirements(self, crop_name):
+        """Get average requirements for a specific crop (read-only)"""
+        return self.crop_requirements.get(crop_name)
@@ -0,0 +1,144 @@
+"""
+Precomputed crop-model feature rows for every district, soil type and season.
+
+The crop model takes (N, P, K, temperature, humidity, ph, rainfall). N, P, K
+and pH come from the soil type. Rainfall is the mean monthly normal over the
+season's months. Temperature and humidity default to the values the model
+was always served (the repo has no temperature or humidity normals) and can
+be replaced by current weather readings. All rows live in one (district, soil, season, feature) array, so
+building a request's features is a single lookup.
+"""
+import hashlib
+import numpy as np
+
+SOIL_PARAMETERS = {
+    'sandy': {'N': 30, 'P': 20, 'K': 30, 'ph': 6.0},
+    'loamy': {'N': 60, 'P': 40, 'K': 40, 'ph': 6.5},
+    'clay': {'N': 80, 'P': 50, 'K': 50, 'ph': 7.0},
+    'black': {'N': 70, 'P': 45, 'K': 45, 'ph': 7.5},
+    'red': {'N': 50, 'P': 35, 'K': 35, 'ph': 6.2},
+    'laterite': {'N': 40, 'P': 30, 'K': 30, 'ph': 5.5}
+}
+DEFAULT_SOIL = 'loamy'
+
+# Months of each season; anything other than kharif or rabi is treated as zaid
+SEASON_MONTHS = {
+    'kharif': ['JUN', 'JUL', 'AUG', 'SEP'],
+    'rabi': ['OCT', 'NOV', 'DEC', 'JAN', 'FEB'],
+    'zaid': ['MAR', 'APR', 'MAY'],
+}
+DEFAULT_SEASON = 'zaid'
+
+SOILS = list(SOIL_PARAMETERS)
+SEASONS = list(SEASON_MONTHS)
+SOIL_INDEX = {soil: i for i, soil in enumerate(SOILS)}
+SEASON_INDEX = {season: i for i, season in enumerate(SEASONS)}
+
+# Same order as CropPredictor's FEATURES
+FEATURES = ['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall']
+TEMPERATURE, HUMIDITY = FEATURES.index('temperature'), FEATURES.index('humidity')
+
+# Temperature (deg C) and relative humidity (%) used without a weather
+# reading; close to the means of Crop_recommendation.csv (25.6, 71.5)
+DEFAULT_TEMPERATURE = 25.0
+DEFAULT_HUMIDITY = 75.0
+
+
+def current_season(month):
+    """Season a calendar month (1-12) falls in"""
+    if 6 <= month <= 9:
+        return 'kharif'
+    if month >= 10 or month <= 2:
+        return 'rabi'
+    return 'zaid'
+
+
+def season_key(season):
+    season = season.strip().lower()
+    return season if season in SEASON_MONTHS else DEFAULT_SEASON
+
+
+def soil_key(soil_type):
+    soil_type = soil_type.strip().lower()
+    return soil_type if soil_type in SOIL_PARAMETERS else DEFAULT_SOIL
+
+
+def monthly_rainfall(district_data, season):
+    """Mean monthly rainfall normal (mm) over the months of a season"""
+    months = SEASON_MONTHS[season_key(season)]
+    return sum(float(district_data[month]) for month in months) / len(months)
+
+
+def district_features(district_data, soil_type, season):
+    """One model feature row, computed directly (no precomputed store)"""
+    soil = SOIL_PARAMETERS[soil_key(soil_type)]
+    return [
+        soil['N'],
+        soil['P'],
+        soil['K'],
+        DEFAULT_TEMPERATURE,
+        DEFAULT_HUMIDITY,
+        soil['ph'],
+        monthly_rainfall(district_data, season)
+    ]
+
+
+class FeatureStore:
+    """Model feature rows for every district, soil type and season"""
+
+    def __init__(self, records, coordinates=None):
+        """
+        records are district_data dicts tagged with DISTRICT_ID
+        (LocationMatcher.records); coordinates maps a district ID to
+        (lat, lon), for weather readings
+        """
+        coordinates = coordinates or {}
+        self.district_ids = np.array([r['DISTRICT_ID'] for r in records], dtype=np.int32)
+        self.row_index = {int(district_id): row for row, district_id in enumerate(self.district_ids)}
+        self.coordinates = coordinates
+
+        self.features = np.empty((len(records), len(SOILS), len(SEASONS), len(FEATURES)))
+        for row, record in enumerate(records):
+            for j, soil in enumerate(SOILS):
+                for k, season in enumerate(SEASONS):
+                    self.features[row, j, k] = district_features(record, soil, season)
+
+        self.weather_rows = 0
+        print(f"   - Feature store: {len(records)} districts x {len(SOILS)} soils x "
+              f"{len(SEASONS)} seasons ({len(coordinates)} with coordinates)")
+
+    def row(self, district_data):
+        """Store row of a district_data dict, or None if unknown"""
+        return self.row_index.get(district_data.get('DISTRICT_ID'))
+
+    def lookup(self, district_data, soil_type, season):
+        """Feature row (a read-only view) for a district, or None if unknown"""
+        row = self.row(district_data)
+        if row is None:
+            return None
+        return self.features[row, SOIL_INDEX[soil_key(soil_type)], SEASON_INDEX[season_key(season)]]
+
+    def apply_weather(self, observations, season):
+        """
+        Replace default temperature and humidity with observed values for
+        one season. observations maps a row to {'temperature', 'humidity'}.
+        """
+        k = SEASON_INDEX[season_key(season)]
+        for row, observation in observations.items():
+            if observation:
+                self.features[row, :, k, TEMPERATURE] = observation['temperature']
+                self.features[row, :, k, HUMIDITY] = observation['humidity']
+        self.weather_rows = sum(1 for observation in observations.values() if observation)
+
+    def refresh_weather(self, weather, season):
+        """Apply current readings from a WeatherIntegration for every district with coordinates"""
+        district_ids = [i for i in sorted(self.coordinates) if i in self.row_index]
+        readings = weather.get_current_weather_bulk([self.coordinates[i] for i in district_ids])
+        self.apply_weather({self.row_index[i]: reading for i, reading in zip(district_ids, readings)}, season)
+        print(f"   - Feature store: current weather applied to {self.weather_rows} districts ({season})")
+
+    @property
+    def version(self):
+        """Short hash of the feature array, for cache keys"""
+        return hashlib.sha256(self.features.tobytes()).hexdigest()[:12]
+
@@ -0,0 +1,472 @@
+"""
+District gazetteer: one integer ID per district, shared by every dataset.
+
+district-wise-rainfall-normal.csv defines the districts, and a district's
+ID is its row there. The build step (python build_artifacts.py gazetteer)
+reconciles the other datasets with it:
+- census districts (ApportionedIdentifiers.csv) are linked by name within
+  their state. They give coordinates, the agro-ecological zone and an alias.
+- geocodes (city_lat.csv, rainfall_lat_long_fuzzy.csv and the lat/longs
+  columns of rainfall_lat_long.csv) are checked against the census (see
+  _Builder.coordinates). A point shared by several districts of one source is a
+  placeholder and is dropped.
+- city names (cities_list.xlsx, and the degree/minute coordinates of
+  list_of_latitudelongitude_of_cities_of_india-2049j.csv) become aliases of
+  the district they name or lie in.
+- mandi price districts (price.unknown) are linked by name within their
+  state.
+
+The result is saved as JSON. At runtime every lookup is a dictionary hit on
+a (state ID, normalized name) pair.
+"""
+import ast
+import json
+import os
+import re
+from collections import Counter, defaultdict
+import numpy as np
+import pandas as pd
+from fuzzywuzzy import fuzz
+from models.artifact_store import ARTIFACT_DIR, fingerprint
+from utils.location_index import normalize_name, normalize_state
+from utils.spatial_index import haversine_km
+
+GAZETTEER_DIR = os.path.join(ARTIFACT_DIR, 'gazetteer')
+PRICE_SOURCE = 'price.unknown'
+
+# Bump when the saved layout or the reconciliation rules change
+GAZETTEER_FORMAT = 2
+
+# Files the gazetteer is built from, under the data directory
+SOURCES = [
+    'district-wise-rainfall-normal.csv',
+    'ApportionedIdentifiers.csv',
+    'city_lat.csv',
+    'rainfall_lat_long_fuzzy.csv',
+    'rainfall_lat_long.csv',
+    'cities_list.xlsx',
+    'list_of_latitudelongitude_of_cities_of_india-2049j.csv',
+    'geocode_rejects.csv',
+]
+
+ALIAS_RATIO = 80           # Minimum fuzz.ratio to link an alias to a district
+ALIAS_WRATIO = 90          # ...or minimum fuzz.WRatio (handles "X" vs "X URBAN")
+CITY_RADIUS_KM = 40        # Max distance to link a city to a census district
+GEOCODE_STATE_RADIUS_KM = 300  # Max distance of a geocode from its state's median
+INDIA_BOUNDS = ((6.0, 37.5), (68.0, 97.5))   # (lat range, lon range)
+
+# "23°50?N": degrees, minutes, hemisphere; the minute sign is often mangled
+DMS_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\D+(\d+(?:\.\d+)?)\D*([NSEW])')
+
+
+def parse_dms(value):
+    """Decimal degrees from a degree/minute string, or NaN"""
+    match = DMS_PATTERN.search(str(value))
+    if not match:
+        return np.nan
+    degrees, minutes, hemisphere = match.groups()
+    decimal = float(degrees) + float(minutes) / 60
+    return -decimal if hemisphere in 'SW' else decimal
+
+
+def in_bounds(lat, lon):
+    (lat_min, lat_max), (lon_min, lon_max) = INDIA_BOUNDS
+    return lat_min <= lat <= lat_max and lon_min <= lon <= lon_max
+
+
+def resolve_alias(name, candidates):
+    """ID of the candidate district that best matches an alias name"""
+    # Skip fragments such as "24" left over from malformed rows
+    if not candidates or sum(c.isalpha() for c in name) < 3:
+        return None
+
+    ratios = [fuzz.ratio(name, district) for district, _ in candidates]
+    best = int(np.argmax(ratios))
+    if ratios[best] >= ALIAS_RATIO:
+        return candidates[best][1]
+
+    wratios = [fuzz.WRatio(name, district) for district, _ in candidates]
+    best = int(np.argmax(wratios))
+    if wratios[best] >= ALIAS_WRATIO:
+        return candidates[best][1]
+
+    return None
+
+
+def source_version(data_dir='data', price_sources=(PRICE_SOURCE,)):
+    """Fingerprint of the source files, to tell when a saved gazetteer is stale"""
+    paths = [os.path.join(data_dir, name) for name in SOURCES]
+    paths = [path for path in paths + list(price_sources) if os.path.exists(path)]
+    return fingerprint(paths, {'format': GAZETTEER_FORMAT})
+
+
+class Gazetteer:
+    """Districts with integer IDs, their coordinates, zones and aliases"""
+
+    def __init__(self, states, districts, aliases, version=None):
+        """
+        states are normalized state names (state ID = position). districts
+        are dicts with 'state', 'district', 'state_id', 'lat', 'lon',
+        'coordinate_source' and 'zone' (district ID = position). aliases are
+        (name, district ID, source) triples.
+        """
+        self.states = states
+        self.districts = districts
+        self.aliases = [tuple(alias) for alias in aliases]
+        self.version = version
+        self.state_ids = {state: i for i, state in enumerate(states)}
+
+        self.coordinates = {
+            i: (d['lat'], d['lon']) for i, d in enumerate(districts) if d['lat'] is not None
+        }
+        self.zones = {i: tuple(d['zone']) for i, d in enumerate(districts) if d['zone'] is not None}
+
+        # Canonical names first, so an alias never shadows a district
+        self.names = {}
+        for i, d in enumerate(districts):
+            self.names.setdefault((d['state_id'], normalize_name(d['district'])), i)
+        for name, i, _ in self.aliases:
+            self.names.setdefault((districts[i]['state_id'], normalize_name(name)), i)
+
+    def __len__(self):
+        return len(self.districts)
+
+    def state_id(self, state):
+        """ID of a state name in any known spelling, or None"""
+        return self.state_ids.get(normalize_state(state))
+
+    def district_id(self, state, district):
+        """ID of a district by state and district name (or alias), or None"""
+        return self.names.get((self.state_id(state), normalize_name(district)))
+
+    # Build
+
+    @classmethod
+    def build(cls, data_loader, price_sources=(PRICE_SOURCE,)):
+        """Reconcile every source dataset into a new gazetteer"""
+        canonical = data_loader.district_rainfall
+        raw_states = [str(s) for s in canonical['STATE_UT_NAME']]
+        raw_districts = [str(d) for d in canonical['DISTRICT']]
+
+        states = list(dict.fromkeys(normalize_state(s) for s in raw_states))
+        state_ids = {state: i for i, state in enumerate(states)}
+        district_states = [state_ids[normalize_state(s)] for s in raw_states]
+        key_ids = {}
+        for i, (state_id, district) in enumerate(zip(district_states, raw_districts)):
+            key_ids.setdefault((state_id, normalize_name(district)), i)
+
+        by_state = defaultdict(list)
+        for i, (state_id, district) in enumerate(zip(district_states, raw_districts)):
+            by_state[state_id].append((normalize_name(district), i))
+
+        builder = _Builder(data_loader, state_ids, district_states, key_ids, by_state)
+        links = builder.census_links()
+        coordinates, coordinate_sources = builder.coordinates(links)
+        zones = builder.zones(links)
+
+        aliases = [(name, i, 'census') for name, _, _, i, _ in links]
+        aliases.extend(builder.city_aliases(links))
+        aliases.extend(builder.price_aliases(price_sources))
+
+        districts = [
+            {
+                'state': state,
+                'district': district,
+                'state_id': district_states[i],
+                'lat': float(coordinates[i][0]) if i in coordinates else None,
+                'lon': float(coordinates[i][1]) if i in coordinates else None,
+                'coordinate_source': coordinate_sources.get(i),
+                'zone': list(zones[i]) if i in zones else None,
+            }
+            for i, (state, district) in enumerate(zip(raw_states, raw_districts))
+        ]
+        return cls(states, districts, aliases, source_version(data_loader.data_dir, price_sources))
+
+    # Persistence
+
+    def save(self, directory=GAZETTEER_DIR):
+        """Write the gazetteer atomically"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, 'gazetteer.json')
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'format': GAZETTEER_FORMAT,
+                'version': self.version,
+                'states': self.states,
+                'districts': self.districts,
+                'aliases': self.aliases,
+            }, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, directory=GAZETTEER_DIR):
+        """Load a saved gazetteer; None if there is none or it is in an old layout"""
+        try:
+            with open(os.path.join(directory, 'gazetteer.json')) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if saved.get('format') != GAZETTEER_FORMAT:
+            return None
+        return cls(saved['states'], saved['districts'], saved['aliases'], saved['version'])
+
+    @classmethod
+    def open(cls, data_loader, directory=GAZETTEER_DIR, price_sources=(PRICE_SOURCE,)):
+        """The saved gazetteer if it matches the source files, else one built in memory"""
+        gazetteer = cls.load(directory)
+        origin = 'artifact'
+        if gazetteer is None or gazetteer.version != source_version(data_loader.data_dir, price_sources):
+            print("⚠️  Gazetteer missing or stale; building it in memory "
+                  "(persist it with 'python build_artifacts.py gazetteer')")
+            gazetteer, origin = cls.build(data_loader, price_sources), 'source'
+
+        print(f"   - Gazetteer: {len(gazetteer)} districts in {len(gazetteer.states)} states, "
+              f"{len(gazetteer.aliases)} aliases, {len(gazetteer.coordinates)} with coordinates "
+              f"(from {origin})")
+        return gazetteer
+
+
+class _Builder:
+    """Reconciliation steps of Gazetteer.build, sharing the canonical district keys"""
+
+    def __init__(self, data_loader, state_ids, district_states, key_ids, by_state):
+        self.data_loader = data_loader
+        self.state_ids = state_ids
+        self.district_states = district_states
+        self.key_ids = key_ids
+        self.by_state = by_state
+        self.all_districts = [entry for entries in by_state.values() for entry in entries]
+        self.census_points = None
+
+    def _id(self, state, district):
+        """ID of a canonical (state, district) pair, or None"""
+        return self.key_ids.get((self.state_ids.get(normalize_state(state)), normalize_name(district)))
+
+    def census_links(self):
+        """
+        Link census districts to canonical districts by name within the same
+        state. Returns (name, lat, lon, district ID, zone) tuples, where zone
+        is (NATP agro-ecological zone code, region name).
+        """
+        links = []
+        try:
+            census = self.data_loader.get_district_identifiers()
+        except OSError as e:
+            print(f"⚠️  Skipping census districts: {e}")
+            return links
+
+        lats = pd.to_numeric(census['Latitude'], errors='coerce')
+        lons = pd.to_numeric(census['Longitude'], errors='coerce')
+        zone_codes = pd.to_numeric(census['Agro Ecological Zones NATP'], errors='coerce')
+
+        for name, state, lat, lon, zone_code, region in zip(
+            census['District Name'], census['State Name'], lats, lons, zone_codes, census['Region Name']
+        ):
+            state_id = self.state_ids.get(normalize_state(state))
+            district_id = resolve_alias(normalize_name(name), self.by_state.get(state_id, []))
+            if district_id is not None:
+                zone = (None if np.isnan(zone_code) else int(zone_code), region)
+                links.append((name, lat, lon, district_id, zone))
+
+        if links:
+            _, lats, lons, _, _ = zip(*links)
+            self.census_points = (np.array(lats, dtype=float), np.array(lons, dtype=float))
+        print(f"   - Census: {len(links)} of {len(census)} districts linked")
+        return links
+
+    def _nearest_census_id(self, links, lat, lon):
+        """District linked to the nearest census district within CITY_RADIUS_KM"""
+        if not links:
+            return None
+
+        distances = haversine_km(lat, lon, *self.census_points)
+        nearest = int(np.nanargmin(distances))
+        if distances[nearest] <= CITY_RADIUS_KM:
+            return links[nearest][3]
+        return None
+
+    def _geocodes(self):
+        """
+        In-bounds geocodes by district ID; the first source to place a
+        district wins. Within each source, a point shared by several
+        districts is a placeholder, not a geocode.
+        """
+        sources = [
+            (self.data_loader.get_city_lat_data, ['coord']),
+            (self.data_loader.get_fuzzy_city_lat_data, ['coord']),
+            (self.data_loader.get_rainfall_data, ['lat', 'longs']),
+        ]
+        geocoded = {}
+        placeholders = 0
+
+        for load, columns in sources:
+            try:
+                frame = load()
+                rows = zip(frame['STATE_UT_NAME'], frame['DISTRICT'], *(frame[c] for c in columns))
+            except (OSError, KeyError) as e:
+                print(f"⚠️  Skipping geocodes: {e}")
+                continue
+
+            points = {}
+            for state, district, *values in rows:
+                district_id = self._id(state, district)
+                point = self._point(values)
+                if district_id is not None and point is not None and in_bounds(*point):
+                    points[district_id] = point
+
+            shared = Counter(points.values())
+            placeholders += sum(1 for point in points.values() if shared[point] > 1)
+            for district_id, point in points.items():
+                if shared[point] == 1:
+                    geocoded.setdefault(district_id, point)
+
+        print(f"   - Geocodes: {len(geocoded)} districts placed, {placeholders} placeholder points dropped")
+        return geocoded
+
+    @staticmethod
+    def _point(values):
+        """(lat, lon) from a "{'lat': .., 'lon': ..}" string or a lat, lon pair; None if invalid"""
+        try:
+            if len(values) == 1:
+                point = ast.literal_eval(values[0])
+                lat, lon = float(point['lat']), float(point['lon'])
+            else:
+                lat, lon = (float(value) for value in values)
+        except (ValueError, SyntaxError, TypeError, KeyError):
+            return None
+        return None if np.isnan(lat) or np.isnan(lon) else (lat, lon)
+
+    def _rejected_geocodes(self):
+        """
+        IDs of districts whose source geocode places them on another town
+        and still passes the state checks (states with one or two geocodes
+        have no meaningful median)
+        """
+        try:
+            rejects = self.data_loader.get_geocode_rejects()
+        except OSError as e:
+            print(f"⚠️  Skipping geocode rejects: {e}")
+            return set()
+        return {self._id(state, district) for state, district in zip(rejects['STATE_UT_NAME'], rejects['DISTRICT'])}
+
+    def coordinates(self, links):
+        """
+        Best known (lat, lon) per district ID, and where it came from.
+
+        Census coordinates are used where a census district is linked. The
+        geocodes are noisy (many point to a namesake in another state), so
+        one is only accepted if its nearest census district is in the same
+        state or, for states without census coverage, if it lies within
+        GEOCODE_STATE_RADIUS_KM of the state's median geocode. Geocodes known
+        to be wrong (geocode_rejects.csv) are never used.
+        """
+        states = self.district_states
+        coords = {}
+
+        census = defaultdict(list)
+        for _, lat, lon, district_id, _ in links:
+            if in_bounds(lat, lon):
+                census[district_id].append((lat, lon))
+        for district_id, points in census.items():
+            coords[district_id] = tuple(np.mean(points, axis=0))
+        sources = {district_id: 'census' for district_id in coords}
+
+        census_ids = np.array(sorted(coords), dtype=int)
+        census_points = np.array([coords[i] for i in census_ids]).reshape(-1, 2)
+        census_states = {states[i] for i in census_ids}
+
+        geocoded = self._geocodes()
+        rejected = self._rejected_geocodes()
+        state_medians = defaultdict(list)
+        for district_id, point in geocoded.items():
+            state_medians[states[district_id]].append(point)
+        state_medians = {state: np.median(points, axis=0) for state, points in state_medians.items()}
+
+        for district_id, (lat, lon) in sorted(geocoded.items()):
+            if district_id in coords or district_id in rejected:
+                continue
+
+            state = states[district_id]
+            if state in census_states:
+                distances = haversine_km(lat, lon, census_points[:, 0], census_points[:, 1])
+                accept = states[census_ids[np.argmin(distances)]] == state
+            else:
+                median_lat, median_lon = state_medians[state]
+                accept = haversine_km(lat, lon, median_lat, median_lon) <= GEOCODE_STATE_RADIUS_KM
+
+            if accept:
+                coords[district_id] = (lat, lon)
+                sources[district_id] = 'geocode'
+
+        return coords, sources
+
+    @staticmethod
+    def zones(links):
+        """
+        (NATP agro-ecological zone code, region name) per district ID, from
+        its linked census districts; the most common one if they differ
+        """
+        votes = defaultdict(Counter)
+        for _, _, _, district_id, zone in links:
+            votes[district_id][zone] += 1
+        return {district_id: counter.most_common(1)[0][0] for district_id, counter in votes.items()}
+
+    def city_aliases(self, links):
+        """
+        City names resolved to a district by name, else to the nearest
+        census district. Cities with a state are matched within it.
+        """
+        aliases = []
+        try:
+            cities = self.data_loader.get_city_list()
+            cities = cities[cities['country'] == 'India']
+            for name, lat, lon in zip(cities['name'], cities['lat'], cities['lon']):
+                district_id = resolve_alias(normalize_name(name), self.all_districts)
+                if district_id is None:
+                    district_id = self._nearest_census_id(links, lat, lon)
+                if district_id is not None:
+                    aliases.append((str(name), district_id, 'cities'))
+        except (OSError, KeyError, ImportError) as e:
+            print(f"⚠️  Skipping city aliases: {e}")
+
+        try:
+            cities = self.data_loader.get_indian_city_coordinates()
+            for name, state, lat, lon in zip(
+                cities['City'], cities['Province/State'],
+                cities['Latitude'].map(parse_dms), cities['Longitude'].map(parse_dms)
+            ):
+                if pd.isna(name):
+                    continue
+                candidates = self.by_state.get(self.state_ids.get(normalize_state(state)), self.all_districts)
+                district_id = resolve_alias(normalize_name(name), candidates)
+                if district_id is None and in_bounds(lat, lon):
+                    district_id = self._nearest_census_id(links, lat, lon)
+                if district_id is not None:
+                    aliases.append((str(name), district_id, 'city_coordinates'))
+        except (OSError, KeyError) as e:
+            print(f"⚠️  Skipping city coordinates: {e}")
+
+        return aliases
+
+    def price_aliases(self, price_sources):
+        """Mandi price district names from every price dump, linked by name within their state"""
+        frames = [
+            pd.read_csv(path, usecols=['state', 'district'], dtype=str)
+            for path in price_sources if os.path.exists(path)
+        ]
+        if not frames:
+            return []
+
+        pairs = pd.concat(frames).dropna().drop_duplicates()
+        aliases = []
+        for state, district in zip(pairs['state'], pairs['district']):
+            district_id = resolve_alias(
+                normalize_name(district), self.by_state.get(self.state_ids.get(normalize_state(state)), [])
+            )
+            if district_id is not None:
+                aliases.append((district, district_id, 'prices'))
+
+        print(f"   - Price districts: {len(aliases)} of {len(pairs)} linked")
+        return aliases
@@ -0,0 +1,143 @@
+import hashlib
+import io
+import math
+import os
+import threading
+import time
+from PIL import Image
+from utils.metrics import timed
+
+MAX_IMAGE_SIDE = 1024
+
+
+def content_key(data, box=None, max_side=MAX_IMAGE_SIDE):
+    """Content hash of an upload together with the processing applied to it"""
+    digest = hashlib.sha256(data)
+    digest.update(repr((box, max_side)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _clamp_box(box, width, height):
+    """Clamp a (left, top, right, bottom) box to the image; None means the edge"""
+    defaults = (0, 0, width, height)
+    left, top, right, bottom = (
+        default if value is None else value
+        for value, default in zip(box or defaults, defaults)
+    )
+    left = min(max(int(left), 0), width)
+    top = min(max(int(top), 0), height)
+    right = min(max(int(right), left), width)
+    bottom = min(max(int(bottom), top), height)
+
+    if right - left < 1 or bottom - top < 1:
+        raise ValueError('Crop box is empty')
+
+    return left, top, right, bottom
+
+
+@timed('image_decode')
+def load_cropped_image(data, box=None, max_side=MAX_IMAGE_SIDE):
+    """
+    Decode, crop and downscale an uploaded image from its bytes, without
+    writing it anywhere. (The upload itself may have been spooled to a
+    temporary file by Werkzeug, which does so for multipart files over
+    500 KB.)
+
+    Raises PIL's DecompressionBombError for images whose pixel count is
+    far beyond Image.MAX_IMAGE_PIXELS. box is (left, top, right, bottom) in original pixel coordinates. JPEGs
+    are decoded with draft() at the smallest DCT scale that still leaves
+    the crop at least max_side pixels on its long side, so large photos are
+    never decoded at full resolution.
+    """
+    img = Image.open(io.BytesIO(data))
+    full_width, full_height = img.size
+    left, top, right, bottom = _clamp_box(box, full_width, full_height)
+
+    if img.format == 'JPEG':
+        reduction = max(right - left, bottom - top) / max_side
+        if reduction >= 2:
+            img.draft('RGB', (
+                math.ceil(full_width / reduction),
+                math.ceil(full_height / reduction)
+            ))
+
+    # Map the box onto the (possibly reduced) decoded image
+    scale_x = img.size[0] / full_width
+    scale_y = img.size[1] / full_height
+    img = img.crop((
+        int(left * scale_x), int(top * scale_y),
+        max(int(right * scale_x), int(left * scale_x) + 1),
+        max(int(bottom * scale_y), int(top * scale_y) + 1)
+    ))
+
+    img.thumbnail((max_side, max_side))
+    return img.convert('RGB')
+
+
+class UploadStore:
+    """Content-addressed store for processed uploads, bounded by size and age"""
+
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024, max_age=7 * 24 * 3600,
+                 evict_every=50):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.evict_every = evict_every
+        self._puts = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, key):
+        return os.path.join(self.directory, f'{key}.jpg')
+
+    def put(self, key, img):
+        """Store an image under its content key; duplicates are written once"""
+        path = self.path_for(key)
+
+        try:
+            # Refresh the age of an existing copy instead of writing it again
+            os.utime(path)
+        except FileNotFoundError:
+            # Not stored yet, or evicted (possibly by another worker) just now
+            tmp_path = f'{path}.{os.getpid()}-{threading.get_ident()}.tmp'
+            img.save(tmp_path, format='JPEG', quality=85)
+            os.replace(tmp_path, path)
+
+        self._puts += 1
+        if self._puts % self.evict_every == 0:
+            self.evict()
+
+        return path
+
+    def evict(self):
+        """Delete files older than max_age, then the oldest until under max_bytes"""
+        now = time.time()
+        files = []
+
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                name, ext = os.path.splitext(entry.name)
+                if ext != '.jpg' or len(name) != 64 or not entry.is_file():
+                    continue
+
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if now - stat.st_mtime > self.max_age:
+                    self._remove(entry.path)
+                else:
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,135 @@
+import re
+from collections import defaultdict
+from functools import lru_cache
+import numpy as np
+from fuzzywuzzy import fuzz
+
+# State names used by other datasets, mapped to the rainfall dataset spelling
+STATE_ALIASES = {
+    'UTTARAKHAND': 'UTTARANCHAL',
+    'UTTRAKHAND': 'UTTARANCHAL',
+    'CHHATTISGARH': 'CHATISGARH',
+    'CHATTISGARH': 'CHATISGARH',
+    'HIMACHAL PRADESH': 'HIMACHAL',
+    'TELANGANA': 'ANDHRA PRADESH',
+    'ODISHA': 'ORISSA',
+    'ANDAMAN AND NICOBAR': 'ANDAMAN AND NICOBAR ISLANDS',
+}
+
+
+def normalize_name(name):
+    """Upper-case a place name and reduce it to letters, digits and single spaces"""
+    name = str(name).upper().replace('&', ' AND ')
+    return ' '.join(re.sub(r'[^A-Z0-9]+', ' ', name).split())
+
+
+def normalize_state(name):
+    """Normalize a state name and map it to the rainfall dataset spelling"""
+    state = normalize_name(name)
+    return STATE_ALIASES.get(state, state)
+
+
+def trigrams(name):
+    """Character trigrams of a normalized name, padded at word boundaries"""
+    padded = f'  {name} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class LocationIndex:
+    """
+    Search index over place names that resolve to district rows.
+
+    Exact normalized names are answered from a hash map. Anything else is
+    narrowed down with a trigram inverted index and only the best candidates
+    are scored with fuzz.ratio. Results are memoized in an LRU cache.
+    """
+
+    def __init__(self, entries, candidate_pool=48, cache_size=4096):
+        """
+        entries is an iterable of (name, row_id) pairs. The first entry for a
+        normalized name wins, so canonical district names should come before
+        aliases.
+        """
+        self.candidate_pool = candidate_pool
+        self.names = []
+        self.row_ids = []
+        self.exact = {}
+
+        for name, row_id in entries:
+            key = normalize_name(name)
+            if not key or key in self.exact:
+                continue
+
+            self.exact[key] = len(self.names)
+            self.names.append(key)
+            self.row_ids.append(row_id)
+
+        postings = defaultdict(list)
+        for position, key in enumerate(self.names):
+            for gram in trigrams(key):
+                postings[gram].append(position)
+
+        self.postings = {
+            gram: np.array(positions, dtype=np.int32)
+            for gram, positions in postings.items()
+        }
+        self.row_ids = np.array(self.row_ids, dtype=np.int32)
+        self.gram_counts = np.array([len(trigrams(key)) for key in self.names], dtype=np.float32)
+
+        self.search = lru_cache(maxsize=cache_size)(self._search)
+
+    def __len__(self):
+        return len(self.names)
+
+    def best(self, query):
+        """Return (row_id, score) of the best match, or (None, 0)"""
+        matches = self.search(query, 1)
+        return matches[0] if matches else (None, 0)
+
+    def _search(self, query, k=5):
+        """Return up to k (row_id, score) pairs, best first, one per row"""
+        key = normalize_name(query)
+        if not key:
+            return ()
+
+        position = self.exact.get(key)
+        if position is not None and k == 1:
+            return ((int(self.row_ids[position]), 100),)
+
+        candidates = self._candidates(key)
+        scored = sorted(
+            ((fuzz.ratio(key, self.names[c]), -int(c)) for c in candidates),
+            reverse=True
+        )
+
+        results = []
+        seen_rows = set()
+        for score, neg_position in scored:
+            row_id = int(self.row_ids[-neg_position])
+            if row_id in seen_rows:
+                continue
+
+            seen_rows.add(row_id)
+            results.append((row_id, score))
+            if len(results) == k:
+                break
+
+        return tuple(results)
+
+    def _candidates(self, key):
+        """Positions of the names with the highest trigram similarity to the query"""
+        grams = trigrams(key)
+        lists = [self.postings[g] for g in grams if g in self.postings]
+        if not lists:
+            return np.empty(0, dtype=np.int32)
+
+        counts = np.bincount(np.concatenate(lists), minlength=len(self.names))
+        hits = np.flatnonzero(counts)
+
+        if len(hits) <= self.candidate_pool:
+            return hits
+
+        # Dice coefficient, so long names do not win just by having more trigrams
+        similarity = 2 * counts[hits] / (self.gram_counts[hits] + len(grams))
+        top = np.argpartition(similarity, -self.candidate_pool)[-self.candidate_pool:]
+        return hits[top]
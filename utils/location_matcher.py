@@ -1,13 +1,74 @@
-import pandas as pd
-from fuzzywuzzy import fuzz
+from utils.gazetteer import Gazetteer
+from utils.location_index import LocationIndex
+from utils.spatial_index import SpatialIndex
+from utils.metrics import timed
+
+FUZZY_THRESHOLD = 70       # Minimum fuzz.ratio for a single-token query
 
 class LocationMatcher:
     """Match user location to district data"""
     
-    def __init__(self, data_loader):
+    def __init__(self, data_loader, gazetteer=None):
         self.data_loader = data_loader
+        self.gazetteer = gazetteer or Gazetteer.open(data_loader)
         self.district_data = data_loader.get_rainfall_data()
+        self.records, self.rows = self._district_records()
+        self.unmatched = len(self.gazetteer) - len(self.records)
+        self.index = self._build_index()
+        self.coordinates = {i: point for i, point in self.gazetteer.coordinates.items() if i in self.rows}
+        self.zones = self.gazetteer.zones
+        self.spatial_index = self._build_spatial_index()
+    
+    def _district_records(self):
+        """
+        District rows as dicts in gazetteer ID order, tagged with their
+        DISTRICT_ID and STATE_ID, and the row of each district ID.
+        Gazetteer districts without rainfall data are skipped.
+        """
+        by_id = {}
+        for record in self.district_data.to_dict('records'):
+            district_id = self.gazetteer.district_id(record['STATE_UT_NAME'], record['DISTRICT'])
+            if district_id is not None and district_id not in by_id:
+                record['DISTRICT_ID'] = district_id
+                record['STATE_ID'] = self.gazetteer.districts[district_id]['state_id']
+                by_id[district_id] = record
+        
+        if not by_id:
+            raise ValueError("No gazetteer district has rainfall data")
+        
+        missing = [d['district'] for i, d in enumerate(self.gazetteer.districts) if i not in by_id]
+        if missing:
+            print(f"⚠️  Skipping {len(missing)} gazetteer districts without rainfall data: {', '.join(missing[:5])}")
+        
+        records = [by_id[i] for i in sorted(by_id)]
+        return records, {record['DISTRICT_ID']: row for row, record in enumerate(records)}
     
+    def _build_index(self):
+        """Build the name index over district names and their aliases"""
+        entries = [(record['DISTRICT'], row) for row, record in enumerate(self.records)]
+        entries.extend(
+            (name, self.rows[district_id]) for name, district_id, _ in self.gazetteer.aliases
+            if district_id in self.rows
+        )
+        
+        index = LocationIndex(entries)
+        print(f"   - Location index: {len(index)} names for {len(self.records)} districts")
+        return index
+    
+    def _build_spatial_index(self):
+        """Build the haversine ball tree over district coordinates"""
+        coords = self.coordinates
+        district_ids = sorted(coords)
+        
+        index = SpatialIndex(
+            [coords[i][0] for i in district_ids],
+            [coords[i][1] for i in district_ids],
+            [self.rows[i] for i in district_ids]
+        )
+        print(f"   - Spatial index: {len(index)} districts with coordinates")
+        return index
+    
+    @timed('location_match')
     def get_district_data(self, location_query):
         """
         Match location query to district data
@@ -25,38 +86,81 @@ class LocationMatcher:
         else:
             return self._fuzzy_match(parts[0])
     
+    def get_district_data_batch(self, location_queries):
+        """
+        Match many location queries, resolving each distinct query once.
+        Returns a list aligned with the input (None where nothing matched,
+        including queries that are not strings).
+        """
+        resolved = {}
+        results = []
+        
+        for query in location_queries:
+            if not isinstance(query, str):
+                results.append(None)
+                continue
+            
+            key = query.strip().upper()
+            if key not in resolved:
+                resolved[key] = self.get_district_data(query)
+            
+            results.append(resolved[key])
+        
+        return results
+    
     def _exact_match(self, state, district):
-        """Exact match for state and district"""
-        matches = self.district_data[
-            (self.district_data['STATE_UT_NAME'].str.upper() == state.upper()) &
-            (self.district_data['DISTRICT'].str.upper() == district.upper())
-        ]
+        """Exact match for state and district (or a known alias of it)"""
+        row = self.rows.get(self.gazetteer.district_id(state, district))
         
-        if not matches.empty:
-            return matches.iloc[0].to_dict()
+        if row is not None:
+            return dict(self.records[row])
         
         return None
     
     def _fuzzy_match(self, query):
         """Fuzzy match for district name"""
-        best_match = None
-        best_score = 0
-        
-        for _, row in self.district_data.iterrows():
-            district = row['DISTRICT']
-            score = fuzz.ratio(query.upper(), district.upper())
-            
-            if score > best_score:
-                best_score = score
-                best_match = row
+        row, score = self.index.best(query)
         
-        if best_score > 70:  # Threshold for fuzzy matching
-            return best_match.to_dict()
+        if score > FUZZY_THRESHOLD:
+            return dict(self.records[row])
         
         return None
     
+    def search(self, query, k=5):
+        """Return the top k candidate districts for a query with their scores"""
+        if not query:
+            return []
+        
+        return [
+            {
+                'district': self.records[row]['DISTRICT'],
+                'state': self.records[row]['STATE_UT_NAME'],
+                'score': score
+            }
+            for row, score in self.index.search(query, k)
+        ]
+    
+    def _nearby_results(self, rows, distances):
+        """Format district rows with their distances"""
+        return [
+            {
+                'district': self.records[row]['DISTRICT'],
+                'state': self.records[row]['STATE_UT_NAME'],
+                'distance_km': round(float(distance), 2)
+            }
+            for row, distance in zip(rows, distances)
+        ]
+    
     def get_nearby_districts(self, lat, lon, radius_km=50):
-        """Get districts within specified radius"""
-        # Simplified implementation - actual would use haversine distance
-        # This requires the coordinate data
-        return []
+        """Get districts within specified radius, nearest first"""
+        rows, distances = self.spatial_index.within(lat, lon, radius_km)[0]
+        return self._nearby_results(rows, distances)
+    
+    def get_nearest_districts(self, lat, lon, k=5):
+        """Get the k nearest districts to a point"""
+        return self.get_nearest_districts_batch([lat], [lon], k)[0]
+    
+    def get_nearest_districts_batch(self, lats, lons, k=5):
+        """Get the k nearest districts for many points in one query"""
+        rows, distances = self.spatial_index.nearest(lats, lons, k)
+        return [self._nearby_results(r, d) for r, d in zip(rows, distances)]
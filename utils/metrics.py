@@ -0,0 +1,269 @@
+"""
+Latency histograms and counters exposed in the Prometheus text format.
+
+Each process records into its own registry. When METRICS_DIR is set (the
+gunicorn config does this), a background thread in every process writes a
+snapshot there at most once per flush interval, and a scrape of any worker
+merges all of them, so /metrics covers the whole server rather than one
+worker.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+NAMESPACE = 'cropsense'
+
+# Upper bounds in seconds, from 0.5 ms to 10 s
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+HELP = {
+    'request_duration_seconds': ('histogram', 'HTTP request latency by route, method and status'),
+    'stage_duration_seconds': ('histogram', 'Latency of internal processing stages'),
+    'request_errors_total': ('counter', 'Unhandled exceptions by route and exception type'),
+}
+QUANTILE_METRICS = {
+    'request_duration_seconds': 'route',
+    'stage_duration_seconds': 'stage',
+}
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.sum += other.sum
+        self.count += other.count
+
+    def quantile(self, q):
+        """Estimate a quantile by linear interpolation within its bucket"""
+        if not self.count:
+            return None
+
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def to_dict(self):
+        return {'counts': self.counts, 'sum': self.sum, 'count': self.count}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        histogram.counts = list(data['counts'])
+        histogram.sum = data['sum']
+        histogram.count = data['count']
+        return histogram
+
+
+class MetricsRegistry:
+    """Per-process metrics with optional cross-process aggregation"""
+
+    def __init__(self, directory=None, flush_interval=1.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._writer_pid = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def observe(self, name, labels, seconds):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def reset(self):
+        """Drop everything recorded so far in this process"""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def inc(self, name, labels, amount=1):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    @contextmanager
+    def timer(self, stage):
+        """Time a block as a processing stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('stage_duration_seconds', {'stage': stage}, time.perf_counter() - start)
+
+    def timed(self, stage):
+        """Decorator form of timer()"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    # Cross-process aggregation
+
+    def _snapshot(self):
+        with self._lock:
+            return {
+                'histograms': [[name, labels, h.to_dict()] for (name, labels), h in self._histograms.items()],
+                'counters': [[name, labels, value] for (name, labels), value in self._counters.items()],
+            }
+
+    def flush(self):
+        """Have this process's snapshot written to the metrics directory shortly"""
+        if not self.directory:
+            return
+
+        self._dirty.set()
+        if self._writer_pid != os.getpid():
+            # First flush in this process (threads do not survive a fork)
+            with self._lock:
+                if self._writer_pid != os.getpid():
+                    self._writer_pid = os.getpid()
+                    threading.Thread(target=self._write_loop, name='metrics-writer', daemon=True).start()
+
+    def _write_loop(self):
+        while True:
+            self._dirty.wait()
+            self._dirty.clear()
+            self.write()
+            time.sleep(self.flush_interval)
+
+    def write(self):
+        """Write this process's snapshot to the metrics directory now"""
+        path = os.path.join(self.directory, f'{os.getpid()}.json')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self._snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def collect(self):
+        """Merged (histograms, counters) of this process and, if configured, all others"""
+        snapshots = [self._snapshot()]
+
+        if self.directory:
+            own = f'{os.getpid()}.json'
+            for filename in os.listdir(self.directory):
+                if not filename.endswith('.json') or filename == own:
+                    continue
+                try:
+                    with open(os.path.join(self.directory, filename)) as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+
+        histograms, counters = {}, {}
+        for snapshot in snapshots:
+            for name, labels, data in snapshot['histograms']:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                histogram = Histogram.from_dict(data)
+                if key in histograms:
+                    histograms[key].merge(histogram)
+                else:
+                    histograms[key] = histogram
+            for name, labels, value in snapshot['counters']:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                counters[key] = counters.get(key, 0) + value
+
+        return histograms, counters
+
+    # Prometheus text format
+
+    def render(self):
+        histograms, counters = self.collect()
+        lines = []
+
+        for name, (kind, help_text) in HELP.items():
+            full_name = f'{NAMESPACE}_{name}'
+            lines.append(f'# HELP {full_name} {help_text}')
+            lines.append(f'# TYPE {full_name} {kind}')
+
+            if kind == 'counter':
+                for (metric, labels), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(f'{full_name}{_labels(labels)} {value}')
+                continue
+
+            for (metric, labels), histogram in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{full_name}_bucket{_labels(labels + (("le", repr(bound)),))} {cumulative}')
+                lines.append(f'{full_name}_bucket{_labels(labels + (("le", "+Inf"),))} {histogram.count}')
+                lines.append(f'{full_name}_sum{_labels(labels)} {histogram.sum!r}')
+                lines.append(f'{full_name}_count{_labels(labels)} {histogram.count}')
+
+        lines.extend(self._render_quantiles(histograms))
+        return '\n'.join(lines) + '\n'
+
+    def _render_quantiles(self, histograms):
+        """p50/p95/p99 gauges per route and per stage, merged over other labels"""
+        lines = []
+        for name, label in QUANTILE_METRICS.items():
+            merged = {}
+            for (metric, labels), histogram in histograms.items():
+                if metric != name:
+                    continue
+                value = dict(labels).get(label)
+                merged.setdefault(value, Histogram()).merge(histogram)
+
+            full_name = f'{NAMESPACE}_{name.replace("_duration_seconds", "")}_latency_quantile_seconds'
+            lines.append(f'# HELP {full_name} Estimated latency quantiles by {label}')
+            lines.append(f'# TYPE {full_name} gauge')
+            for value, histogram in sorted(merged.items()):
+                for q in QUANTILES:
+                    estimate = histogram.quantile(q)
+                    lines.append(f'{full_name}{_labels(((label, value), ("quantile", str(q))))} {estimate:.6f}')
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+metrics = MetricsRegistry(directory=os.environ.get('METRICS_DIR'))
+timed = metrics.timed
+timer = metrics.timer
@@ -0,0 +1,518 @@
+"""
+Mandi (market) price store: daily price dumps ingested incrementally into
+compact columnar arrays, kept sorted by (commodity, place, day) so range
+queries are two binary searches. A place is a (state, district) pair, so
+districts that share a name in different states stay apart.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+from models.artifact_store import ARTIFACT_DIR, fingerprint
+from utils.location_index import normalize_name
+
+PRICE_SOURCE = 'price.unknown'
+PRICE_DIR = os.path.join(ARTIFACT_DIR, 'prices')
+
+# Bump when the on-disk layout changes
+STORE_FORMAT = 3
+
+CATEGORY_COLUMNS = ['state', 'district', 'market', 'commodity', 'variety']
+PRICE_COLUMNS = ['min_price', 'max_price', 'modal_price']
+DATE_FORMAT = '%d/%m/%Y'
+
+# Bit layout of the int64 sort key: commodity | place | day. Days are
+# counted from 1970-01-01, so rows outside 1970-7711 cannot be stored.
+DAY_BITS = 21
+DISTRICT_BITS = 21
+MAX_DAY = (1 << DAY_BITS) - 1
+
+
+def parse_date(value):
+    """Day number (days since 1970-01-01) for 'dd/mm/yyyy' or 'yyyy-mm-dd'"""
+    fmt = '%Y-%m-%d' if '-' in value else DATE_FORMAT
+    return int(np.datetime64(pd.to_datetime(value, format=fmt).date(), 'D').astype(np.int64))
+
+
+def format_date(day):
+    return str(np.datetime64(int(day), 'D'))
+
+
+def _clamp_day(day):
+    """Day number limited to what fits in the key"""
+    return min(max(int(day), 0), MAX_DAY)
+
+
+def _code_dtype(n):
+    return np.int16 if n < np.iinfo(np.int16).max else np.int32
+
+
+# One version of the rows and their lookup tables. Ingest builds a new one
+# and publishes it with a single assignment, so a reader that takes
+# store.index once sees a consistent store throughout.
+PriceIndex = namedtuple('PriceIndex', ['columns', 'key', 'commodity_bounds', 'commodity_index', 'district_index'])
+
+# Category labels and places with their codes. Ingest encodes onto a copy,
+# which _publish swaps in with the rows, so a failed ingest leaves no trace.
+Labels = namedtuple('Labels', ['categories', 'codes', 'places', 'place_codes'])
+
+
+def _make_key(commodity, place, day):
+    return (
+        (np.asarray(commodity, dtype=np.int64) << (DISTRICT_BITS + DAY_BITS))
+        | (np.asarray(place, dtype=np.int64) << DAY_BITS)
+        | np.asarray(day, dtype=np.int64)
+    )
+
+
+class PriceStore:
+    """Market prices by commodity, place and day with an ordered index"""
+
+    def __init__(self):
+        self.categories = {column: [] for column in CATEGORY_COLUMNS}
+        self._codes = {column: {} for column in CATEGORY_COLUMNS}
+        # (state code, district code) of each place code
+        self.places = []
+        self._place_codes = {}
+        columns = {column: np.empty(0, dtype=np.int16) for column in CATEGORY_COLUMNS}
+        columns['day'] = np.empty(0, dtype=np.int32)
+        columns['source'] = np.empty(0, dtype=np.int16)
+        for column in PRICE_COLUMNS:
+            columns[column] = np.empty(0, dtype=np.float32)
+        self.sources = []
+        self._lock = threading.Lock()
+        self._publish(columns, np.empty(0, dtype=np.int64))
+
+    def __len__(self):
+        return len(self.index.key)
+
+    @property
+    def columns(self):
+        return self.index.columns
+
+    @property
+    def key(self):
+        return self.index.key
+
+    # Ingest
+
+    def _labels(self):
+        """Copy of the published labels, to encode an ingest onto"""
+        return Labels(
+            {column: list(labels) for column, labels in self.categories.items()},
+            {column: dict(codes) for column, codes in self._codes.items()},
+            list(self.places),
+            dict(self._place_codes)
+        )
+
+    @staticmethod
+    def _encode(labels, column, values):
+        """Map labels to integer codes, extending the category list as needed"""
+        codes = labels.codes[column]
+        categories = labels.categories[column]
+        inverse, uniques = pd.factorize(values)
+
+        # Missing labels (-1) map to the last slot, the empty label
+        mapped = np.empty(len(uniques) + 1, dtype=np.int64)
+        for i, label in enumerate(list(uniques) + ['']):
+            label = str(label).strip()
+            code = codes.get(label)
+            if code is None:
+                code = codes[label] = len(categories)
+                categories.append(label)
+            mapped[i] = code
+
+        return mapped[inverse].astype(_code_dtype(len(categories)))
+
+    @staticmethod
+    def _encode_places(labels, states, districts):
+        """Place code of each (state code, district code) row, adding new places"""
+        pairs = (states.astype(np.int64) << 32) | districts.astype(np.int64)
+        uniques, inverse = np.unique(pairs, return_inverse=True)
+
+        mapped = np.empty(len(uniques), dtype=np.int64)
+        for i, pair in enumerate(uniques.tolist()):
+            place = (pair >> 32, pair & 0xFFFFFFFF)
+            code = labels.place_codes.get(place)
+            if code is None:
+                code = labels.place_codes[place] = len(labels.places)
+                labels.places.append(place)
+            mapped[i] = code
+        return mapped[inverse]
+
+    def _merge(self, columns, key, labels, chunk, source):
+        """Encode a parsed chunk and merge it into sorted columns; returns (columns, key, rows added)"""
+        chunk = chunk.dropna(subset=['commodity', 'district', 'arrival_date'])
+        new = {
+            column: self._encode(labels, column, chunk[column])
+            for column in CATEGORY_COLUMNS
+        }
+        dates = pd.to_datetime(chunk['arrival_date'], format=DATE_FORMAT, errors='coerce')
+        new['day'] = dates.to_numpy().astype('datetime64[D]').astype(np.int32)
+        for column in PRICE_COLUMNS:
+            new[column] = pd.to_numeric(chunk[column], errors='coerce').to_numpy(dtype=np.float32)
+        new['source'] = np.full(len(chunk), source, dtype=np.int16)
+
+        valid = dates.notna().to_numpy() & (new['day'] >= 0) & (new['day'] <= MAX_DAY)
+        new = {column: values[valid] for column, values in new.items()}
+        places = self._encode_places(labels, new['state'], new['district'])
+        new_key = _make_key(new['commodity'], places, new['day'])
+        order = np.argsort(new_key, kind='stable')
+        new_key = new_key[order]
+
+        # Linear-time merge into the existing order
+        positions = np.searchsorted(key, new_key, side='right')
+        merged = {}
+        for column, values in new.items():
+            dtype = np.promote_types(columns[column].dtype, values.dtype)
+            merged[column] = np.insert(columns[column].astype(dtype), positions, values[order])
+
+        return merged, np.insert(key, positions, new_key), len(new_key)
+
+    def ingest(self, source_path, chunksize=500000):
+        """
+        Add a price dump (CSV with the data.gov.in mandi columns).
+        Files already ingested, by content hash, are skipped. A file whose
+        name was ingested before with other content replaces the rows of
+        that earlier version. Returns the number of rows added.
+        """
+        version = fingerprint([source_path], {'format': STORE_FORMAT})
+        name = os.path.basename(source_path)
+        added = 0
+
+        with self._lock:
+            if any(source['version'] == version for source in self.sources):
+                return 0
+
+            columns, key = self.index.columns, self.index.key
+            labels = self._labels()
+            sources = list(self.sources)
+            slot = next((i for i, source in enumerate(sources) if source['path'] == name), None)
+            if slot is None:
+                slot = len(sources)
+                sources.append(None)
+            else:
+                keep = np.asarray(columns['source']) != slot
+                columns = {column: np.asarray(values)[keep] for column, values in columns.items()}
+                key = np.asarray(key)[keep]
+
+            for chunk in pd.read_csv(source_path, chunksize=chunksize, dtype=str):
+                columns, key, rows = self._merge(columns, key, labels, chunk, slot)
+                added += rows
+
+            sources[slot] = {'path': name, 'version': version, 'rows': added}
+            self._publish(columns, key, labels)
+            self.sources = sources
+
+        return added
+
+    def _publish(self, columns, key, labels=None):
+        """
+        Build the lookup tables for new columns and swap them all in at once,
+        with the labels they were encoded with (default: the current ones)
+        """
+        labels = labels or Labels(self.categories, self._codes, self.places, self._place_codes)
+        categories = labels.categories
+
+        # Row range of each commodity, so per-commodity scans need no search
+        commodity_ids = np.arange(len(categories['commodity']) + 1)
+        commodity_bounds = np.searchsorted(
+            key, commodity_ids.astype(np.int64) << (DISTRICT_BITS + DAY_BITS)
+        )
+        commodity_index = {
+            name.lower(): code for name, code in labels.codes['commodity'].items()
+        }
+        # District name -> [(state name, place code)], for every state it occurs in
+        district_index = {}
+        for place, (state, district) in enumerate(labels.places):
+            district_index.setdefault(normalize_name(categories['district'][district]), []).append(
+                (normalize_name(categories['state'][state]), place)
+            )
+        index = PriceIndex(columns, key, commodity_bounds, commodity_index, district_index)
+
+        # Labels only grow, so a reader pairing the new labels with the old
+        # index still decodes every code it finds
+        self.categories, self._codes, self.places, self._place_codes = labels
+        self.index = index
+
+    # Persistence
+
+    def save(self, directory=PRICE_DIR):
+        """Write the store as .npy columns plus a manifest, replacing any old copy"""
+        tmp_path = f"{directory}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        index = self.index
+        for column, values in index.columns.items():
+            np.save(os.path.join(tmp_path, f'{column}.npy'), values)
+        np.save(os.path.join(tmp_path, 'key.npy'), index.key)
+
+        with open(os.path.join(tmp_path, 'manifest.json'), 'w') as f:
+            json.dump({
+                'format': STORE_FORMAT,
+                'rows': len(index.key),
+                'sources': self.sources,
+                'categories': self.categories,
+                'places': self.places
+            }, f)
+
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp_path, directory)
+
+    @classmethod
+    def load(cls, directory=PRICE_DIR):
+        """Memory-map a saved store; returns None if there is none"""
+        try:
+            with open(os.path.join(directory, 'manifest.json')) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if manifest.get('format') != STORE_FORMAT:
+            return None
+
+        store = cls()
+        store.sources = manifest['sources']
+        store.categories = manifest['categories']
+        store._codes = {
+            column: {label: code for code, label in enumerate(labels)}
+            for column, labels in store.categories.items()
+        }
+        store.places = [tuple(place) for place in manifest['places']]
+        store._place_codes = {place: code for code, place in enumerate(store.places)}
+        columns = {
+            column: np.load(os.path.join(directory, f'{column}.npy'), mmap_mode='r')
+            for column in store.index.columns
+        }
+        store._publish(columns, np.load(os.path.join(directory, 'key.npy'), mmap_mode='r'))
+        return store
+
+    @classmethod
+    def open(cls, directory=PRICE_DIR, sources=(PRICE_SOURCE,)):
+        """
+        Load the saved store and ingest (in memory) any source that is not in
+        it yet. Run 'python build_artifacts.py prices' to persist them.
+        """
+        start = time.perf_counter()
+        store = cls.load(directory)
+        origin = 'store'
+        if store is None:
+            store, origin = cls(), 'source'
+
+        for source_path in sources:
+            if os.path.exists(source_path) and store.ingest(source_path):
+                origin = 'source'
+
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"   - Loaded {len(store)} mandi prices from {origin} in {elapsed:.1f} ms")
+        return store
+
+    @property
+    def version(self):
+        return '-'.join(source['version'] for source in self.sources) or 'empty'
+
+    # Queries. Each takes self.index once, so an ingest in between cannot mix versions.
+
+    def commodities(self, index=None):
+        index = index or self.index
+        bounds = index.commodity_bounds
+        return sorted(name for code, name in enumerate(self.categories['commodity'][:len(bounds) - 1])
+                      if bounds[code + 1] > bounds[code])
+
+    def _rows(self, index, commodity, district=None, start=None, end=None, state=None):
+        """
+        Row slice (or index array) matching a commodity, district and day
+        range. A district name found in several states matches all of them
+        unless state is given.
+        """
+        code = index.commodity_index.get(commodity.strip().lower())
+        if code is None:
+            return None
+
+        if district is not None:
+            places = index.district_index.get(normalize_name(district), [])
+            if state is not None:
+                places = [entry for entry in places if entry[0] == normalize_name(state)]
+            if not places:
+                return None
+
+            # Out-of-range days would spill into the place and commodity bits
+            lo_day = 0 if start is None else _clamp_day(start)
+            hi_day = MAX_DAY if end is None else _clamp_day(end)
+            ranges = [
+                (
+                    int(np.searchsorted(index.key, _make_key(code, place, lo_day), side='left')),
+                    int(np.searchsorted(index.key, _make_key(code, place, hi_day), side='right'))
+                )
+                for _, place in places
+            ]
+            if len(ranges) == 1:
+                return slice(*ranges[0])
+            return np.concatenate([np.arange(lo, hi) for lo, hi in ranges])
+
+        rows = slice(int(index.commodity_bounds[code]), int(index.commodity_bounds[code + 1]))
+        if start is None and end is None:
+            return rows
+
+        days = index.columns['day'][rows]
+        mask = np.ones(len(days), dtype=bool)
+        if start is not None:
+            mask &= days >= start
+        if end is not None:
+            mask &= days <= end
+        return np.flatnonzero(mask) + rows.start
+
+    def query(self, commodity, district=None, start=None, end=None, limit=100, state=None):
+        """Price records for a commodity, optionally by district (and state) and day range"""
+        index = self.index
+        rows = self._rows(index, commodity, district, start, end, state)
+        if rows is None:
+            return []
+
+        if isinstance(rows, slice):
+            rows = slice(rows.start, min(rows.stop, rows.start + limit))
+        else:
+            rows = rows[:limit]
+
+        columns = {column: np.asarray(values[rows]) for column, values in index.columns.items()}
+        records = []
+        for i in range(len(columns['day'])):
+            record = {
+                column: self.categories[column][columns[column][i]]
+                for column in CATEGORY_COLUMNS
+            }
+            record['arrival_date'] = format_date(columns['day'][i])
+            for column in PRICE_COLUMNS:
+                value = columns[column][i]
+                record[column] = None if np.isnan(value) else float(value)
+            records.append(record)
+
+        return records
+
+    def modal_summary(self, commodity, district=None, start=None, end=None, state=None, index=None):
+        """Modal-price aggregates for one commodity; None if there is no data"""
+        index = index or self.index
+        rows = self._rows(index, commodity, district, start, end, state)
+        if rows is None:
+            return None
+
+        modal = np.asarray(index.columns['modal_price'][rows], dtype=np.float64)
+        days = np.asarray(index.columns['day'][rows])
+        valid = ~np.isnan(modal)
+        if not valid.any():
+            return None
+
+        modal, days = modal[valid], days[valid]
+        latest = days.max()
+        return {
+            'commodity': self.categories['commodity'][index.commodity_index[commodity.strip().lower()]],
+            'records': int(len(modal)),
+            'markets': int(np.count_nonzero(np.bincount(np.asarray(index.columns['market'][rows])[valid]))),
+            'average_modal_price': round(float(modal.mean()), 2),
+            'median_modal_price': round(float(np.median(modal)), 2),
+            'min_modal_price': float(modal.min()),
+            'max_modal_price': float(modal.max()),
+            'latest_date': format_date(latest),
+            'latest_median_modal_price': round(float(np.median(modal[days == latest])), 2)
+        }
+
+    def reference_prices(self, commodity_groups, gazetteer, window_days=30):
+        """
+        Local modal prices for a fixed list of products, ready for per-request
+        lookup. commodity_groups holds, per product, the commodity names it
+        trades under (first match wins per row). Prices are medians over each
+        commodity's last window_days of data. Markets are placed in
+        gazetteer districts and states by their (state, district) labels.
+        """
+        index = self.index
+        frames = []
+        for position, names in enumerate(commodity_groups):
+            for name in names:
+                rows = self._rows(index, name)
+                if rows is None or rows.stop == rows.start:
+                    continue
+
+                days = np.asarray(index.columns['day'][rows])
+                recent = days >= days.max() - window_days
+                frames.append(pd.DataFrame({
+                    'product': position,
+                    'state': np.asarray(index.columns['state'][rows])[recent],
+                    'district': np.asarray(index.columns['district'][rows])[recent],
+                    'price': np.asarray(index.columns['modal_price'][rows])[recent],
+                }))
+                break
+
+        if not frames:
+            return ReferencePrices(len(commodity_groups), None)
+
+        prices = pd.concat(frames).dropna()
+        labels = prices[['state', 'district']].drop_duplicates()
+        labels['state_id'] = [
+            gazetteer.state_id(self.categories['state'][code]) for code in labels['state']
+        ]
+        labels['district_id'] = [
+            gazetteer.district_id(self.categories['state'][state], self.categories['district'][district])
+            for state, district in zip(labels['state'], labels['district'])
+        ]
+        prices = prices.merge(labels.fillna(-1).astype(np.int64), on=['state', 'district'])
+        return ReferencePrices(len(commodity_groups), prices)
+
+    def modal_summaries(self, district=None, start=None, end=None, state=None):
+        """modal_summary for every commodity with data"""
+        index = self.index
+        summaries = {}
+        for commodity in self.commodities(index):
+            summary = self.modal_summary(commodity, district, start, end, state, index)
+            if summary is not None:
+                summaries[commodity] = summary
+        return summaries
+
+
+class ReferencePrices:
+    """
+    Per-product modal prices (Rs/quintal) at district, state and national
+    level, resolved to the most local level that has data.
+    """
+
+    def __init__(self, n_products, prices):
+        """prices has 'product', 'state_id', 'district_id' (-1 if unknown) and 'price' columns"""
+        self.national = np.full(n_products, np.nan)
+        self.by_state = {}
+        self.by_district = {}
+
+        if prices is None:
+            return
+
+        self.national[:] = prices.groupby('product')['price'].median().reindex(range(n_products))
+        for level, table in [('state_id', self.by_state), ('district_id', self.by_district)]:
+            medians = prices[prices[level] >= 0].groupby([level, 'product'])['price'].median()
+            for level_id, group in medians.groupby(level=0):
+                vector = np.full(n_products, np.nan)
+                vector[group.index.get_level_values(1)] = group.to_numpy()
+                table[int(level_id)] = vector
+
+    def lookup(self, district_id=None, state_id=None):
+        """
+        (prices, levels): the price vector for a gazetteer district and
+        state and, per product, 'district', 'state', 'national' or None
+        where no price is known.
+        """
+        prices = self.national.copy()
+        levels = np.where(np.isnan(prices), None, 'national').astype(object)
+
+        for level, table, level_id in [
+            ('state', self.by_state, state_id),
+            ('district', self.by_district, district_id)
+        ]:
+            local = table.get(level_id)
+            if local is not None:
+                known = ~np.isnan(local)
+                prices[known] = local[known]
+                levels[known] = level
+
+        return prices, levels
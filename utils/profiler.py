@@ -0,0 +1,80 @@
+"""
+Low-overhead sampling profiler for a single request.
+
+A background thread snapshots the target thread's stack every interval
+seconds via sys._current_frames(). The result is written in the collapsed
+"frame;frame;frame count" format understood by flamegraph.pl and speedscope.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+DEFAULT_INTERVAL = 0.001
+MAX_DEPTH = 128
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples one thread's call stack at a fixed interval while running"""
+
+    def __init__(self, thread_id=None, interval=DEFAULT_INTERVAL):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._started = None
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.elapsed = time.perf_counter() - self._started
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+
+            stack = []
+            while frame is not None and len(stack) < MAX_DEPTH:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self):
+        """Stacks in collapsed format, most frequent first"""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+    def top(self, n=5):
+        """[(frame, share of samples)] for the frames most often on top of the stack"""
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        return [(frame, count / self.samples) for frame, count in leaves.most_common(n)]
+
+    def save(self, directory, name):
+        """Write the collapsed stacks to directory/name.folded; returns the path"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{name}.folded')
+        with open(path, 'w') as f:
+            f.write(self.collapsed())
+        return path
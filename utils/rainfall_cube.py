@@ -0,0 +1,127 @@
+import numpy as np
+
+MONTHS = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN',
+          'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
+SEASONS = ['ANNUAL', 'Jan-Feb', 'Mar-May', 'Jun-Sep', 'Oct-Dec']
+DEFAULT_TREND_YEARS = 10
+ROLLING_WINDOW = 10
+
+
+class RainfallCube:
+    """
+    Historical rainfall as dense NumPy arrays indexed by subdivision and year.
+
+    monthly has shape (subdivision, year, 12) and seasonal has shape
+    (subdivision, year, len(SEASONS)); years without a record are NaN and
+    False in present. Per-subdivision percentiles, rolling means, recent
+    monthly averages and trends are computed once and reused.
+    """
+
+    def __init__(self, historical_data):
+        subdivisions = historical_data['SUBDIVISION'].astype(str).to_numpy()
+        years = historical_data['YEAR'].to_numpy().astype(int)
+
+        self.subdivisions = list(dict.fromkeys(subdivisions))
+        self.subdivision_index = {name: i for i, name in enumerate(self.subdivisions)}
+        self.years = np.arange(years.min(), years.max() + 1)
+
+        s = np.array([self.subdivision_index[name] for name in subdivisions])
+        y = years - self.years[0]
+        shape = (len(self.subdivisions), len(self.years))
+
+        self.present = np.zeros(shape, dtype=bool)
+        self.present[s, y] = True
+        # Rank of each recorded year counted from the most recent one
+        self.rank_from_end = np.cumsum(self.present[:, ::-1], axis=1)[:, ::-1]
+
+        self.monthly = np.full(shape + (len(MONTHS),), np.nan)
+        self.monthly[s, y] = historical_data[MONTHS].to_numpy(dtype=float)
+
+        self.seasonal = np.full(shape + (len(SEASONS),), np.nan)
+        self.seasonal[s, y] = historical_data[SEASONS].to_numpy(dtype=float)
+
+        self._precompute()
+
+    def _precompute(self):
+        annual = self.annual
+
+        self.p25 = np.nanpercentile(annual, 25, axis=1)
+        self.p40 = np.nanpercentile(annual, 40, axis=1)
+
+        # Trailing rolling mean of annual rainfall over recorded years
+        values = np.where(np.isnan(annual), 0.0, annual)
+        counts = np.isfinite(annual).astype(float)
+        window_sum = np.cumsum(values, axis=1)
+        window_count = np.cumsum(counts, axis=1)
+        window_sum[:, ROLLING_WINDOW:] -= window_sum[:, :-ROLLING_WINDOW].copy()
+        window_count[:, ROLLING_WINDOW:] -= window_count[:, :-ROLLING_WINDOW].copy()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.rolling_mean = np.where(window_count > 0, window_sum / window_count, np.nan)
+
+        recent = self.last_years_mask(DEFAULT_TREND_YEARS)
+        with np.errstate(invalid='ignore'):
+            self.recent_monthly_avg = np.nanmean(
+                np.where(recent[:, :, None], self.monthly, np.nan), axis=1
+            )
+
+        self._trends = {DEFAULT_TREND_YEARS: self.trend_stats(DEFAULT_TREND_YEARS)}
+
+    @property
+    def annual(self):
+        return self.seasonal[:, :, SEASONS.index('ANNUAL')]
+
+    def season(self, name):
+        return self.seasonal[:, :, SEASONS.index(name)]
+
+    def last_years_mask(self, years, rows=None):
+        """Mask of the last `years` recorded years of every subdivision"""
+        rows = slice(None) if rows is None else rows
+        return self.present[rows] & (self.rank_from_end[rows] <= years)
+
+    def trend_stats(self, years, rows=None):
+        """
+        Trend statistics over each subdivision's last `years` recorded years,
+        for all subdivisions (or the given row indices) at once.
+        """
+        rows = slice(None) if rows is None else rows
+        mask = self.last_years_mask(years, rows)
+        annual = np.where(mask, self.annual[rows], np.nan)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            stats = {
+                'annual_average': np.nanmean(annual, axis=1),
+                'standard_deviation': np.nanstd(annual, axis=1, ddof=1),
+                'monsoon_average': np.nanmean(np.where(mask, self.season('Jun-Sep')[rows], np.nan), axis=1),
+            }
+
+            # Least-squares slope of annual rainfall against year
+            weights = np.isfinite(annual)
+            n = weights.sum(axis=1)
+            x = np.where(weights, self.years, 0.0)
+            yv = np.where(weights, annual, 0.0)
+            x_mean = x.sum(axis=1) / n
+            y_mean = yv.sum(axis=1) / n
+            dx = np.where(weights, self.years - x_mean[:, None], 0.0)
+            slope = (dx * (yv - y_mean[:, None])).sum(axis=1) / (dx ** 2).sum(axis=1)
+            stats['trend_slope'] = np.where(n > 1, slope, 0.0)
+
+        return stats
+
+    def trends(self, years):
+        """
+        trend_stats for all subdivisions, memoized per window length. Windows
+        longer than the record all cover every year, so they share one entry
+        and the memo holds at most one per year of history.
+        """
+        years = min(max(years, 1), len(self.years))
+        stats = self._trends.get(years)
+        if stats is None:
+            stats = self._trends[years] = self.trend_stats(years)
+        return stats
+
+    def recent_average(self, since_year, rows=None):
+        """Mean annual rainfall from since_year onwards, per subdivision"""
+        rows = slice(None) if rows is None else rows
+        annual = np.where(self.years >= since_year, self.annual[rows], np.nan)
+        with np.errstate(invalid='ignore'):
+            return np.nanmean(annual, axis=1)
@@ -0,0 +1,117 @@
+"""
+Concurrent report assembly from independent sections.
+
+Each section is a provider function registered under a name. A report runs
+every section at once and waits for each until its own deadline. Plain
+functions run on one of two thread pools: 'cpu' for model and array work,
+sized to the core count (at least 4), and 'io' for network calls, sized for waiting.
+Coroutine functions run on a shared asyncio event loop thread. A section
+that fails or misses its deadline yields None, and the report is marked
+partial rather than failing as a whole. Timed-out work is abandoned, not
+interrupted: the pool thread finishes it in the background.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from utils.metrics import metrics
+
+SECTION_TIMEOUT = 2.0       # Default per-section deadline, seconds
+MIN_CPU_WORKERS = 4         # Headroom for sections still running past their deadline
+IO_WORKERS = 16
+
+
+class ReportEngine:
+    """Run registered report sections concurrently, each under its own deadline"""
+
+    def __init__(self, timeout=SECTION_TIMEOUT, cpu_workers=None, io_workers=IO_WORKERS):
+        self.timeout = timeout
+        self.cpu_workers = cpu_workers or max(MIN_CPU_WORKERS, os.cpu_count() or 1)
+        self.io_workers = io_workers
+        self.sections = {}
+        self._lock = threading.Lock()
+        self._executors = (None, None)
+
+    def register(self, name, provider, kind='cpu', timeout=None):
+        """Add a section; provider(context) returns its JSON-serializable value"""
+        if kind not in ('cpu', 'io'):
+            raise ValueError(f"kind must be 'cpu' or 'io', not {kind!r}")
+        self.sections[name] = (provider, kind, timeout or self.timeout)
+
+    def section(self, name, kind='cpu', timeout=None):
+        """Decorator form of register()"""
+        def decorator(provider):
+            self.register(name, provider, kind, timeout)
+            return provider
+        return decorator
+
+    def _pools(self):
+        # Threads do not survive a fork: each worker process starts its own
+        executors, pid = self._executors
+        if executors is None or pid != os.getpid():
+            with self._lock:
+                executors, pid = self._executors
+                if executors is None or pid != os.getpid():
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name='report-loop', daemon=True).start()
+                    executors = {
+                        'cpu': ThreadPoolExecutor(self.cpu_workers, thread_name_prefix='report-cpu'),
+                        'io': ThreadPoolExecutor(self.io_workers, thread_name_prefix='report-io'),
+                        'loop': loop,
+                    }
+                    self._executors = (executors, os.getpid())
+        return executors
+
+    def _submit(self, name, provider, kind, context):
+        """Start one section; its future resolves to (value, elapsed ms)"""
+        pools = self._pools()
+
+        if asyncio.iscoroutinefunction(provider):
+            async def run_async():
+                start = time.perf_counter()
+                value = await provider(context)
+                return value, self._record(name, start)
+            return asyncio.run_coroutine_threadsafe(run_async(), pools['loop'])
+
+        def run():
+            start = time.perf_counter()
+            value = provider(context)
+            return value, self._record(name, start)
+        return pools[kind].submit(run)
+
+    @staticmethod
+    def _record(name, start):
+        elapsed = time.perf_counter() - start
+        metrics.observe('stage_duration_seconds', {'stage': f'report_{name}'}, elapsed)
+        return round(elapsed * 1000, 2)
+
+    def run(self, context, names=None):
+        """
+        Run the named sections (default: all) on context.
+        Returns (values, timings): values maps each section to its result or
+        None; timings maps it to {'status': 'ok' | 'timeout' | 'error', 'ms'}.
+        """
+        names = list(self.sections) if names is None else names
+        start = time.monotonic()
+
+        futures = {}
+        for name in names:
+            provider, kind, timeout = self.sections[name]
+            futures[name] = (self._submit(name, provider, kind, context), start + timeout, timeout)
+
+        values, timings = {}, {}
+        for name, (future, deadline, timeout) in futures.items():
+            try:
+                values[name], elapsed = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                timings[name] = {'status': 'ok', 'ms': elapsed}
+            except TimeoutError:
+                future.cancel()
+                values[name] = None
+                timings[name] = {'status': 'timeout', 'ms': round(timeout * 1000, 2)}
+            except Exception as e:
+                print(f"⚠️  Report section '{name}' failed: {e!r}")
+                values[name] = None
+                timings[name] = {'status': 'error', 'ms': None, 'error': str(e)}
+
+        return values, timings
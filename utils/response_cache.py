@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+CacheEntry = namedtuple('CacheEntry', ['body', 'etag'])
+
+
+def make_etag(body):
+    """Strong ETag for a response body"""
+    return hashlib.sha256(body).hexdigest()[:32]
+
+
+class MemoryBackend:
+    """In-process LRU cache with per-entry expiry"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+
+            entry, expires = item
+            if expires < time.time():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry, ttl):
+        with self._lock:
+            self._entries[key] = (entry, time.time() + ttl)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteBackend:
+    """
+    On-disk LRU cache shared by all worker processes on a host.
+
+    To keep hits read-only, an entry's access time is only rewritten once
+    it is more than access_resolution seconds old, so recency is tracked to
+    that resolution. Expired and least recently used entries are evicted
+    every evict_every sets (per process), so the table can briefly hold a
+    few more than max_entries.
+    """
+
+    def __init__(self, path, max_entries=10000, access_resolution=60, evict_every=100):
+        self.path = path
+        self.max_entries = max_entries
+        self.access_resolution = access_resolution
+        self.evict_every = evict_every
+        self._sets = 0
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connection() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                ' key TEXT PRIMARY KEY, body BLOB, etag TEXT,'
+                ' expires REAL, accessed REAL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+
+    def _connection(self):
+        # One connection per thread (and per process, after a fork)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute(
+            'SELECT body, etag, accessed FROM responses WHERE key = ? AND expires > ?',
+            (key, now)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        if now - row[2] > self.access_resolution:
+            conn.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+        return CacheEntry(bytes(row[0]), row[1])
+
+    def set(self, key, entry, ttl):
+        conn = self._connection()
+        now = time.time()
+        conn.execute(
+            'INSERT OR REPLACE INTO responses (key, body, etag, expires, accessed)'
+            ' VALUES (?, ?, ?, ?, ?)',
+            (key, entry.body, entry.etag, now + ttl, now)
+        )
+
+        self._sets += 1
+        if self._sets % self.evict_every == 0:
+            self.evict()
+
+    def evict(self):
+        """Delete expired entries, then the least recently used beyond max_entries"""
+        conn = self._connection()
+        conn.execute('DELETE FROM responses WHERE expires <= ?', (time.time(),))
+        conn.execute(
+            'DELETE FROM responses WHERE key IN ('
+            ' SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)',
+            (self.max_entries,)
+        )
+
+    def __len__(self):
+        return self._connection().execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+
+class ResponseCache:
+    """
+    Cache of serialized responses keyed by endpoint, normalized request and
+    the dataset/model version, with hit/miss counters.
+    """
+
+    def __init__(self, backend, version, ttl=3600):
+        self.backend = backend
+        self.version = version
+        self.ttl = ttl
+        self.counters = {'hits': 0, 'misses': 0, 'not_modified': 0}
+        self._lock = threading.Lock()
+
+    def make_key(self, endpoint, payload, version=None):
+        """Key of a request; version, if given, replaces the cache's own"""
+        raw = json.dumps([endpoint, version or self.version, payload], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        entry = self.backend.get(key)
+        self.count('hits' if entry is not None else 'misses')
+        return entry
+
+    def put(self, key, body, ttl=None):
+        """Store a body for the cache's TTL, or for ttl if that is shorter"""
+        entry = CacheEntry(body, make_etag(body))
+        self.backend.set(key, entry, self.ttl if ttl is None else min(ttl, self.ttl))
+        return entry
+
+    def count(self, counter):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+
+        lookups = counters['hits'] + counters['misses']
+        return {
+            **counters,
+            'hit_rate': round(counters['hits'] / lookups, 4) if lookups else 0.0,
+            'entries': len(self.backend),
+            'backend': type(self.backend).__name__,
+            'version': self.version,
+            'ttl': self.ttl
+        }
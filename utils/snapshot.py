@@ -0,0 +1,131 @@
+"""
+Serving snapshots, replaced read-copy-update style.
+
+A Snapshot bundles everything a request reads: datasets, location index,
+models and the tables derived from them. It is built in full, off the
+request path, and never modified once published. SnapshotManager holds
+the live one. A reload builds a replacement while requests keep using the
+old one, then swaps the reference. Replacing a reference is atomic, so a
+request that took the old snapshot finishes on it, and the old snapshot is
+freed once the last such request lets go of it.
+"""
+import hashlib
+import os
+import threading
+import time
+
+
+def snapshot_version(parts):
+    """Short hash of the component versions, the same in every worker"""
+    return hashlib.sha256('-'.join(str(part) for part in parts).encode('utf-8')).hexdigest()[:12]
+
+
+def file_stamps(paths):
+    """Short hash of the size and mtime of whichever of paths exist"""
+    stamps = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        stamps.append(f"{path}:{stat.st_size}:{stat.st_mtime_ns}")
+    return hashlib.sha256('\n'.join(stamps).encode('utf-8')).hexdigest()[:16]
+
+
+class Snapshot:
+    """Serving state built together; read-only once constructed"""
+
+    def __init__(self, version, **components):
+        self.__dict__.update(components)
+        self.__dict__['version'] = version
+        self.__dict__['built_at'] = time.time()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Snapshot is read-only (tried to set {name!r})")
+
+
+class SnapshotManager:
+    """
+    The live snapshot, with reloads that build a new one and swap it in.
+
+    build() returns a new Snapshot. source_version() fingerprints its inputs,
+    so a reload can be skipped when nothing changed. warm(snapshot) runs on a
+    reloaded snapshot before it is published. With interval > 0, a watcher
+    thread in each process polls source_version() that often.
+    """
+
+    def __init__(self, build, source_version, warm=None, interval=0):
+        self.build = build
+        self.source_version = source_version
+        self.warm = warm
+        self.interval = interval
+        self.generation = 1
+        self.last_reload = None
+        self._lock = threading.Lock()
+        self._watcher_lock = threading.Lock()
+        self._watcher_pid = None
+
+        self.sources = source_version()
+        self.current = build()
+
+    def acquire(self):
+        """Snapshot to serve one request from; starts this process's watcher if needed"""
+        if self.interval and self._watcher_pid != os.getpid():
+            self._start_watcher()
+        return self.current
+
+    def reload(self, force=False):
+        """
+        Build and publish a new snapshot if the sources changed (always with
+        force). Concurrent calls wait for the build in progress. Returns True
+        if a new snapshot was published. A failed build raises and leaves the
+        current snapshot in place.
+        """
+        with self._lock:
+            sources = self.source_version()
+            if sources == self.sources and not force:
+                return False
+
+            # A broken release is not retried on every poll, only once it changes again
+            self.sources = sources
+            start = time.perf_counter()
+            try:
+                snapshot = self.build()
+                if self.warm is not None:
+                    self.warm(snapshot)
+            except Exception as e:
+                self.last_reload = {'status': 'error', 'error': str(e), 'at': time.time()}
+                print(f"⚠️  Snapshot reload failed, still serving {self.current.version}: {e!r}")
+                raise
+
+            previous, self.current = self.current, snapshot
+            self.generation += 1
+            elapsed = round((time.perf_counter() - start) * 1000, 1)
+            self.last_reload = {'status': 'ok', 'ms': elapsed, 'at': time.time()}
+            print(f"✅ Snapshot {previous.version} -> {snapshot.version} "
+                  f"(generation {self.generation}, built in {elapsed} ms)")
+            return True
+
+    def _start_watcher(self):
+        # Threads do not survive a fork: each worker process starts its own
+        with self._watcher_lock:
+            if self._watcher_pid == os.getpid():
+                return
+            self._watcher_pid = os.getpid()
+        threading.Thread(target=self._watch, name='snapshot-watcher', daemon=True).start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.reload()
+            except Exception:
+                pass  # Logged by reload(); keep serving the current snapshot
+
+    def status(self):
+        return {
+            'version': self.current.version,
+            'generation': self.generation,
+            'built_at': round(self.current.built_at, 3),
+            'last_reload': self.last_reload,
+        }
@@ -0,0 +1,59 @@
+import numpy as np
+from sklearn.neighbors import BallTree
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km; accepts scalars or numpy arrays"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+class SpatialIndex:
+    """Ball tree over (lat, lon) points using haversine distance"""
+
+    def __init__(self, lats, lons, ids):
+        self.lats = np.asarray(lats, dtype=float)
+        self.lons = np.asarray(lons, dtype=float)
+        self.ids = np.asarray(ids)
+        self.tree = BallTree(self._to_radians(self.lats, self.lons), metric='haversine')
+
+    def __len__(self):
+        return len(self.ids)
+
+    @staticmethod
+    def _to_radians(lats, lons):
+        return np.radians(np.column_stack([
+            np.atleast_1d(np.asarray(lats, dtype=float)),
+            np.atleast_1d(np.asarray(lons, dtype=float))
+        ]))
+
+    def nearest(self, lats, lons, k=5):
+        """
+        k nearest points for one or many query points.
+        Returns (ids, distances_km), both shaped (n_queries, k).
+        """
+        k = min(k, len(self.ids))
+        distances, positions = self.tree.query(self._to_radians(lats, lons), k=k)
+        return self.ids[positions], distances * EARTH_RADIUS_KM
+
+    def within(self, lats, lons, radius_km):
+        """
+        Points within radius_km of one or many query points, nearest first.
+        Returns a list with one (ids, distances_km) pair per query point.
+        """
+        positions, distances = self.tree.query_radius(
+            self._to_radians(lats, lons),
+            r=radius_km / EARTH_RADIUS_KM,
+            return_distance=True,
+            sort_results=True
+        )
+        return [
+            (self.ids[p], d * EARTH_RADIUS_KM)
+            for p, d in zip(positions, distances)
+        ]
@@ -0,0 +1,75 @@
+import gzip
+import hashlib
+import json
+import threading
+import time
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip is always available
+    brotli = None
+
+
+class StaticPayload:
+    """
+    A JSON document serialized once and stored pre-compressed.
+    Each encoding gets its own strong ETag derived from the content hash.
+    """
+
+    def __init__(self, data):
+        self.body = json.dumps(data, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+
+        self.variants = {None: (self.body, digest)}
+        self.variants['gzip'] = (gzip.compress(self.body, compresslevel=9, mtime=0), f'{digest}-gz')
+        if brotli is not None:
+            self.variants['br'] = (brotli.compress(self.body, quality=11), f'{digest}-br')
+
+    @property
+    def etags(self):
+        return [etag for _, etag in self.variants.values()]
+
+    def select(self, accept_encodings):
+        """(encoding, body, etag) for the best encoding the client accepts"""
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and encoding in accept_encodings:
+                return (encoding,) + self.variants[encoding]
+        return (None,) + self.variants[None]
+
+
+class PayloadCache:
+    """
+    Static payloads rebuilt only when the data version changes. The version
+    function is consulted at most once every check_interval seconds.
+    """
+
+    def __init__(self, builders, version_fn, check_interval=5.0):
+        self.builders = builders
+        self.version_fn = version_fn
+        self.check_interval = check_interval
+        self._payloads = {}
+        self._version = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self):
+        """Rebuild every payload if the data version changed; returns True if rebuilt"""
+        with self._lock:
+            self._checked = time.monotonic()
+            version = self.version_fn()
+            if version == self._version:
+                return False
+
+            self._payloads = {name: StaticPayload(build()) for name, build in self.builders.items()}
+            self._version = version
+            return True
+
+    def get(self, name):
+        if time.monotonic() - self._checked >= self.check_interval:
+            self.refresh()
+        return self._payloads[name]
+
+    @property
+    def version(self):
+        return self._version
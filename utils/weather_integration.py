@@ -1,76 +1,203 @@
-import requests
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
+import requests
+from requests.adapters import HTTPAdapter
+from utils.response_cache import MemoryBackend
+
+GRID_DEGREES = 0.1          # Cache cell size; 0.1 degree is about 11 km
+CURRENT_TTL = 10 * 60       # Seconds a current-weather reading stays fresh
+FORECAST_TTL = 60 * 60      # Seconds a forecast stays fresh
+POOL_SIZE = 32
 
 class WeatherIntegration:
     """Integrate external weather APIs for real-time data"""
     
-    def __init__(self, api_key=None):
-        self.api_key = api_key or "demo_key"  # Replace with actual API key
-        self.base_url = "https://api.openweathermap.org/data/2.5"
+    def __init__(self, api_key=None, base_url=None, timeout=5, grid=GRID_DEGREES,
+                 current_ttl=CURRENT_TTL, forecast_ttl=FORECAST_TTL,
+                 cache_size=4096, max_workers=16):
+        self.api_key = api_key or os.environ.get('WEATHER_API_KEY', "demo_key")
+        self.base_url = base_url or os.environ.get(
+            'WEATHER_API_URL', "https://api.openweathermap.org/data/2.5"
+        )
+        self.timeout = timeout
+        self.grid = grid
+        self.current_ttl = current_ttl
+        self.forecast_ttl = forecast_ttl
+        self.max_workers = max_workers
+        
+        self.cache = MemoryBackend(cache_size)
+        self.counters = {'hits': 0, 'misses': 0, 'coalesced': 0, 'errors': 0}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._session_state = (None, None)
     
-    def get_current_weather(self, lat, lon):
-        """Get current weather for coordinates"""
+    def _session(self):
+        # Keep-alive connection pool shared by all threads; sockets do not
+        # survive a fork, so each worker process opens its own
+        session, pid = self._session_state
+        if session is None or pid != os.getpid():
+            with self._lock:
+                session, pid = self._session_state
+                if session is None or pid != os.getpid():
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session_state = (session, os.getpid())
+        return session
+    
+    def grid_cell(self, lat, lon):
+        """Snap coordinates to the centre of their cache cell"""
+        return (
+            round(round(float(lat) / self.grid) * self.grid, 4),
+            round(round(float(lon) / self.grid) * self.grid, 4)
+        )
+    
+    def _count(self, counter):
+        with self._lock:
+            self.counters[counter] += 1
+    
+    def _cached(self, key, ttl, fetch):
+        """
+        Return a cached value for key, or fetch it once. Concurrent callers
+        for the same key wait for the first caller's fetch instead of
+        issuing their own. Failed fetches (None) are not cached.
+        """
+        value = self.cache.get(key)
+        if value is not None:
+            self._count('hits')
+            return value
+        
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+                self.counters['misses'] += 1
+            else:
+                self.counters['coalesced'] += 1
+        
+        if not owner:
+            return future.result()
+        
         try:
-            url = f"{self.base_url}/weather"
-            params = {
-                'lat': lat,
-                'lon': lon,
-                'appid': self.api_key,
-                'units': 'metric'
-            }
-            
-            response = requests.get(url, params=params, timeout=5)
-            
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    'temperature': data['main']['temp'],
-                    'humidity': data['main']['humidity'],
-                    'pressure': data['main']['pressure'],
-                    'description': data['weather'][0]['description'],
-                    'wind_speed': data['wind']['speed']
-                }
+            value = fetch()
+            if value is not None:
+                self.cache.set(key, value, ttl)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+    
+    def _get_json(self, path, params):
+        response = self._session().get(
+            f"{self.base_url}/{path}",
+            params={**params, 'appid': self.api_key, 'units': 'metric'},
+            timeout=self.timeout
+        )
+        
+        if response.status_code == 200:
+            return response.json()
+        
+        return None
+    
+    def _fetch_current(self, lat, lon):
+        try:
+            data = self._get_json('weather', {'lat': lat, 'lon': lon})
+            if data is None:
+                return None
             
-            return None
+            return {
+                'temperature': data['main']['temp'],
+                'humidity': data['main']['humidity'],
+                'pressure': data['main']['pressure'],
+                'description': data['weather'][0]['description'],
+                'wind_speed': data['wind']['speed']
+            }
             
         except Exception as e:
+            self._count('errors')
             print(f"Weather API error: {e}")
             return None
     
-    def get_forecast(self, lat, lon, days=7):
-        """Get weather forecast"""
+    def _fetch_forecast(self, lat, lon, days):
         try:
-            url = f"{self.base_url}/forecast"
-            params = {
+            data = self._get_json('forecast', {
                 'lat': lat,
                 'lon': lon,
-                'appid': self.api_key,
-                'units': 'metric',
                 'cnt': days * 8  # 3-hour intervals
-            }
+            })
+            if data is None:
+                return None
             
-            response = requests.get(url, params=params, timeout=5)
+            forecast = []
+            for item in data['list']:
+                forecast.append({
+                    'datetime': item['dt_txt'],
+                    'temperature': item['main']['temp'],
+                    'humidity': item['main']['humidity'],
+                    'rainfall': item.get('rain', {}).get('3h', 0),
+                    'description': item['weather'][0]['description']
+                })
             
-            if response.status_code == 200:
-                data = response.json()
-                forecast = []
-                
-                for item in data['list']:
-                    forecast.append({
-                        'datetime': item['dt_txt'],
-                        'temperature': item['main']['temp'],
-                        'humidity': item['main']['humidity'],
-                        'rainfall': item.get('rain', {}).get('3h', 0),
-                        'description': item['weather'][0]['description']
-                    })
-                
-                return forecast
-            
-            return []
+            return forecast
             
         except Exception as e:
+            self._count('errors')
             print(f"Forecast API error: {e}")
-            return []
+            return None
+    
+    def get_current_weather(self, lat, lon):
+        """Get current weather for coordinates (cached per grid cell)"""
+        cell = self.grid_cell(lat, lon)
+        return self._cached(
+            ('weather',) + cell, self.current_ttl,
+            lambda: self._fetch_current(*cell)
+        )
+    
+    def get_forecast(self, lat, lon, days=7):
+        """Get weather forecast (cached per grid cell)"""
+        cell = self.grid_cell(lat, lon)
+        forecast = self._cached(
+            ('forecast', days) + cell, self.forecast_ttl,
+            lambda: self._fetch_forecast(*cell, days)
+        )
+        return forecast or []
+    
+    def _bulk(self, fetch, coordinates):
+        cells = [self.grid_cell(lat, lon) for lat, lon in coordinates]
+        unique = list(dict.fromkeys(cells))
+        
+        with ThreadPoolExecutor(min(self.max_workers, len(unique)) or 1) as pool:
+            results = dict(zip(unique, pool.map(lambda cell: fetch(*cell), unique)))
+        
+        return [results[cell] for cell in cells]
+    
+    def get_current_weather_bulk(self, coordinates):
+        """Current weather for many (lat, lon) pairs, fetched concurrently"""
+        return self._bulk(self.get_current_weather, coordinates)
+    
+    def get_forecast_bulk(self, coordinates, days=7):
+        """Forecasts for many (lat, lon) pairs, fetched concurrently"""
+        return self._bulk(lambda lat, lon: self.get_forecast(lat, lon, days), coordinates)
+    
+    def stats(self):
+        """Cache hit/miss/coalescing counters"""
+        with self._lock:
+            counters = dict(self.counters)
+        
+        lookups = counters['hits'] + counters['misses'] + counters['coalesced']
+        return {
+            **counters,
+            'hit_rate': round((counters['hits'] + counters['coalesced']) / lookups, 4) if lookups else 0.0,
+            'entries': len(self.cache)
+        }
     
     def calculate_rainfall_prediction(self, lat, lon, months=3):
         """Predict rainfall for upcoming months"""
@@ -0,0 +1,14 @@
+"""
+Production entry point.
+
+Importing this module loads every dataset and model and warms them up, so
+with gunicorn's preload_app (see gunicorn.conf.py) that work happens once
+in the master process and forked workers share it copy-on-write:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+from app import app, warm_up
+
+warm_up()
+
+application = app